@@ -0,0 +1,58 @@
+"""Compares loading a Workflow's provenance as one INSERT DATA query, built with make_sparql_insert_data(), against
+streaming it with bulk_insert_data() into size-bounded queries sent concurrently. The endpoint is simulated by a fixed
+per-request latency plus a per-byte transfer time.
+"""
+
+import time
+import tracemalloc
+
+from provworkflow import Block, Entity, Workflow
+from provworkflow.bulk_load import bulk_insert_data
+from provworkflow.utils import make_sparql_insert_data
+
+N_BLOCKS = 5000
+ENTITIES_PER_BLOCK = 4
+LATENCY = 0.02
+SECONDS_PER_BYTE = 1e-8
+
+
+def make_workflow() -> Workflow:
+    w = Workflow(label="Benchmark Workflow")
+    for i in range(N_BLOCKS):
+        b = Block(label=f"Block {i}")
+        for j in range(ENTITIES_PER_BLOCK):
+            b.used.append(Entity(value=f"input {i}.{j}"))
+            b.generated.append(Entity(value=f"output {i}.{j}"))
+        w.blocks.append(b)
+    return w
+
+
+def update(query: str):
+    time.sleep(LATENCY + len(query) * SECONDS_PER_BYTE)
+
+
+def single_query(w: Workflow) -> int:
+    g = w.prov_to_graph()
+    update(make_sparql_insert_data("https://example.com/g", g))
+    return len(g)
+
+
+def bulk(w: Workflow) -> int:
+    return bulk_insert_data(w.iter_triples(), update, "https://example.com/g").triples
+
+
+if __name__ == "__main__":
+    print(
+        f"{'method':>18} {'triples':>10} {'seconds':>9} {'triples/s':>11} {'peak MiB':>9}"
+    )
+    for name, fn in (("single INSERT DATA", single_query), ("bulk_insert_data", bulk)):
+        w = make_workflow()
+        tracemalloc.start()
+        start = time.perf_counter()
+        n = fn(w)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name:>18} {n:>10} {elapsed:>9.2f} {n / elapsed:>11.0f} {peak / 2**20:>9.1f}"
+        )
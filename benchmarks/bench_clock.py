@@ -0,0 +1,29 @@
+"""Times taking a timestamp, as ProvWF originally did with utils.now_as_xsd_datetime_stamp() and as a Clock does, and
+formatting Clock timestamps on export."""
+
+import time
+
+from provworkflow.clock import Clock
+from provworkflow.utils import now_as_xsd_datetime_stamp
+
+N = 200_000
+
+
+def us_per(f, n: int = N) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        f()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+if __name__ == "__main__":
+    clock = Clock()
+    stamps = iter([clock.now() for _ in range(N)])
+    print(f"{'':>36} {'us/timestamp':>13}")
+    print(
+        f"{'now_as_xsd_datetime_stamp()':>36} {us_per(now_as_xsd_datetime_stamp):>13.2f}"
+    )
+    print(f"{'Clock.now()':>36} {us_per(clock.now):>13.2f}")
+    print(
+        f"{'Clock.format(), on export':>36} {us_per(lambda: clock.format(next(stamps))):>13.2f}"
+    )
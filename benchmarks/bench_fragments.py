@@ -0,0 +1,107 @@
+"""Times merging the provenance of Blocks run by 32 worker processes into a Workflow in the parent process, and exporting
+it as N-Quads, comparing returning the Blocks themselves, pickled, with returning fragments.capture() Fragments, merged
+for export at the end or flushed to the Workflow's sink as each is merged.
+
+Each worker's Blocks share an Agent with the parent. Returned as Blocks, every worker's copy of the Agent, & its chain
+of parents, is pickled back and all are exported with the Workflow. Returned as Fragments, known nodes are not captured
+and each Fragment's triples are written as the N-Quads lines they were captured as, without parsing their terms. Merging
+Blocks is only appending them, so compare the merge & export times together: each row should write the same triples.
+"""
+
+import io
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from provworkflow import Agent, Block, Entity, Workflow
+from provworkflow.fragments import capture
+from provworkflow.ntriples import NTriplesWriter
+from rdflib import URIRef
+
+WORKERS = 32
+TASKS_PER_WORKER = 4
+BLOCKS_PER_TASK = 250
+PARENT_CHAIN_LENGTH = 20
+AGENT = URIRef("http://example.com/agent/shared")
+
+
+def make_agent() -> Agent:
+    parent = None
+    for i in range(PARENT_CHAIN_LENGTH):
+        parent = Agent(uri=f"{AGENT}/parent/{i}", acted_on_behalf_of=parent)
+    return Agent(uri=AGENT, acted_on_behalf_of=parent)
+
+
+def make_blocks(task: int) -> list:
+    agent = make_agent()
+    blocks = []
+    for i in range(BLOCKS_PER_TASK):
+        b = Block(label=f"{task}.{i}", was_associated_with=agent)
+        b.used.append(Entity(value=f"in {task}.{i}", was_attributed_to=agent))
+        b.generated.append(Entity(value=f"out {task}.{i}"))
+        blocks.append(b)
+    return blocks
+
+
+def as_blocks(task: int) -> list:
+    return make_blocks(task)
+
+
+def as_fragment(task: int):
+    known = [AGENT] + [
+        URIRef(f"{AGENT}/parent/{i}") for i in range(PARENT_CHAIN_LENGTH)
+    ]
+    return capture(make_blocks(task), known=known)
+
+
+def run(worker, merge, flushed: bool = False):
+    out = io.StringIO()
+    w = Workflow(
+        was_associated_with=make_agent(), sink=NTriplesWriter(out) if flushed else None
+    )
+    tasks = range(WORKERS * TASKS_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(worker, tasks))
+        running = time.perf_counter() - start
+    payload = sum(len(pickle.dumps(result)) for result in results)
+
+    # merged once the workers have finished, so they don't compete for CPU time with the merges being timed
+    start = time.perf_counter()
+    for result in results:
+        merge(w, result)
+    merging = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if flushed:
+        w.end()
+    else:
+        w.write_nquads(out)
+    exporting = time.perf_counter() - start
+    triples = out.getvalue().count("\n")
+    return running, payload, merging, exporting, triples
+
+
+if __name__ == "__main__":
+    print(
+        f"{WORKERS} workers, {WORKERS * TASKS_PER_WORKER} tasks of {BLOCKS_PER_TASK} Blocks\n"
+    )
+    print(
+        f"{'returned as':>20} {'run s':>7} {'MB pickled':>11} {'merge s':>9} {'export s':>9}"
+        f" {'merge + export s':>17} {'triples':>9}"
+    )
+    for name, worker, merge, flushed in (
+        ("Blocks", as_blocks, lambda w, blocks: w.blocks.extend(blocks), False),
+        ("Fragments", as_fragment, lambda w, fragment: w.merge(fragment), False),
+        (
+            "Fragments, flushed",
+            as_fragment,
+            lambda w, fragment: w.merge(fragment),
+            True,
+        ),
+    ):
+        running, payload, merging, exporting, triples = run(worker, merge, flushed)
+        print(
+            f"{name:>20} {running:>7.2f} {payload / 1e6:>11.1f} {merging:>9.3f} {exporting:>9.3f}"
+            f" {merging + exporting:>17.3f} {triples:>9,}"
+        )
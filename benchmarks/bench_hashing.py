@@ -0,0 +1,42 @@
+"""Times the digests of file-backed Entities: the first, hashed from a memory map, and repeats, from the HashCache,
+which should take microseconds however large the file. Peak memory while hashing should not grow with the file size.
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from provworkflow import Entity
+from provworkflow.hashing import HashCache, set_hash_cache
+
+
+def time_digest(path: Path) -> float:
+    start = time.perf_counter()
+    Entity(value=path).digest
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        set_hash_cache(HashCache(Path(d) / "hashes.sqlite3"))
+        print(
+            f"{'MB':>6} {'first s':>9} {'MB/s':>8} {'peak traced KB':>15} {'cached us':>10}"
+        )
+        for mb in (16, 64, 256, 1024):
+            path = Path(d) / f"{mb}.bin"
+            with open(path, "wb") as f:
+                for _ in range(mb):
+                    f.write(os.urandom(1 << 20))
+
+            tracemalloc.start()
+            first = time_digest(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            cached = min(time_digest(path) for _ in range(10))
+            print(
+                f"{mb:>6} {first:>9.3f} {mb / first:>8.0f} {peak / 1024:>15.1f} {cached * 1e6:>10.1f}"
+            )
+            path.unlink()
+        set_hash_cache(None)
@@ -0,0 +1,70 @@
+"""Times a lineage.LineageIndex of 1M Entities & Blocks: building it, then ancestors(), descendants() & path() queries,
+cold and memoized. Each query should take milliseconds or less however large the index, as it only touches the lineage
+of the node queried.
+
+The Workflow is many pipelines, each a chain of Blocks each using the previous Block's Entity and, now & then, another pipeline's output,
+so the lineage of each output fans in to around a hundred nodes, as a real Workflow's might.
+"""
+
+import random
+import time
+
+from provworkflow import Block, Entity, Workflow
+from provworkflow.lineage import LineageIndex
+
+PIPELINES = 20_000
+DEPTH = 25  # Blocks per pipeline, each with its Entity: 2 * DEPTH nodes
+QUERIES = 1_000
+
+
+def make_workflow():
+    w = Workflow()
+    outputs = []
+    for p in range(PIPELINES):
+        e = Entity(label=f"input {p}")
+        for _ in range(DEPTH):
+            used = [e]
+            if outputs and random.random() < 0.02:
+                used.append(random.choice(outputs))
+            e = Entity()
+            w.blocks.append(Block(used=used, generated=[e]))
+        outputs.append(e)
+    return w, outputs
+
+
+def time_queries(name, fn, nodes):
+    start = time.perf_counter()
+    sizes = [len(fn(n) or ()) for n in nodes]
+    per_query = (time.perf_counter() - start) / len(nodes)
+    print(
+        f"{name:>24} {per_query * 1e3:>10.3f} ms {sum(sizes) / len(sizes):>10.1f} nodes"
+    )
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    start = time.perf_counter()
+    w, outputs = make_workflow()
+    print(f"made Workflow in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    index = LineageIndex(w)
+    built = time.perf_counter() - start
+    print(f"indexed {len(index):,} nodes in {built:.1f} s")
+
+    start = time.perf_counter()
+    index._adjacency_of(0), index._adjacency_of(1)
+    print(f"built adjacency arrays in {time.perf_counter() - start:.1f} s\n")
+
+    sample = random.sample(outputs, QUERIES)
+    inputs = [b.used[0] for b in random.sample(w.blocks, QUERIES)]
+    time_queries("ancestors, cold", index.ancestors, sample)
+    time_queries("ancestors, memoized", index.ancestors, sample)
+    time_queries("descendants, cold", index.descendants, inputs)
+    time_queries("descendants, memoized", index.descendants, inputs)
+    # each output from an Entity upstream of it
+    pairs = [
+        (random.choice([n for n in index.ancestors(o) if isinstance(n, Entity)]), o)
+        for o in sample
+    ]
+    time_queries("path", lambda p: index.path(*p), pairs)
@@ -0,0 +1,27 @@
+"""Reports the memory, measured with tracemalloc, taken by each Entity, Agent & Block, including the URIs, Literals,
+lists etc. they hold."""
+
+import gc
+import tracemalloc
+
+from provworkflow import Agent, Block, Entity
+
+N = 20_000
+
+
+def bytes_per_instance(make) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    instances = [make() for _ in range(N)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    # less the list holding them
+    return (after - before) / N - 8
+
+
+if __name__ == "__main__":
+    print(f"{'class':>8} {'bytes/instance':>15}")
+    for cls in (Entity, Agent, Block):
+        print(f"{cls.__name__:>8} {bytes_per_instance(cls):>15.0f}")
@@ -0,0 +1,40 @@
+"""Times minting URIs, one at a time and in batches, with each built-in minter against ProvWF's original
+URIRef(PWFS + str(uuid.uuid1())), and the time to create Entities with each minter set.
+"""
+
+import time
+import uuid
+
+from rdflib import URIRef
+
+from provworkflow import Entity
+from provworkflow.minting import (
+    ContentHashMinter,
+    CounterMinter,
+    UUID4Minter,
+    set_minter,
+)
+from provworkflow.namespace import PWFS
+
+N = 200_000
+
+
+def us_per(f, n: int = N) -> float:
+    start = time.perf_counter()
+    f(n)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'minter':>18} {'us/mint':>9} {'us/batch mint':>14} {'us/Entity':>10}")
+    print(
+        f"{'uuid1 (original)':>18} "
+        f"{us_per(lambda n: [URIRef(PWFS + str(uuid.uuid1())) for _ in range(n)]):>9.2f}"
+    )
+    for m in (UUID4Minter(), CounterMinter(), ContentHashMinter()):
+        one = us_per(lambda n: [m.mint() for _ in range(n)])
+        batch = us_per(m.mint_batch)
+        set_minter(m)
+        entity = us_per(lambda n: [Entity(value=i) for i in range(n)])
+        print(f"{type(m).__name__:>18} {one:>9.2f} {batch:>14.2f} {entity:>10.2f}")
+    set_minter(None)
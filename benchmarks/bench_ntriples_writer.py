@@ -0,0 +1,62 @@
+"""Compares the throughput and peak memory of streaming a Workflow's provenance to N-Triples with write_ntriples()
+against building a graph with prov_to_graph() and serialising it with rdflib's serializer.
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from provworkflow import Block, Entity, Workflow
+
+N_BLOCKS = 5000
+ENTITIES_PER_BLOCK = 4
+
+
+def make_workflow() -> Workflow:
+    w = Workflow(label="Benchmark Workflow")
+    for i in range(N_BLOCKS):
+        b = Block(label=f"Block {i}")
+        for j in range(ENTITIES_PER_BLOCK):
+            b.used.append(Entity(value=f"input {i}.{j}"))
+            b.generated.append(Entity(value=f"output {i}.{j}"))
+        w.blocks.append(b)
+    return w
+
+
+def write_ntriples(w: Workflow, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        w.write_ntriples(f)
+
+
+def rdflib_serialize(w: Workflow, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(w.prov_to_graph().serialize(format="nt"))
+
+
+def measure(fn, w: Workflow, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(w, path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with open(path, encoding="utf-8") as f:
+        n_triples = sum(1 for _ in f)
+    return n_triples, elapsed, peak
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "bench.nt")
+    print(
+        f"{'method':>18} {'triples':>10} {'seconds':>9} {'triples/s':>11} {'peak MiB':>9}"
+    )
+    for name, fn in (
+        ("write_ntriples", write_ntriples),
+        ("rdflib serialize", rdflib_serialize),
+    ):
+        n, elapsed, peak = measure(fn, make_workflow(), path)
+        print(
+            f"{name:>18} {n:>10} {elapsed:>9.2f} {n / elapsed:>11.0f} {peak / 2**20:>9.1f}"
+        )
+    os.unlink(path)
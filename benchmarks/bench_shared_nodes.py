@@ -0,0 +1,38 @@
+"""Times the export of Workflows in which a single Agent, with a chain of parent Agents, is shared by a growing number
+of Blocks & Entities.
+
+Since each node is serialised only once per export, export time should grow linearly with the number of shared
+references: the time per reference column should stay roughly constant."""
+
+import time
+
+from provworkflow import Agent, Block, Entity, Workflow
+
+PARENT_CHAIN_LENGTH = 50
+
+
+def make_workflow(n_blocks: int) -> Workflow:
+    parent = None
+    for i in range(PARENT_CHAIN_LENGTH):
+        parent = Agent(label=f"Parent {i}", acted_on_behalf_of=parent)
+    agent = Agent(label="Shared Agent", acted_on_behalf_of=parent)
+
+    w = Workflow(was_associated_with=agent)
+    for _ in range(n_blocks):
+        b = Block(was_associated_with=agent)
+        b.generated.append(Entity(was_attributed_to=agent))
+        w.blocks.append(b)
+    return w
+
+
+if __name__ == "__main__":
+    print(f"{'blocks':>8} {'references':>12} {'seconds':>10} {'us/reference':>14}")
+    for n in (250, 500, 1000, 2000, 4000):
+        w = make_workflow(n)
+        start = time.perf_counter()
+        w.prov_to_graph()
+        elapsed = time.perf_counter() - start
+        references = 2 * n + 1
+        print(
+            f"{n:>8} {references:>12} {elapsed:>10.3f} {elapsed / references * 1e6:>14.1f}"
+        )
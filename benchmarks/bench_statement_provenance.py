@@ -0,0 +1,64 @@
+"""Compares annotating a data graph with reified statement-level provenance triple by triple, with
+add_with_provenance() and merging the resulting graphs, against add_with_provenance_bulk().
+"""
+
+import io
+import time
+
+from rdflib import Graph, Literal, Namespace, URIRef
+
+from provworkflow.ntriples import NTriplesWriter
+from provworkflow.utils import (
+    add_with_provenance,
+    add_with_provenance_bulk,
+    iter_with_provenance,
+)
+
+N_TRIPLES = 20000
+
+EX = Namespace("https://example.com/")
+BLOCK = URIRef("https://example.com/block/1")
+
+
+def data_triples():
+    return [(EX[f"s{i}"], EX.p, Literal(i)) for i in range(N_TRIPLES)]
+
+
+def per_triple(triples) -> Graph:
+    g = Graph()
+    for s, p, o in triples:
+        g += add_with_provenance(s, p, o, BLOCK)
+    return g
+
+
+def bulk(triples) -> Graph:
+    return add_with_provenance_bulk(triples, BLOCK)
+
+
+def bulk_grouped(triples) -> Graph:
+    return add_with_provenance_bulk(triples, BLOCK, group_size=1000)
+
+
+def bulk_stream(triples) -> NTriplesWriter:
+    # streamed as N-Triples, never building a graph
+    writer = NTriplesWriter(io.StringIO())
+    writer.write(iter_with_provenance(triples, BLOCK))
+    writer.flush()
+    return writer
+
+
+if __name__ == "__main__":
+    print(f"{'method':>22} {'triples':>10} {'seconds':>9} {'data triples/s':>15}")
+    for name, fn in (
+        ("add_with_provenance", per_triple),
+        ("bulk", bulk),
+        ("bulk, groups of 1000", bulk_grouped),
+        ("bulk to N-Triples", bulk_stream),
+    ):
+        triples = data_triples()
+        start = time.perf_counter()
+        g = fn(triples)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>22} {len(g) if isinstance(g, Graph) else g.count:>10} {elapsed:>9.2f} {N_TRIPLES / elapsed:>15.0f}"
+        )
@@ -0,0 +1,41 @@
+"""Compares exporting Entities with large JSON values inline, as they were before values.ValuePolicy, with storing them
+out of line: the export's time & N-Triples size, and the time of a second export, in which the stored values are
+neither converted nor stored again."""
+
+import io
+import tempfile
+import time
+
+from provworkflow import Block, Entity, Workflow
+from provworkflow.values import BlobStore, ValuePolicy, set_value_policy
+
+ENTITIES = 200
+ROWS = 5_000
+
+
+def make_workflow() -> Workflow:
+    w = Workflow()
+    for i in range(ENTITIES):
+        payload = {"id": i, "rows": [{"x": j, "y": j * i} for j in range(ROWS)]}
+        w.blocks.append(Block(generated=[Entity(value=payload)]))
+    return w
+
+
+def export(w: Workflow):
+    out = io.StringIO()
+    start = time.perf_counter()
+    w.write_ntriples(out)
+    return time.perf_counter() - start, len(out.getvalue())
+
+
+if __name__ == "__main__":
+    print(f"{ENTITIES} Entities with JSON values of {ROWS} rows\n")
+    print(f"{'values':>12} {'1st export s':>13} {'2nd export s':>13} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as d:
+        for name, store in (("inline", None), ("out of line", BlobStore(d))):
+            set_value_policy(ValuePolicy(store=store))
+            w = make_workflow()
+            first, size = export(w)
+            second, _ = export(w)
+            print(f"{name:>12} {first:>13.3f} {second:>13.3f} {size / 1e6:>8.1f}")
+    set_value_policy(None)
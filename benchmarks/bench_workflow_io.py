@@ -0,0 +1,35 @@
+"""Times the streaming export of Workflows of growing numbers of Entities, each Block using the previous Block's outputs
+as well as new external inputs, so that the Workflow's prov:used & prov:generated must be inferred from many Entities.
+
+The inference is set based, so the time per Entity column should stay roughly constant.
+"""
+
+import time
+from collections import deque
+
+from provworkflow import Block, Entity, Workflow
+
+# each Block uses the previous Block's outputs plus this many new inputs, and generates this many outputs
+N_NEW_INPUTS = 5
+N_OUTPUTS = 5
+
+
+def make_workflow(n_entities: int) -> Workflow:
+    w = Workflow()
+    previous_outputs = []
+    for _ in range(n_entities // (N_NEW_INPUTS + N_OUTPUTS)):
+        b = Block(used=previous_outputs + [Entity() for _ in range(N_NEW_INPUTS)])
+        b.generated.extend(Entity() for _ in range(N_OUTPUTS))
+        previous_outputs = b.generated
+        w.blocks.append(b)
+    return w
+
+
+if __name__ == "__main__":
+    print(f"{'entities':>9} {'seconds':>9} {'us/entity':>10}")
+    for n in (5_000, 10_000, 20_000, 50_000):
+        w = make_workflow(n)
+        start = time.perf_counter()
+        deque(w.iter_triples(), maxlen=0)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>9} {elapsed:>9.3f} {elapsed / n * 1e6:>10.1f}")
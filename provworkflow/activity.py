@@ -1,15 +1,16 @@
 from __future__ import annotations
-from typing import List, Union
+from typing import Iterator, List, Union
 
-from rdflib import Graph, URIRef, Literal
-from rdflib.namespace import PROV, RDF, XSD
+from rdflib import URIRef
+from rdflib.namespace import PROV
 
 # from franz.openrdf.connect import ag_connect
 # from franz.openrdf.rio.rdfformat import RDFFormat
 from .prov_reporter import ProvReporter, PROVWF
 from .entity import Entity
 from .agent import Agent
-from .utils import now_as_xsd_datetime_stamp
+from .traversal import TraversalContext, Triple
+from .clock import get_clock
 
 
 class Activity(ProvReporter):
@@ -38,10 +39,20 @@ class Activity(ProvReporter):
     :param informed: Another Activity that this Activity triggered the creation of
     :type informed: Activity, optional
 
-    :param was_informed_by: Another Activity that triggered the creation of this Activity
-    :type was_informed_by: Activity, optional
+    :param was_informed_by: Other Activities that triggered the creation of this Activity
+    :type was_informed_by: List[Activity], optional
     """
 
+    __slots__ = (
+        "started_at_time",
+        "ended_at_time",
+        "used",
+        "generated",
+        "was_associated_with",
+        "informed",
+        "was_informed_by",
+    )
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -52,73 +63,60 @@ class Activity(ProvReporter):
         was_associated_with: Agent = None,
         informed: List[Activity] = None,
         class_uri: Union[URIRef, str] = None,
+        was_informed_by: List[Activity] = None,
     ):
         super().__init__(
             uri=uri, label=label, named_graph_uri=named_graph_uri, class_uri=class_uri
         )
 
-        self.started_at_time = now_as_xsd_datetime_stamp()
+        # nanoseconds since the epoch, see clock.Clock. Times may also be set by hand as xsd:dateTimeStamp strings
+        self.started_at_time = get_clock().now()
         self.ended_at_time = None
 
         self.used = used if used is not None else []
         self.generated = generated if generated is not None else []
         self.was_associated_with = was_associated_with
         self.informed = informed if informed is not None else []
+        self.was_informed_by = was_informed_by if was_informed_by is not None else []
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
+    _rdf_type = PROV.Activity
 
-        # add in type
-        g.add((self.uri, RDF.type, PROV.Activity))
-        g.remove((self.uri, RDF.type, PROVWF.ProvReporter))
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        yield from super()._triples(context)
 
         # all Activities have a startedAtTime
         # made at __init__() time
-        g.add(
-            (
-                self.uri,
-                PROV.startedAtTime,
-                Literal(
-                    self.started_at_time,
-                    datatype=XSD.dateTimeStamp,
-                ),
-            )
-        )
+        clock = get_clock()
+        yield self.uri, PROV.startedAtTime, clock.to_literal(self.started_at_time)
 
         if self.used is not None:
             for e in self.used:
-                e.prov_to_graph(g)
-                g.add((self.uri, PROV.used, e.uri))
+                context.schedule(e)
+                yield self.uri, PROV.used, e.uri
 
         if self.generated is not None:
             for e in self.generated:
-                e.prov_to_graph(g)
-                g.add((self.uri, PROV.generated, e.uri))
+                context.schedule(e)
+                yield self.uri, PROV.generated, e.uri
 
         if self.was_associated_with is not None:
-            self.was_associated_with.prov_to_graph(g)
-            g.add((self.uri, PROV.wasAssociatedWith, self.was_associated_with.uri))
+            context.schedule(self.was_associated_with)
+            yield self.uri, PROV.wasAssociatedWith, self.was_associated_with.uri
 
         if self.informed is not None:
             for i in self.informed:
-                i.prov_to_graph(g)
-                # g.add((self.uri, PROV.informed, i.uri))
-                g.add((i.uri, PROV.wasInformedBy, self.uri))
+                context.schedule(i)
+                # yield self.uri, PROV.informed, i.uri
+                yield i.uri, PROV.wasInformedBy, self.uri
+
+        if self.was_informed_by is not None:
+            for i in self.was_informed_by:
+                context.schedule(i)
+                yield self.uri, PROV.wasInformedBy, i.uri
 
         # if we don't yet have an endedAtTime recorded, make it now
         if self.ended_at_time is None:
-            self.ended_at_time = now_as_xsd_datetime_stamp()
+            self.ended_at_time = clock.now()
 
         # all Activities have a endedAtTime
-        g.add(
-            (
-                self.uri,
-                PROV.endedAtTime,
-                Literal(
-                    self.ended_at_time,
-                    datatype=XSD.dateTimeStamp,
-                ),
-            )
-        )
-
-        return g
+        yield self.uri, PROV.endedAtTime, clock.to_literal(self.ended_at_time)
@@ -1,8 +1,9 @@
-from typing import Union
-from rdflib import Graph, URIRef
-from rdflib.namespace import PROV, RDF
+from typing import Iterator, Union
+from rdflib import URIRef
+from rdflib.namespace import PROV
 
-from .prov_reporter import ProvReporter, PROVWF
+from .prov_reporter import ProvReporter
+from .traversal import TraversalContext, Triple
 
 
 class Agent(ProvReporter):
@@ -19,6 +20,8 @@ class Agent(ProvReporter):
     :type named_graph_uri: Union[URIRef, str], optional
     """
 
+    __slots__ = ("acted_on_behalf_of",)
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -27,23 +30,18 @@ class Agent(ProvReporter):
         acted_on_behalf_of: Union["Agent", URIRef] = None,
     ):
         # handle URIRef or Agent acted_on_behalf_of
-        if acted_on_behalf_of is not None:
-            if type(acted_on_behalf_of) == URIRef:
-                self.acted_on_behalf_of = Agent(uri=self.acted_on_behalf_of)
-            else:
-                self.acted_on_behalf_of = acted_on_behalf_of
+        if type(acted_on_behalf_of) == URIRef:
+            self.acted_on_behalf_of = Agent(uri=acted_on_behalf_of)
+        else:
+            self.acted_on_behalf_of = acted_on_behalf_of
         super().__init__(uri=uri, label=label, named_graph_uri=named_graph_uri)
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
+    _rdf_type = PROV.Agent
 
-        # add in type
-        g.add((self.uri, RDF.type, PROV.Agent))
-        g.remove((self.uri, RDF.type, PROVWF.ProvReporter))
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        yield from super()._triples(context)
 
         # special Agent properties
-        if hasattr(self, "acted_on_behalf_of"):
-            self.acted_on_behalf_of.prov_to_graph(g)
-            g.add((self.uri, PROV.actedOnBehalfOf, self.acted_on_behalf_of.uri))
-
-        return g
+        if self.acted_on_behalf_of is not None:
+            context.schedule(self.acted_on_behalf_of)
+            yield self.uri, PROV.actedOnBehalfOf, self.acted_on_behalf_of.uri
@@ -1,13 +1,17 @@
-from typing import List, Union
+import functools
+from typing import Iterator, List, Union
 
 from rdflib import URIRef, Literal
 from rdflib.namespace import OWL, PROV, RDF, RDFS, XSD
 
 from .activity import Activity
 from .agent import Agent
+from .clock import get_clock
 from .entity import Entity
+from .instrumentation import ResourceUsage
 from .namespace import PROVWF
 from .exceptions import ProvWorkflowException
+from .traversal import TraversalContext, Triple
 
 
 class Block(Activity):
@@ -15,6 +19,11 @@ class Block(Activity):
 
     For its Semantic Web definition, see https://data.surroundaustralia.com/def/provworkflow/Block (not available yet)
 
+    A Block may be used as a context manager, "with Block() as b: ...", in which case its startedAtTime &
+    endedAtTime are those of the with block, rather than of the Block's creation & export, and the wall & CPU time,
+    peak memory increase & garbage collections of the with block are recorded, see instrumentation.ResourceUsage.
+    Block.timed() does the same for each call of a function.
+
     :param uri: A URI you assign to the Block instance. If None, a UUID-based URI will be created,
     defaults to None
     :type uri: Union[URIRef, str], optional
@@ -40,6 +49,8 @@ class Block(Activity):
     :type class_uri: Union[URIRef, str], optional
     """
 
+    __slots__ = ("resource_usage", "memoized_from")
+
     def __init__(
         self,
         uri: Union[URIRef, str] = None,
@@ -60,27 +71,65 @@ class Block(Activity):
             class_uri=class_uri,
         )
 
-    def prov_to_graph(self, g=None):
-        g = super().prov_to_graph(g)
+        self.resource_usage = None
 
-        # add in type
-        g.add((self.uri, RDF.type, PROVWF.Block))
-        g.remove((self.uri, RDF.type, PROV.Activity))
+        # the URI of an earlier run of this Block whose results were reused rather than recomputed, see memo.MemoCache
+        self.memoized_from = None
+
+    def __enter__(self):
+        self.resource_usage = ResourceUsage()
+        self.started_at_time = get_clock().now()
+        self.ended_at_time = None
+        self.resource_usage.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.resource_usage.stop()
+        self.ended_at_time = get_clock().now()
+
+    @classmethod
+    def timed(cls, workflow=None, **kwargs):
+        """A decorator that runs each call of a function in a new Block, used as a context manager
+
+        :param workflow: A Workflow each new Block is added to, defaults to None
+        :type workflow: Workflow, optional
+
+        :param kwargs: The new Blocks' arguments, e.g. label
+
+        :return: The decorator
+        """
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kw):
+                block = cls(**kwargs)
+                if workflow is not None:
+                    workflow.blocks.append(block)
+                with block:
+                    return fn(*args, **kw)
+
+            return wrapper
+
+        return decorator
+
+    _rdf_type = PROVWF.Block
+
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        yield from super()._triples(context)
 
         # add in type
         if self.__class__.__name__ != "Block":
-            g.add((self.uri, RDFS.subClassOf, PROVWF.Block))
-            g.add((self.uri, RDF.type, self.class_uri))
-            g.remove((self.uri, RDF.type, PROV.Activity))
+            yield self.uri, RDFS.subClassOf, PROVWF.Block
+            yield self.uri, RDF.type, self.class_uri
 
         # soft typing using the version_uri
         if self.version_uri is not None:
-            g.add(
-                (
-                    self.uri,
-                    OWL.versionIRI,
-                    Literal(str(self.version_uri), datatype=XSD.anyURI),
-                )
+            yield self.uri, OWL.versionIRI, Literal(
+                str(self.version_uri), datatype=XSD.anyURI
             )
 
-        return g
+        if self.resource_usage is not None:
+            yield from self.resource_usage.triples(self.uri)
+
+        if self.memoized_from is not None:
+            yield self.uri, PROV.wasInfluencedBy, self.memoized_from
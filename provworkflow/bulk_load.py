@@ -0,0 +1,157 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from rdflib import URIRef
+
+from .ntriples import nt_line, nt_term
+
+# the most bytes of triples sent in a single INSERT DATA request, well under common endpoint request size limits
+DEFAULT_MAX_BYTES = 1 << 20
+# the most INSERT DATA requests sent at once
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class BulkLoadReport:
+    """The outcome of a bulk_insert_data() load"""
+
+    def __init__(self):
+        self.triples = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    @property
+    def triples_per_second(self) -> float:
+        return self.triples / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"BulkLoadReport(triples={self.triples}, batches={self.batches}, seconds={self.seconds:.3f}, "
+            f"triples_per_second={self.triples_per_second:.0f})"
+        )
+
+
+def iter_insert_data(
+    triples: Iterable[tuple],
+    graph_uri: Optional[URIRef] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> Iterator[Tuple[str, int]]:
+    """Lazily splits triples into SPARQL INSERT DATA queries of at most about max_bytes of triples each
+
+    :param triples: (subject, predicate, object) triples or (subject, predicate, object, graph) quads, e.g. from a
+        ProvReporter's iter_triples() or iter_quads()
+    :type triples: Iterable[tuple]
+
+    :param graph_uri: The named graph of triples, and of quads whose graph is None. If None, the default graph,
+        defaults to None
+    :type graph_uri: URIRef, optional
+
+    :param max_bytes: The most UTF-8 bytes of triples in a query. A single triple larger than this is sent on its own,
+        defaults to DEFAULT_MAX_BYTES
+    :type max_bytes: int, optional
+
+    :return: An iterator of (query, number of triples in the query) pairs
+    :rtype: Iterator[Tuple[str, int]]
+    """
+    # the triples of the current query, as runs of lines in the same graph
+    segments = []
+    lines = []
+    graph = None
+    size = 0
+    count = 0
+    for t in triples:
+        g = t[3] if len(t) == 4 and t[3] is not None else graph_uri
+        line = nt_line(t[0], t[1], t[2])
+        line_size = len(line) if line.isascii() else len(line.encode("utf-8"))
+
+        if count and size + line_size > max_bytes:
+            segments.append((graph, lines))
+            yield _insert_data(segments), count
+            segments, lines, size, count = [], [], 0, 0
+        elif lines and g != graph:
+            segments.append((graph, lines))
+            lines = []
+
+        graph = g
+        lines.append(line)
+        size += line_size
+        count += 1
+
+    if count:
+        segments.append((graph, lines))
+        yield _insert_data(segments), count
+
+
+def _insert_data(segments) -> str:
+    body = []
+    for graph, lines in segments:
+        if graph is None:
+            body.extend(lines)
+        else:
+            body.append(f"GRAPH {nt_term(URIRef(graph))} {{\n")
+            body.extend(lines)
+            body.append("}\n")
+    return "INSERT DATA {\n" + "".join(body) + "}"
+
+
+def bulk_insert_data(
+    triples: Iterable[tuple],
+    update: Callable[[str], object],
+    graph_uri: Optional[URIRef] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+) -> BulkLoadReport:
+    """Loads triples into a SPARQL endpoint as a series of size-bounded INSERT DATA queries, sent concurrently.
+
+    Triples are read lazily and only max_in_flight queries are built or sent at a time, so memory use is bounded
+    however many triples there are. Queries may be applied in any order.
+
+    :param triples: As per iter_insert_data()
+    :type triples: Iterable[tuple]
+
+    :param update: Sends a single SPARQL update query, raising an exception if it fails, e.g. SopClient.insert_data()
+        uses SopClient.query(). It's called from several threads at once, so should send over pooled connections
+    :type update: Callable[[str], object]
+
+    :param graph_uri: As per iter_insert_data()
+    :type graph_uri: URIRef, optional
+
+    :param max_bytes: As per iter_insert_data()
+    :type max_bytes: int, optional
+
+    :param max_in_flight: The most queries sent at once, defaults to DEFAULT_MAX_IN_FLIGHT
+    :type max_in_flight: int, optional
+
+    :return: The number of triples and queries sent and how long that took
+    :rtype: BulkLoadReport
+    """
+    report = BulkLoadReport()
+    start = time.perf_counter()
+
+    def send(query: str, n: int) -> int:
+        update(query)
+        return n
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        pending = set()
+        try:
+            for query, n in iter_insert_data(triples, graph_uri, max_bytes):
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _collect(done, report)
+                pending.add(pool.submit(send, query, n))
+            done, pending = wait(pending)
+            _collect(done, report)
+        finally:
+            # after a failure, don't send queries that haven't started
+            for f in pending:
+                f.cancel()
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _collect(done, report: BulkLoadReport):
+    for f in done:
+        report.triples += f.result()
+        report.batches += 1
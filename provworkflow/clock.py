@@ -0,0 +1,135 @@
+import itertools
+import threading
+import time
+from datetime import datetime, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional, Union
+
+from rdflib import Literal
+from rdflib.namespace import XSD
+
+from .exceptions import ProvWorkflowException
+
+# the number of fractional second digits written for each precision
+PRECISIONS = {"seconds": 0, "milliseconds": 3, "microseconds": 6, "nanoseconds": 9}
+DEFAULT_PRECISION = "microseconds"
+
+
+class Clock:
+    """Timestamps ProvReporters' created, startedAtTime & endedAtTime values.
+
+    Timestamps are captured as integer nanoseconds since the epoch, which is all a ProvReporter stores, and are only
+    formatted as xsd:dateTimeStamps, with a timezone lookup, on export.
+
+    Times are read from the monotonic clock, anchored to the wall clock once when the Clock is created, so they never
+    go backwards and differences between them, such as Block durations, are accurate even if the system clock is
+    adjusted during a run.
+
+    :param precision: The fractional seconds written on export: "seconds", "milliseconds", "microseconds" or
+        "nanoseconds", defaults to DEFAULT_PRECISION
+    :type precision: str, optional
+
+    :param tz: The timezone timestamps are written in. If None, the local timezone, defaults to None
+    :type tz: tzinfo, optional
+    """
+
+    def __init__(self, precision: str = DEFAULT_PRECISION, tz: tzinfo = None):
+        if precision not in PRECISIONS:
+            raise ProvWorkflowException(
+                f"A Clock's precision must be one of {', '.join(PRECISIONS)}, not {precision}"
+            )
+        self.precision = precision
+        self.tz = tz
+        self._digits = PRECISIONS[precision]
+        self._epoch_ns = time.time_ns()
+        self._monotonic_ns = time.monotonic_ns()
+
+    def now(self) -> int:
+        """Returns the current time in nanoseconds since the epoch"""
+        return self._epoch_ns + time.monotonic_ns() - self._monotonic_ns
+
+    def format(self, ns: int) -> str:
+        """Formats a time, in nanoseconds since the epoch, as an xsd:dateTimeStamp to this Clock's precision"""
+        seconds, fraction = divmod(ns, 1_000_000_000)
+        date_time, offset = _format_seconds(seconds, self.tz)
+        if self._digits == 0:
+            return f"{date_time}{offset}"
+        return (
+            f"{date_time}.{fraction:09d}"[: len(date_time) + 1 + self._digits] + offset
+        )
+
+    def to_literal(self, timestamp: Union[int, str]) -> Literal:
+        """Returns a timestamp as an xsd:dateTimeStamp Literal. Timestamps may be nanoseconds since the epoch, as made by
+        now(), or already formatted strings, as set by hand"""
+        if type(timestamp) == int:
+            timestamp = self.format(timestamp)
+        return Literal(timestamp, datatype=XSD.dateTimeStamp)
+
+
+class DeterministicClock(Clock):
+    """A Clock for tests & replays that starts at a given time and advances by a fixed step each time it is read, so
+    that the same run always records the same timestamps
+
+    :param start: The first time returned, in nanoseconds since the epoch, defaults to 0
+    :type start: int, optional
+
+    :param step: The nanoseconds the clock advances by after each read, defaults to one second
+    :type step: int, optional
+
+    :param precision: As per Clock, defaults to DEFAULT_PRECISION
+    :type precision: str, optional
+
+    :param tz: As per Clock but defaults to UTC, so that output doesn't depend on where it's run
+    :type tz: tzinfo, optional
+    """
+
+    def __init__(
+        self,
+        start: int = 0,
+        step: int = 1_000_000_000,
+        precision: str = DEFAULT_PRECISION,
+        tz: tzinfo = timezone.utc,
+    ):
+        super().__init__(precision=precision, tz=tz)
+        # next() on an itertools.count is atomic so threads never read the same time
+        self._counter = itertools.count(start, step)
+
+    def now(self) -> int:
+        return next(self._counter)
+
+
+@lru_cache(maxsize=4096)
+def _format_seconds(seconds: int, tz: Optional[tzinfo]):
+    # cached as the many timestamps of a run share few seconds, and finding the local timezone's offset is slow
+    iso = datetime.fromtimestamp(seconds, tz=timezone.utc).astimezone(tz).isoformat()
+    return iso[:19], iso[19:]
+
+
+_lock = threading.Lock()
+_clock: Optional[Clock] = None
+
+
+def get_clock() -> Clock:
+    """Gets the Clock that ProvReporters are timestamped by. This is a Clock at DEFAULT_PRECISION unless set_clock() has
+    been called
+
+    :return: The Clock
+    :rtype: Clock
+    """
+    global _clock
+    if _clock is None:
+        with _lock:
+            if _clock is None:
+                _clock = Clock()
+    return _clock
+
+
+def set_clock(clock: Optional[Clock]):
+    """Sets the Clock that ProvReporters are timestamped by, e.g. set_clock(Clock(precision="seconds")) for ProvWF's
+    original, whole second, timestamps or a DeterministicClock in tests. None restores the default
+
+    :param clock: The Clock
+    :type clock: Clock
+    """
+    global _clock
+    _clock = clock
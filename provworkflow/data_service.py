@@ -1,11 +1,12 @@
-from typing import List
-from rdflib import Graph, URIRef, Literal
-from rdflib.namespace import DCAT, PROV, RDF, XSD
+from typing import Iterator, List
+from rdflib import URIRef
+from rdflib.namespace import DCAT
 
 from .namespace import PROVWF
 from .prov_reporter import ProvReporter
 from .agent import Agent
-from .entity import Entity
+from .entity import Entity, _as_list
+from .traversal import TraversalContext, Triple
 
 # from .activity import Activity
 
@@ -51,6 +52,8 @@ class DataService(Entity):
     :type external: bool, optional
     """
 
+    __slots__ = ("access_uri", "service_parameters", "serves_datasets")
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -65,39 +68,25 @@ class DataService(Entity):
         serves_datasets: List[Entity] = None,
         external: bool = None,
     ):
-        super().__init__(uri=uri, label=label, named_graph_uri=named_graph_uri)
-
-        self.value = Literal(value) if value is not None else None
-        self.access_uri = (
-            Literal(access_uri, datatype=XSD.anyURI) if access_uri is not None else None
-        )
-        self.service_parameters = (
-            Literal(service_parameters) if service_parameters is not None else None
+        super().__init__(
+            uri=uri, label=label, named_graph_uri=named_graph_uri, value=value
         )
-        if type(was_used_by) != list:
-            self.was_used_by = [was_used_by]
-        else:
-            self.was_used_by = was_used_by
-        if type(was_generated_by) != list:
-            self.was_generated_by = [was_generated_by]
-        else:
-            self.was_used_by = was_used_by
+
+        # kept as given, not as Literals
+        self.access_uri = access_uri
+        self.service_parameters = service_parameters
+        self.was_used_by = _as_list(was_used_by)
+        self.was_generated_by = _as_list(was_generated_by)
         self.was_attributed_to = was_attributed_to
         self.serves_datasets = serves_datasets
         self.external = external
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
-
-        g.bind("dcat", DCAT)
+    _rdf_type = DCAT.DataService
 
-        # add in type
-        g.add((self.uri, RDF.type, DCAT.DataService))
-        g.remove((self.uri, RDF.type, PROV.Entity))
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        yield from super()._triples(context)
 
         if self.serves_datasets is not None:
             for d in self.serves_datasets:
-                d.prov_to_graph(g)
-                g.add((self.uri, DCAT.servesDataset, d.uri))
-
-        return g
+                context.schedule(d)
+                yield self.uri, DCAT.servesDataset, d.uri
@@ -1,10 +1,12 @@
 from __future__ import annotations
-from rdflib import Graph, URIRef, Literal
-from rdflib.namespace import DCAT, PROV, RDF, XSD
+from typing import Iterator, Optional
+
+from rdflib import URIRef, Literal
+from rdflib.namespace import PROV, XSD
 
-from .namespace import PROVWF
 from .prov_reporter import ProvReporter
 from .agent import Agent
+from .traversal import TraversalContext, Triple
 
 # from .activity import Activity
 
@@ -23,7 +25,10 @@ class Entity(ProvReporter):
     :type named_graph_uri: Union[URIRef, str], optional
 
     :param value: (prov:value) should be used to contain any Python object - str, fancy class, whatever - so data can
-        be exchanged within the workflow. When reported to PROV, this variable is converted to a Literal
+        be exchanged within the workflow. When reported to PROV, this variable is converted to a typed Literal or, if
+        large and a BlobStore is set, stored out of line and referenced, see values.ValuePolicy, and its digest, see
+        Entity.digest, is reported as an spdx:checksum. A file may be given as a pathlib.Path, whose digest is of the
+        file's contents
 
     :param was_used_by: The inverse of prov:used: this indicates which Activities prov:used this Entity
     :type was_used_by: Activity, optional
@@ -43,6 +48,16 @@ class Entity(ProvReporter):
     :type external: bool, optional
     """
 
+    __slots__ = (
+        "_value",
+        "_digest",
+        "was_used_by",
+        "was_generated_by",
+        "was_attributed_to",
+        "was_revision_of",
+        "external",
+    )
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -55,53 +70,81 @@ class Entity(ProvReporter):
         was_revision_of: Entity = None,
         external: bool = None,
     ):
+        # kept as given: it's only made a Literal on export. Set first as URIs may be minted from it
+        self.value = value
         super().__init__(uri=uri, label=label, named_graph_uri=named_graph_uri)
 
-        self.value = value
-        if type(was_used_by) != list:
-            self.was_used_by = [was_used_by]
-        else:
-            self.was_used_by = was_used_by
-        if type(was_generated_by) != list:
-            self.was_generated_by = [was_generated_by]
-        else:
-            self.was_used_by = was_used_by
+        # None, rather than an empty list, when not given as most Entities are only used or generated by a Block
+        self.was_used_by = _as_list(was_used_by)
+        self.was_generated_by = _as_list(was_generated_by)
         self.was_attributed_to = was_attributed_to
         self.was_revision_of = was_revision_of
         self.external = external
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._digest = None
 
-        g.bind("dcat", DCAT)
+    @property
+    def digest(self) -> Optional[str]:
+        """The digest of this Entity's value, see hashing.digest_value(), e.g. "sha256:9f86d0...". It is computed when
+        first needed, by streaming the value through the hash, and kept until the value is replaced. None if there is no
+        value or it can't be hashed, e.g. a file that doesn't exist or an object with no canonical encoding, see
+        hashing.register_serialiser(). It may be set, to a digest computed elsewhere"""
+        if self._digest is None and self._value is not None:
+            # imported here as most Entities are never hashed outside of an export
+            from .hashing import digest_value
 
-        # add in type
-        g.add((self.uri, RDF.type, PROV.Entity))
-        g.remove((self.uri, RDF.type, PROVWF.ProvReporter))
+            try:
+                self._digest = digest_value(self._value)
+            except (OSError, TypeError, ValueError):
+                return None
+        return self._digest
 
-        if self.value is not None:
-            g.add((self.uri, PROV.value, Literal(self.value)))
+    @digest.setter
+    def digest(self, digest: Optional[str]):
+        self._digest = digest
 
-        if all(self.was_used_by):
+    _rdf_type = PROV.Entity
+
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        yield from super()._triples(context)
+
+        if self._value is not None:
+            # imported here, as per digest, to keep values & its dependencies out of "import provworkflow"
+            from .values import get_value_policy
+
+            yield from get_value_policy().triples(self)
+
+        if self.was_used_by is not None and all(self.was_used_by):
             for a in self.was_used_by:
-                a.prov_to_graph(g)
-                g.add((a.uri, PROV.used, self.uri))
+                context.schedule(a)
+                yield a.uri, PROV.used, self.uri
 
-        if all(self.was_generated_by):
+        if self.was_generated_by is not None and all(self.was_generated_by):
             for a in self.was_generated_by:
-                a.prov_to_graph(g)
-                g.add((a.uri, PROV.generated, self.uri))
+                context.schedule(a)
+                yield a.uri, PROV.generated, self.uri
 
         if self.was_attributed_to is not None:
-            self.was_attributed_to.prov_to_graph(g)
-            g.add((self.uri, PROV.wasAttributedTo, self.was_attributed_to.uri))
+            context.schedule(self.was_attributed_to)
+            yield self.uri, PROV.wasAttributedTo, self.was_attributed_to.uri
 
         if self.was_revision_of is not None:
-            self.was_revision_of.prov_to_graph(g)
-            g.add((self.uri, PROV.wasRevisionOf, self.was_revision_of.uri))
+            context.schedule(self.was_revision_of)
+            yield self.uri, PROV.wasRevisionOf, self.was_revision_of.uri
 
         if self.external:
             # this will be removed if present within a Workflow. The Workflow will create other necessary triples
-            g.add((self.uri, PROV.wasAttributedTo, Literal("Workflow")))
+            yield self.uri, PROV.wasAttributedTo, Literal("Workflow")
+
 
-        return g
+def _as_list(activities) -> Optional[list]:
+    if activities is None:
+        return None
+    return activities if type(activities) == list else [activities]
@@ -1,6 +1,5 @@
 from .entity import Entity
-from rdflib import Graph, URIRef, Literal
-from rdflib.namespace import PROV, RDF
+from rdflib import URIRef
 from .prov_reporter import PROVWF
 
 
@@ -22,22 +21,19 @@ class ErrorEntity(Entity):
     :type value: Literal, optional
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         label: str = None,
         named_graph_uri: URIRef = None,
         value: str = None,
     ):
-        super().__init__(label=label, named_graph_uri=named_graph_uri)
-
-        self.label = Literal(label) if label is not None else "ERROR"
-        self.value = Literal(value) if value is not None else "ERROR"
-
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
-
-        # add in type
-        g.add((self.uri, RDF.type, PROVWF.ErrorEntity))
-        g.remove((self.uri, RDF.type, PROV.Entity))
-
-        return g
+        # the value passed up, not set after, as URIs may be minted from it
+        super().__init__(
+            label=label if label is not None else "ERROR",
+            named_graph_uri=named_graph_uri,
+            value=value if value is not None else "ERROR",
+        )
+
+    _rdf_type = PROVWF.ErrorEntity
@@ -0,0 +1,189 @@
+import pickle
+import zlib
+from array import array
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib import URIRef
+from rdflib.term import Node
+
+from .block import Block
+from .ntriples import nt_term, parse_nt_term
+from .traversal import Quad, TraversalContext
+
+# the typecode of the arrays of term indexes a Fragment's triples are held in
+_INDEX = "I"
+
+
+class Fragment:
+    """The provenance of Blocks run in another process, such as a ProcessPoolExecutor worker, compactly serialised for
+    returning to, and merging into, a Workflow in the parent process with Workflow.merge().
+
+    Returning the Blocks themselves would pickle every Entity & Agent they reference, including each worker's copy of
+    those shared with the parent, and the parent would then have to export them all again. A Fragment instead holds
+    each distinct term once, in its N-Triples form, and each node's triples as an array of indexes into those terms,
+    keyed by the node's URI. Nodes are the same if they have the same URI, as per TraversalContext, so a node in more than
+    one Fragment, or already in the parent's own export, is skipped on export by a set lookup rather than compared triple
+    by triple.
+
+    In the worker:
+
+        blocks = ...
+        return capture(blocks, known=[agent.uri])
+
+    and in the parent:
+
+        workflow.merge(future.result())
+
+    :param blocks: The URIs of the captured Blocks, defaults to None
+    :type blocks: List[URIRef], optional
+    """
+
+    __slots__ = ("blocks", "terms", "nodes")
+
+    def __init__(self, blocks: List[URIRef] = None):
+        self.blocks = blocks if blocks is not None else []
+        # the N-Triples form of each term
+        self.terms: List[str] = []
+        # each node's URI and its named graph, or None for the default graph, and triples, as a flat array of indexes
+        # into terms
+        self.nodes: Dict[str, Tuple[Optional[str], array]] = {}
+
+    def __len__(self) -> int:
+        """The number of nodes in this Fragment"""
+        return len(self.nodes)
+
+    def __getstate__(self):
+        # terms share long prefixes, such as minted URIs' & datatypes' namespaces, so compress well, and quickly
+        return zlib.compress(
+            pickle.dumps(
+                (self.blocks, self.terms, self.nodes), pickle.HIGHEST_PROTOCOL
+            ),
+            1,
+        )
+
+    def __setstate__(self, state):
+        self.blocks, self.terms, self.nodes = pickle.loads(zlib.decompress(state))
+
+    def iter_quads(self, context: TraversalContext = None) -> Iterator[Quad]:
+        """Yields the quads of each node in this Fragment that has not already been visited in the given export, marking
+        each as visited. Nodes with no named graph of their own are in the context's default_graph.
+
+        :param context: The state of the export this call is part of. If None, a new export is started, defaults to None
+        :type context: TraversalContext, optional
+
+        :return: An iterator of (subject, predicate, object, graph) quads
+        :rtype: Iterator[Quad]
+        """
+        if context is None:
+            context = TraversalContext()
+        visited = context.visited
+        # each term is parsed once, when first needed
+        terms = [None] * len(self.terms)
+
+        def term(i):
+            t = terms[i]
+            if t is None:
+                t = terms[i] = parse_nt_term(self.terms[i])
+            return t
+
+        for uri, (graph, triples) in self.nodes.items():
+            uri = URIRef(uri)
+            if uri in visited:
+                continue
+            visited.add(uri)
+            graph = URIRef(graph) if graph is not None else context.default_graph
+            for n in range(0, len(triples), 3):
+                yield term(triples[n]), term(triples[n + 1]), term(
+                    triples[n + 2]
+                ), graph
+
+    def iter_nquads(
+        self,
+        context: TraversalContext = None,
+        observe: Callable[[Node, Node, Node], None] = None,
+        predicates: Collection[URIRef] = (),
+    ) -> Iterator[str]:
+        """As per iter_quads() but yields each quad as an N-Quads line, made from its terms' N-Triples forms as they were
+        captured, so that writing a Fragment to an N-Triples or N-Quads file doesn't parse and re-serialise every term.
+
+        :param context: The state of the export this call is part of. If None, a new export is started, defaults to None
+        :type context: TraversalContext, optional
+
+        :param observe: A function called with each (subject, predicate, object) triple, parsed, whose predicate is one
+            of predicates, defaults to None
+        :type observe: Callable[[Node, Node, Node], None], optional
+
+        :param predicates: The predicates of the triples passed to observe, defaults to ()
+        :type predicates: Collection[URIRef], optional
+
+        :return: An iterator of N-Quads lines, each ending with a newline
+        :rtype: Iterator[str]
+        """
+        if context is None:
+            context = TraversalContext()
+        visited = context.visited
+        terms = self.terms
+        observed = {nt_term(p) for p in predicates} if observe is not None else ()
+        observed = {i for i, t in enumerate(terms) if t in observed}
+        parsed = {}
+
+        def term(i):
+            t = parsed.get(i)
+            if t is None:
+                t = parsed[i] = parse_nt_term(terms[i])
+            return t
+
+        default_graph = context.default_graph
+        default_end = (
+            f" {nt_term(default_graph)} .\n" if default_graph is not None else " .\n"
+        )
+        for uri, (graph, triples) in self.nodes.items():
+            uri = URIRef(uri)
+            if uri in visited:
+                continue
+            visited.add(uri)
+            end = f" <{graph}> .\n" if graph is not None else default_end
+            for n in range(0, len(triples), 3):
+                s, p, o = triples[n], triples[n + 1], triples[n + 2]
+                yield f"{terms[s]} {terms[p]} {terms[o]}{end}"
+                if p in observed:
+                    observe(term(s), term(p), term(o))
+
+
+def capture(blocks: Iterable[Block], known: Iterable[URIRef] = ()) -> Fragment:
+    """Captures the provenance of Blocks, and all the nodes they reference, as a Fragment, e.g. in a worker process for
+    returning to the parent process.
+
+    :param blocks: The Blocks
+    :type blocks: Iterable[Block]
+
+    :param known: The URIs of nodes the parent process already has, such as a shared Agent, which are referenced but not
+        captured, defaults to ()
+    :type known: Iterable[URIRef], optional
+
+    :return: The Fragment
+    :rtype: Fragment
+    """
+    context = TraversalContext()
+    context.visited.update(URIRef(uri) for uri in known)
+    fragment = Fragment()
+    for b in blocks:
+        context.schedule(b)
+        fragment.blocks.append(b.uri)
+
+    terms = fragment.terms
+    indexes = {}
+    nodes = fragment.nodes
+    while context.queue:
+        node = context.queue.popleft()
+        triples = array(_INDEX)
+        for triple in node._triples(context):
+            for t in triple:
+                i = indexes.get(t)
+                if i is None:
+                    i = indexes[t] = len(terms)
+                    terms.append(nt_term(t))
+                triples.append(i)
+        graph = node.named_graph_uri
+        nodes[str(node.uri)] = str(graph) if graph is not None else None, triples
+    return fragment
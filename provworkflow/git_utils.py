@@ -18,18 +18,19 @@ def get_git_repo(starting_dir: Path = None):
     else:
         p = Path.cwd().resolve()
 
-    if p == Path("/"):
-        return None
+    # walk up, rather than recurse up, the directory tree
+    while p != Path("/"):
+        if is_git_repo(p):
+            return p
+        p = p.parent.resolve()
 
-    if is_git_repo(p):
-        return p
-    else:
-        return get_git_repo(p.parent.resolve())
+    return None
 
 
-def get_tag_or_commit(only_commit=False):
+def get_tag_or_commit(only_commit=False, repo: git.Repo = None):
     """Gets a file's Git commit or Tag. Can be forced to get only the commit"""
-    repo = git.Repo(get_git_repo())
+    if repo is None:
+        repo = git.Repo(get_git_repo())
     if only_commit:
         return repo.heads.master.commit
 
@@ -39,12 +40,13 @@ def get_tag_or_commit(only_commit=False):
         return repo.heads.master.commit
 
 
-def get_repo_uri():
+def get_repo_uri(repo: git.Repo = None):
     """Gets the URI of a file's repo's origin"""
-    repo_dir = get_git_repo()
-    if repo_dir is None:
-        return None
-    repo = git.Repo(repo_dir)
+    if repo is None:
+        repo_dir = get_git_repo()
+        if repo_dir is None:
+            return None
+        repo = git.Repo(repo_dir)
     origin_uri_with_user = repo.remotes.origin.url
     if origin_uri_with_user.find("@") >= 0:
         origin_uri_with_user = "https://" + origin_uri_with_user.split("@")[1]
@@ -53,10 +55,13 @@ def get_repo_uri():
 
 def get_version_uri():
     """Gets the URI of a file's origin's commit or tag"""
-    repo_uri = get_repo_uri()
-    if repo_uri is None:
+    # the repo is found & opened once, not once per step
+    repo_dir = get_git_repo()
+    if repo_dir is None:
         return None
-    id_ = str(get_tag_or_commit())
+    repo = git.Repo(repo_dir)
+    repo_uri = get_repo_uri(repo)
+    id_ = str(get_tag_or_commit(repo=repo))
 
     if "bitbucket" in repo_uri:
         if len(id_) < 10:  # tag
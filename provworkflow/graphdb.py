@@ -0,0 +1,254 @@
+import os
+import threading
+from typing import Iterable, Optional, Union
+from urllib.parse import urljoin
+
+from rdflib import URIRef
+
+from .exceptions import ProvWorkflowException
+from .ntriples import DEFAULT_BUFFER_SIZE, iter_chunks
+
+
+class GraphDBClient:
+    """A client that uploads provenance to a GraphDB, or any other RDF4J, repository through the RDF4J transactions API.
+
+    Each upload begins a transaction, streams its statements as chunked N-Quads request bodies, and commits, so a
+    multi-million-triple run is uploaded without its serialisation, or a graph of it, ever being held in memory. If
+    anything fails, the transaction is rolled back and nothing is stored. Requests share a session, so reuse
+    keep-alive connections.
+
+    requests is only imported when a client is first used, keeping it out of "import provworkflow".
+
+    :param system_uri: The base URI of the GraphDB instance. If None, the GRAPH_DB_SYSTEM_URI environment variable or
+        http://localhost:7200, defaults to None
+    :type system_uri: str, optional
+
+    :param repo_id: The repository's ID. If None, the GRAPH_DB_REPO_ID environment variable, defaults to None
+    :type repo_id: str, optional
+
+    :param username: If None, the GRAPHDB_USR environment variable. If neither, no authentication, defaults to None
+    :type username: str, optional
+
+    :param password: If None, the GRAPHDB_PWD environment variable or "", defaults to None
+    :type password: str, optional
+
+    :param buffer_size: The approximate number of characters sent in each chunk, defaults to DEFAULT_BUFFER_SIZE
+    :type buffer_size: int, optional
+
+    :param timeout: Seconds to wait for each HTTP response. If None, wait indefinitely, defaults to None
+    :type timeout: float, optional
+    """
+
+    def __init__(
+        self,
+        system_uri: str = None,
+        repo_id: str = None,
+        username: str = None,
+        password: str = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        timeout: float = None,
+    ):
+        self.system_uri = (
+            system_uri
+            if system_uri is not None
+            else os.environ.get("GRAPH_DB_SYSTEM_URI", "http://localhost:7200")
+        ).rstrip("/")
+        self.repo_id = (
+            repo_id if repo_id is not None else os.environ.get("GRAPH_DB_REPO_ID")
+        )
+        if not self.repo_id:
+            raise ProvWorkflowException(
+                "A GraphDB repository ID must be given, or set in the GRAPH_DB_REPO_ID environment variable"
+            )
+        self.username = (
+            username if username is not None else os.environ.get("GRAPHDB_USR")
+        )
+        self.password = (
+            password if password is not None else os.environ.get("GRAPHDB_PWD", "")
+        )
+        self.buffer_size = buffer_size
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._session = None
+
+    @property
+    def repository_uri(self) -> str:
+        return f"{self.system_uri}/repositories/{self.repo_id}"
+
+    def transaction(self) -> "Transaction":
+        """Begins a transaction. Used as a context manager, it commits if its block succeeds and rolls back if not
+
+        :return: The transaction
+        :rtype: Transaction
+        """
+        response = self._get_session().post(
+            self.repository_uri + "/transactions", timeout=self.timeout
+        )
+        _check(response, "begin a transaction in", self.repository_uri)
+        location = response.headers.get("Location")
+        if location is None:
+            raise ProvWorkflowException(
+                f"GraphDB at {self.repository_uri} did not return a transaction location"
+            )
+        return Transaction(self, urljoin(self.repository_uri + "/", location))
+
+    def upload(
+        self, triples: Iterable[tuple], graph_uri: Union[URIRef, str] = None
+    ) -> int:
+        """Streams triples or quads, e.g. from a ProvReporter's iter_quads(), into the repository in a single
+        transaction
+
+        :param triples: (subject, predicate, object) triples or (subject, predicate, object, graph) quads
+        :type triples: Iterable[tuple]
+
+        :param graph_uri: The named graph of triples, and of quads whose graph is None. If None, the default graph,
+            defaults to None
+        :type graph_uri: Union[URIRef, str], optional
+
+        :return: The number of statements uploaded
+        :rtype: int
+        """
+        with self.transaction() as txn:
+            return txn.add(triples, graph_uri)
+
+    def close(self):
+        """Closes this client's connections. The client opens new ones if used afterwards"""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+
+                self._session = requests.Session()
+                if self.username:
+                    self._session.auth = (self.username, self.password)
+            return self._session
+
+
+class Transaction:
+    """An RDF4J transaction, begun by GraphDBClient.transaction(). Statements added to it are only visible in the
+    repository once it's committed"""
+
+    def __init__(self, client: GraphDBClient, uri: str):
+        self.client = client
+        self.uri = uri
+        self.open = True
+
+    def add(
+        self, triples: Iterable[tuple], graph_uri: Union[URIRef, str] = None
+    ) -> int:
+        """Streams triples or quads into the transaction as a chunked N-Quads request body
+
+        :param triples: As per GraphDBClient.upload()
+        :type triples: Iterable[tuple]
+
+        :param graph_uri: As per GraphDBClient.upload()
+        :type graph_uri: Union[URIRef, str], optional
+
+        :return: The number of statements added
+        :rtype: int
+        """
+        graph = URIRef(graph_uri) if graph_uri is not None else None
+        count = 0
+
+        def quads():
+            nonlocal count
+            for t in triples:
+                count += 1
+                if len(t) == 4 and t[3] is not None:
+                    yield t
+                else:
+                    yield t[0], t[1], t[2], graph
+
+        self.add_data(
+            iter_chunks(quads(), self.client.buffer_size), "application/n-quads"
+        )
+        return count
+
+    def add_data(
+        self,
+        data: Union[str, bytes, Iterable[bytes]],
+        content_type: str,
+        graph_uri: Union[URIRef, str] = None,
+    ):
+        """Adds serialised RDF, e.g. Turtle, to the transaction. An iterable of bytes is sent as a chunked body
+
+        :param data: The RDF, or chunks of it
+        :type data: Union[str, bytes, Iterable[bytes]]
+
+        :param content_type: The RDF's media type, e.g. "text/turtle"
+        :type content_type: str
+
+        :param graph_uri: The named graph of RDF in a triples format. If None, the default graph, defaults to None
+        :type graph_uri: Union[URIRef, str], optional
+        """
+        params = {"action": "ADD"}
+        if graph_uri is not None:
+            params["context"] = f"<{graph_uri}>"
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._put(params, data, {"Content-Type": f"{content_type}; charset=utf-8"})
+
+    def commit(self):
+        """Commits the transaction or, if that fails, rolls it back, so that it isn't left open on the server"""
+        try:
+            self._put({"action": "COMMIT"})
+        except Exception:
+            try:
+                self.rollback()
+            except Exception:
+                # the commit's failure is the one reported. The server may already have ended the transaction
+                pass
+            raise
+        self.open = False
+
+    def rollback(self):
+        if self.open:
+            self.open = False
+            response = self.client._get_session().delete(
+                self.uri, timeout=self.client.timeout
+            )
+            _check(response, "roll back a transaction in", self.client.repository_uri)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def _put(self, params: dict, data=None, headers: Optional[dict] = None):
+        if not self.open:
+            raise ProvWorkflowException(f"The transaction {self.uri} is not open")
+        response = self.client._get_session().put(
+            self.uri,
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=self.client.timeout,
+        )
+        _check(
+            response,
+            f"{params['action'].lower()} a transaction in",
+            self.client.repository_uri,
+        )
+
+
+def _check(response, action: str, uri: str):
+    if not response.ok:
+        raise ProvWorkflowException(
+            f"Could not {action} GraphDB at {uri}: {response.status_code} {response.text}"
+        )
@@ -0,0 +1,315 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from datetime import date, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+# the hash algorithm of Entities' digests, one of hashlib's
+DEFAULT_ALGORITHM = "sha256"
+# the bytes, or characters, hashed at a time: large enough that hashlib releases the GIL while hashing each
+CHUNK_SIZE = 1 << 20
+# the path of a database in which file digests are kept between runs. If not set, they're kept for this process only
+HASH_CACHE_ENV = "PROVWF_HASH_CACHE"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+"""
+
+
+def _hash_buffer(h, data):
+    view = memoryview(data).cast("B")
+    for start in range(0, len(view), CHUNK_SIZE):
+        h.update(view[start : start + CHUNK_SIZE])
+
+
+class NotCanonical(TypeError):
+    """Raised by serialisers, see register_serialiser(), of values that have no canonical encoding"""
+
+
+# serialisers of values to canonical bytes, by type, see register_serialiser(). Built-in types are encoded by
+# _Encoder itself
+_serialisers: Dict[type, Callable[[object], bytes]] = {}
+
+
+def register_serialiser(type_: type, serialiser: Callable[[object], bytes]):
+    """Registers how values of a type, and its subclasses, are encoded for hashing, e.g. a pandas DataFrame as its
+    Parquet bytes. The encoding must be canonical: equal values must give equal bytes, whatever the process, the
+    interpreter's hash seed or the order in which the value was built
+
+    :param type_: The type
+    :type type_: type
+
+    :param serialiser: A function of a value returning its canonical encoding
+    :type serialiser: Callable[[object], bytes]
+    """
+    _serialisers[type_] = serialiser
+
+
+def _serialiser(type_: type) -> Optional[Callable[[object], bytes]]:
+    for t in type_.__mro__:
+        serialiser = _serialisers.get(t)
+        if serialiser is not None:
+            return serialiser
+    return None
+
+
+class _Encoder:
+    """Encodes a value canonically, each part tagged by its type & length-prefixed, with dicts' items and sets'
+    members sorted by their encodings, so that equal values are encoded alike whatever their insertion order or the
+    interpreter's hash seed. Encodings are passed on a chunk at a time, other than those of dicts' items & sets' members,
+    which are sorted whole"""
+
+    __slots__ = ("write", "buffer")
+
+    def __init__(self, write: Callable[[bytes], object]):
+        self.write = write
+        self.buffer = bytearray()
+
+    def flush(self):
+        if self.buffer:
+            self.write(self.buffer)
+            self.buffer = bytearray()
+
+    def header(self, tag: bytes, length: int):
+        self.buffer += tag
+        self.buffer += struct.pack(">Q", length)
+
+    def part(self, tag: bytes, data):
+        self.header(tag, len(data))
+        self.buffer += data
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+
+    def encode(self, value):
+        # bool before int, as bools are ints
+        if value is None:
+            self.part(b"N", b"")
+        elif isinstance(value, bool):
+            self.part(b"B", b"\x01" if value else b"\x00")
+        elif isinstance(value, int):
+            self.part(
+                b"i", value.to_bytes((value.bit_length() + 8) // 8, "big", signed=True)
+            )
+        elif isinstance(value, float):
+            self.part(b"f", value.hex().encode("ascii"))
+        elif isinstance(value, str):
+            self.part(b"s", value.encode("utf-8"))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            self.part(b"b", memoryview(value).cast("B"))
+        elif isinstance(value, (list, tuple)):
+            self.header(b"l" if isinstance(value, list) else b"t", len(value))
+            for item in value:
+                self.encode(item)
+        elif isinstance(value, dict):
+            self.sorted(b"d", [_encode(k) + _encode(v) for k, v in value.items()])
+        elif isinstance(value, (set, frozenset)):
+            self.sorted(b"S", [_encode(member) for member in value])
+        elif isinstance(value, Decimal):
+            self.part(b"D", str(value.normalize()).encode("ascii"))
+        elif isinstance(value, (date, time, timedelta)):
+            # tagged by the type's name, as a datetime is a date. A time zone is part of the value
+            self.part(
+                b"T" + type(value).__name__.encode("utf-8") + b"\0",
+                str(value).encode("utf-8"),
+            )
+        else:
+            serialiser = _serialiser(type(value))
+            if serialiser is None:
+                raise NotCanonical(f"{type(value).__name__} has no canonical encoding")
+            self.part(
+                b"x" + type(value).__qualname__.encode("utf-8") + b"\0",
+                serialiser(value),
+            )
+
+    def sorted(self, tag: bytes, encodings):
+        encodings.sort()
+        self.header(tag, len(encodings))
+        for e in encodings:
+            self.buffer += e
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+
+
+def _encode(value) -> bytes:
+    chunks = []
+    encoder = _Encoder(chunks.append)
+    encoder.encode(value)
+    encoder.flush()
+    return b"".join(chunks)
+
+
+class HashCache:
+    """Remembers the digests of files by their path, size & modification time, so that a file isn't hashed again unless
+    it has changed. A file changed without its size or modification time changing, within the file system's timestamp
+    resolution, is not noticed.
+
+    :param path: The path of an SQLite database in which digests are kept between runs, and which several processes may
+        share. If None, digests are kept in memory for this process only, defaults to None
+    :type path: Union[Path, str], optional
+    """
+
+    def __init__(self, path: Union[Path, str] = None):
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._db = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(self.path), timeout=30, check_same_thread=False
+            )
+            self._db.executescript(_SCHEMA)
+
+    def get(self, path: str, algorithm: str, stat: os.stat_result) -> Optional[str]:
+        """Returns the digest of a file if it's known and the file's size & modification time are unchanged"""
+        with self._lock:
+            cached = self._memory.get((path, algorithm))
+            if cached is None and self._db is not None:
+                cached = self._db.execute(
+                    "SELECT size, mtime_ns, digest FROM digests WHERE path = ? AND algorithm = ?",
+                    (path, algorithm),
+                ).fetchone()
+        if cached is None or cached[:2] != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return cached[2]
+
+    def put(self, path: str, algorithm: str, stat: os.stat_result, digest: str):
+        entry = (stat.st_size, stat.st_mtime_ns, digest)
+        with self._lock:
+            self._memory[(path, algorithm)] = entry
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?)",
+                        (path, algorithm) + entry,
+                    )
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def digest_file(
+    path: Union[Path, str],
+    algorithm: str = DEFAULT_ALGORITHM,
+    cache: Optional[HashCache] = None,
+) -> str:
+    """Returns the digest of a file's contents, hashed a chunk at a time from a memory map so that files of any size are
+    hashed in constant memory and without copying them into Python objects. Digests are cached by the file's path, size &
+    modification time.
+
+    :param path: The file's path
+    :type path: Union[Path, str]
+
+    :param algorithm: The hash algorithm, defaults to DEFAULT_ALGORITHM, "sha256"
+    :type algorithm: str, optional
+
+    :param cache: Where digests are cached. If None, get_hash_cache(), defaults to None
+    :type cache: HashCache, optional
+
+    :return: The digest, as the algorithm and the hex digest, e.g. "sha256:9f86d0..."
+    :rtype: str
+    """
+    if cache is None:
+        cache = get_hash_cache()
+    path = os.path.realpath(path)
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        digest = cache.get(path, algorithm, stat)
+        if digest is not None:
+            return digest
+
+        h = hashlib.new(algorithm)
+        if stat.st_size > 0:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    _hash_buffer(h, m)
+            except (OSError, ValueError):
+                # not mappable, e.g. a pipe or special file
+                h = hashlib.new(algorithm)
+                f.seek(0)
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    h.update(chunk)
+    digest = f"{algorithm}:{h.hexdigest()}"
+    cache.put(path, algorithm, stat, digest)
+    return digest
+
+
+def digest_value(value, algorithm: str = DEFAULT_ALGORITHM) -> Optional[str]:
+    """Returns the digest of a value: of a file's contents, if it is an os.PathLike such as a pathlib.Path, see
+    digest_file(), of bytes-like objects as they are, of a str as UTF-8 and of any other object as encoded canonically,
+    so that equal values have equal digests in any process: None, bools, numbers, strs, bytes, lists, tuples, dicts,
+    sets, Decimals, dates & times, nested alike, and types with a serialiser, see register_serialiser(). Values are
+    hashed a chunk at a time, so neither a str's encoding nor a large value's is ever held in memory whole
+
+    :param value: The value
+    :param algorithm: The hash algorithm, defaults to DEFAULT_ALGORITHM, "sha256"
+    :type algorithm: str, optional
+
+    :return: The digest, as the algorithm and the hex digest, e.g. "sha256:9f86d0...", or None if the value, or a
+        value within it, has no canonical encoding
+    :rtype: Optional[str]
+    """
+    if isinstance(value, os.PathLike):
+        return digest_file(value, algorithm)
+    h = hashlib.new(algorithm)
+    if isinstance(value, str):
+        for start in range(0, len(value), CHUNK_SIZE):
+            h.update(value[start : start + CHUNK_SIZE].encode("utf-8"))
+    elif isinstance(value, (bytes, bytearray, memoryview, mmap.mmap)):
+        _hash_buffer(h, value)
+    else:
+        encoder = _Encoder(h.update)
+        try:
+            encoder.encode(value)
+        except (NotCanonical, RecursionError):
+            # e.g. a list containing itself
+            return None
+        encoder.flush()
+    return f"{algorithm}:{h.hexdigest()}"
+
+
+_lock = threading.Lock()
+_hash_cache: Optional[HashCache] = None
+
+
+def get_hash_cache() -> HashCache:
+    """Gets the HashCache file digests are cached in. Unless set_hash_cache() has been called, this is kept in the
+    database named by the PROVWF_HASH_CACHE environment variable or, if that's not set, in memory
+
+    :return: The HashCache
+    :rtype: HashCache
+    """
+    global _hash_cache
+    if _hash_cache is None:
+        with _lock:
+            if _hash_cache is None:
+                _hash_cache = HashCache(os.getenv(HASH_CACHE_ENV))
+    return _hash_cache
+
+
+def set_hash_cache(cache: Optional[HashCache]):
+    """Sets the HashCache file digests are cached in, closing the previous one. None restores the default
+
+    :param cache: The HashCache
+    :type cache: HashCache
+    """
+    global _hash_cache
+    with _lock:
+        previous, _hash_cache = _hash_cache, cache
+    if previous is not None and previous is not cache:
+        previous.close()
@@ -0,0 +1,86 @@
+import gc
+import sys
+import time
+from typing import Iterator, Optional
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+from .namespace import PROVWF
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where peak memory isn't measured
+    resource = None
+
+
+def _peak_rss() -> Optional[int]:
+    """Returns the process' peak resident set size in bytes, or None if it can't be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _gc_collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def _duration(ns: int) -> Literal:
+    return Literal(f"PT{ns / 1_000_000_000:.9f}S", datatype=XSD.duration)
+
+
+class ResourceUsage:
+    """The resources used while a Block ran: wall & CPU time, the increase in the process' peak memory and the number of
+    garbage collections.
+
+    CPU time, peak memory & garbage collections are process-wide, so include the work of any other threads running at
+    the same time.
+    """
+
+    __slots__ = (
+        "wall_time_ns",
+        "cpu_time_ns",
+        "peak_rss_increase",
+        "gc_collections",
+        "_start",
+    )
+
+    def __init__(self):
+        self.wall_time_ns = None
+        self.cpu_time_ns = None
+        self.peak_rss_increase = None
+        self.gc_collections = None
+        self._start = None
+
+    def start(self):
+        self._start = (
+            time.perf_counter_ns(),
+            time.process_time_ns(),
+            _peak_rss(),
+            _gc_collections(),
+        )
+
+    def stop(self):
+        wall, cpu, peak_rss, collections = self._start
+        self.wall_time_ns = time.perf_counter_ns() - wall
+        self.cpu_time_ns = time.process_time_ns() - cpu
+        if peak_rss is not None:
+            self.peak_rss_increase = _peak_rss() - peak_rss
+        self.gc_collections = _gc_collections() - collections
+
+    def triples(self, uri: URIRef) -> Iterator[tuple]:
+        """Yields the measurements as properties of the Activity with the given URI"""
+        if self.wall_time_ns is None:
+            return
+        yield uri, PROVWF.wallTime, _duration(self.wall_time_ns)
+        yield uri, PROVWF.cpuTime, _duration(self.cpu_time_ns)
+        if self.peak_rss_increase is not None:
+            yield uri, PROVWF.peakMemoryIncrease, Literal(
+                self.peak_rss_increase, datatype=XSD.integer
+            )
+        yield uri, PROVWF.garbageCollections, Literal(
+            self.gc_collections, datatype=XSD.integer
+        )
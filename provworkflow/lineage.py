@@ -0,0 +1,275 @@
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Union
+
+from rdflib import URIRef
+
+from .activity import Activity
+from .entity import Entity
+from .exceptions import ProvWorkflowException
+from .prov_reporter import ProvReporter
+from .workflow import Workflow
+
+# the most transitive closures, upstream & downstream each, kept for reuse
+DEFAULT_MAX_CACHED = 4096
+
+_UP = 0
+_DOWN = 1
+
+
+class LineageIndex:
+    """An index of the lineage of Entities & Activities, answering which nodes are upstream of, downstream of or on a
+    path between others without exporting a graph.
+
+    Lineage flows from an Entity to the Activities that prov:used it, from an Activity to the Entities it
+    prov:generated and to the Activities it informed, and from an Entity to its revisions. Each node, Entity or Activity,
+    is interned as an integer ID, by URI, so that nodes are the same if they have the same URI, as per TraversalContext.
+    Edges are held as adjacency arrays of IDs, built when first queried after nodes are added.
+
+    Transitive closures are memoized, up to max_cached in each direction, least recently used first evicted, and a
+    traversal that reaches a node whose closure is known takes it whole rather than traversing it again.
+
+    Nodes are indexed as they are when added: add() them again, or a Workflow containing them, after they change.
+    Blocks already flushed by Workflow.end_block(), or merged by Workflow.merge(), are no longer held as objects so are
+    not indexed.
+
+    :param reporters: Workflows, Activities or Entities to index, with all the nodes they reference
+    :type reporters: ProvReporter
+
+    :param max_cached: The most transitive closures kept for reuse in each direction, defaults to DEFAULT_MAX_CACHED
+    :type max_cached: int, optional
+    """
+
+    def __init__(self, *reporters: ProvReporter, max_cached: int = DEFAULT_MAX_CACHED):
+        self.max_cached = max_cached
+        self._ids: Dict[URIRef, int] = {}
+        self._nodes: List[ProvReporter] = []
+        self._expanded = set()
+        # each edge's upstream & downstream node IDs
+        self._sources = array("q")
+        self._targets = array("q")
+        # the (offsets, targets) adjacency arrays, upstream & downstream, or None until built
+        self._adjacency = [None, None]
+        self._closures = [OrderedDict(), OrderedDict()]
+        for r in reporters:
+            self.add(r)
+
+    def __len__(self) -> int:
+        """The number of nodes indexed"""
+        return len(self._nodes)
+
+    def __contains__(self, node: Union[ProvReporter, URIRef, str]) -> bool:
+        return _uri(node) in self._ids
+
+    def add(self, reporter: ProvReporter):
+        """Indexes a Workflow's Blocks, an Activity or an Entity and all the Entities & Activities they reference
+
+        :param reporter: The Workflow, Activity or Entity
+        :type reporter: ProvReporter
+        """
+        # the nodes added explicitly, e.g. a Block again after it has changed, are expanded afresh. Edges they had
+        # already are repeated, which building the adjacency arrays de-duplicates
+        stack = [reporter]
+        if isinstance(reporter, Workflow):
+            stack = list(reporter.blocks)
+        for node in stack:
+            n = self._ids.get(node.uri)
+            if n is not None:
+                self._expanded.discard(n)
+
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Workflow):
+                stack.extend(node.blocks)
+                continue
+
+            n = self._intern(node)
+            if n in self._expanded:
+                continue
+            self._expanded.add(n)
+
+            if isinstance(node, Activity):
+                for e in node.used:
+                    self._edge(self._intern(e), n)
+                for e in node.generated:
+                    self._edge(n, self._intern(e))
+                for a in node.was_informed_by:
+                    self._edge(self._intern(a), n)
+                for a in node.informed:
+                    self._edge(n, self._intern(a))
+                stack.extend(node.used)
+                stack.extend(node.generated)
+                stack.extend(node.was_informed_by)
+                stack.extend(node.informed)
+            elif isinstance(node, Entity):
+                for a in node.was_used_by or ():
+                    self._edge(n, self._intern(a))
+                for a in node.was_generated_by or ():
+                    self._edge(self._intern(a), n)
+                if node.was_revision_of is not None:
+                    self._edge(self._intern(node.was_revision_of), n)
+                    stack.append(node.was_revision_of)
+                stack.extend(node.was_used_by or ())
+                stack.extend(node.was_generated_by or ())
+
+    def ancestors(self, node: Union[ProvReporter, URIRef, str]) -> List[ProvReporter]:
+        """Returns the nodes upstream of a node: the Activities & Entities that produced it, transitively
+
+        :param node: The node, or its URI
+        :type node: Union[ProvReporter, URIRef, str]
+
+        :return: The upstream nodes, in the order they were indexed
+        :rtype: List[ProvReporter]
+        """
+        nodes = self._nodes
+        return [nodes[i] for i in self._closure(self._id(node), _UP)]
+
+    def descendants(self, node: Union[ProvReporter, URIRef, str]) -> List[ProvReporter]:
+        """Returns the nodes downstream of a node: the Activities that used it & the Entities they produced, transitively
+
+        :param node: The node, or its URI
+        :type node: Union[ProvReporter, URIRef, str]
+
+        :return: The downstream nodes, in the order they were indexed
+        :rtype: List[ProvReporter]
+        """
+        nodes = self._nodes
+        return [nodes[i] for i in self._closure(self._id(node), _DOWN)]
+
+    def path(
+        self,
+        source: Union[ProvReporter, URIRef, str],
+        target: Union[ProvReporter, URIRef, str],
+    ) -> Optional[List[ProvReporter]]:
+        """Returns a shortest path of lineage from one node downstream to another, e.g. from an input Entity, through the
+        Blocks & Entities derived from it, to an output Entity
+
+        :param source: The upstream node, or its URI
+        :type source: Union[ProvReporter, URIRef, str]
+
+        :param target: The downstream node, or its URI
+        :type target: Union[ProvReporter, URIRef, str]
+
+        :return: The nodes on the path, from source to target inclusive, or None if target is not downstream of source
+        :rtype: Optional[List[ProvReporter]]
+        """
+        s, t = self._id(source), self._id(target)
+        if s == t:
+            return [self._nodes[s]]
+        # ruled out by a known closure without a traversal
+        for start, end, direction in ((s, t, _DOWN), (t, s, _UP)):
+            closure = self._closures[direction].get(start)
+            if closure is not None and not _contains(closure, end):
+                return None
+
+        offsets, targets = self._adjacency_of(_DOWN)
+        parents = {s: -1}
+        queue = deque([s])
+        while queue:
+            n = queue.popleft()
+            for m in targets[offsets[n] : offsets[n + 1]]:
+                if m in parents:
+                    continue
+                parents[m] = n
+                if m == t:
+                    path = [m]
+                    while parents[path[-1]] != -1:
+                        path.append(parents[path[-1]])
+                    return [self._nodes[i] for i in reversed(path)]
+                queue.append(m)
+        return None
+
+    def _intern(self, node: ProvReporter) -> int:
+        n = self._ids.get(node.uri)
+        if n is None:
+            n = self._ids[node.uri] = len(self._nodes)
+            self._nodes.append(node)
+        return n
+
+    def _edge(self, source: int, target: int):
+        self._sources.append(source)
+        self._targets.append(target)
+        # the adjacency arrays & closures no longer hold
+        if self._adjacency[_UP] is not None or self._adjacency[_DOWN] is not None:
+            self._adjacency = [None, None]
+        if self._closures[_UP] or self._closures[_DOWN]:
+            self._closures = [OrderedDict(), OrderedDict()]
+
+    def _id(self, node: Union[ProvReporter, URIRef, str]) -> int:
+        try:
+            return self._ids[_uri(node)]
+        except KeyError:
+            raise ProvWorkflowException(f"{_uri(node)} is not in the lineage index")
+
+    def _adjacency_of(self, direction: int):
+        """Returns the adjacency arrays of a direction, building them if need be: the IDs adjacent to node n are
+        targets[offsets[n]:offsets[n + 1]]"""
+        adjacency = self._adjacency[direction]
+        if adjacency is not None:
+            return adjacency
+
+        sources, targets = (
+            (self._targets, self._sources)
+            if direction == _UP
+            else (self._sources, self._targets)
+        )
+        # each node's adjacent IDs, de-duplicated in the order first seen, as an edge may be given by both its ends,
+        # e.g. by both Activity.generated & Entity.was_generated_by
+        rows = [None] * len(self._nodes)
+        for s, t in zip(sources, targets):
+            row = rows[s]
+            if row is None:
+                rows[s] = {t: None}
+            else:
+                row[t] = None
+
+        offsets = array("q", [0])
+        flat = array("q")
+        for row in rows:
+            if row is not None:
+                flat.extend(row)
+            offsets.append(len(flat))
+        adjacency = self._adjacency[direction] = offsets, flat
+        return adjacency
+
+    def _closure(self, start: int, direction: int) -> array:
+        """Returns the sorted IDs of the nodes reachable from start in the given direction, other than start itself"""
+        cache = self._closures[direction]
+        closure = cache.get(start)
+        if closure is not None:
+            cache.move_to_end(start)
+            return closure
+
+        offsets, targets = self._adjacency_of(direction)
+        seen = set()
+        stack = [start]
+        while stack:
+            n = stack.pop()
+            for m in targets[offsets[n] : offsets[n + 1]]:
+                if m in seen:
+                    continue
+                seen.add(m)
+                known = cache.get(m)
+                if known is not None:
+                    seen.update(known)
+                else:
+                    stack.append(m)
+        seen.discard(start)
+
+        closure = array("q", sorted(seen))
+        cache[start] = closure
+        if len(cache) > self.max_cached:
+            cache.popitem(last=False)
+        return closure
+
+
+def _uri(node: Union[ProvReporter, URIRef, str]) -> URIRef:
+    if isinstance(node, ProvReporter):
+        return node.uri
+    return URIRef(node)
+
+
+def _contains(closure: array, n: int) -> bool:
+    i = bisect_left(closure, n)
+    return i < len(closure) and closure[i] == n
@@ -1,6 +1,5 @@
 from typing import Union
-from rdflib import Graph, URIRef
-from rdflib.namespace import PROV, RDF, SDO
+from rdflib import URIRef
 
 from .agent import Agent
 from .prov_reporter import PROVWF
@@ -20,6 +19,8 @@ class Machine(Agent):
     :type named_graph_uri: Union[URIRef, str], optional
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -34,11 +35,4 @@ class Machine(Agent):
             acted_on_behalf_of=acted_on_behalf_of,
         )
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
-
-        # add in type
-        g.add((self.uri, RDF.type, PROVWF.Machine))
-        g.remove((self.uri, RDF.type, PROV.Agent))
-
-        return g
+    _rdf_type = PROVWF.Machine
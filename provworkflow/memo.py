@@ -0,0 +1,257 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+from rdflib import URIRef
+
+from .block import Block
+from .entity import Entity
+
+# the path of the cache's database, if not given
+MEMO_CACHE_ENV = "PROVWF_MEMO_CACHE"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "provworkflow" / "memo.sqlite3"
+# the most the cached results may take up before the least recently used are evicted
+DEFAULT_MAX_BYTES = 1 << 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    block_uri TEXT NOT NULL,
+    generated BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def content_hash(entity: Entity) -> str:
+    """Returns the hash of an Entity's content: its digest, see Entity.digest or, if it has none, its URI
+
+    :param entity: The Entity
+    :type entity: Entity
+
+    :return: The hash
+    :rtype: str
+    """
+    digest = entity.digest
+    if digest is None:
+        return f"uri:{entity.uri}"
+    return digest
+
+
+class MemoCache:
+    """A local, disk-backed cache of Blocks' generated Entities, with which a Block that has already run is not run
+    again.
+
+    A Block's result is keyed by its class_uri, its version_uri and the content hashes of the Entities it used, see
+    content_hash(), so the same code run on the same data hits the cache. Blocks without a class_uri, or a version URI
+    (see version.get_version_uri()), are never cached as what they ran isn't known.
+
+    On a hit, the Block is given the earlier run's generated Entities, with their URIs, labels, values & created times,
+    and is recorded as prov:wasInfluencedBy the earlier run's Block, see run(). Other properties of the generated
+    Entities, such as prov:wasAttributedTo, are not cached.
+
+    Results are kept in an SQLite database, which several processes may share. When the results take up more than
+    max_bytes, the least recently used are evicted.
+
+    :param path: The path of the database. If None, the PROVWF_MEMO_CACHE environment variable or, if that's not set,
+        ~/.cache/provworkflow/memo.sqlite3, defaults to None
+    :type path: Union[Path, str], optional
+
+    :param max_bytes: The most the cached results may take up, defaults to DEFAULT_MAX_BYTES, 1 GiB
+    :type max_bytes: int, optional
+    """
+
+    def __init__(
+        self, path: Union[Path, str] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        if path is None:
+            path = os.getenv(MEMO_CACHE_ENV, DEFAULT_CACHE_PATH)
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        """The number of cached results"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def size(self) -> int:
+        """The bytes taken up by the cached results"""
+        with self._lock:
+            return self._size()
+
+    def key(self, block: Block) -> Optional[str]:
+        """Returns the key under which a Block's result is cached or None if it can't be cached
+
+        :param block: The Block, with the Entities it used
+        :type block: Block
+
+        :return: The key
+        :rtype: Optional[str]
+        """
+        if block.class_uri is None or block._version_uri is None:
+            return None
+        h = hashlib.sha256()
+        for part in [block.class_uri, block._version_uri] + [
+            content_hash(e) for e in block.used
+        ]:
+            h.update(str(part).encode("utf-8"))
+            h.update(b"\n")
+        return h.hexdigest()
+
+    def get(self, block: Block) -> bool:
+        """Gives a Block the Entities generated by an earlier run of the same Block class & version on the same data, if
+        there was one, and records that it prov:wasInfluencedBy that run
+
+        :param block: The Block, with the Entities it used
+        :type block: Block
+
+        :return: Whether the Block's result was cached
+        :rtype: bool
+        """
+        key = self.key(block)
+        if key is None:
+            return False
+        with self._lock:
+            row = self._db.execute(
+                "SELECT block_uri, generated FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._db.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                (time.time_ns(), key),
+            )
+
+        block_uri, generated = row
+        for uri, label, named_graph_uri, value, external, created in pickle.loads(
+            generated
+        ):
+            e = Entity(
+                uri=URIRef(uri),
+                label=label,
+                named_graph_uri=named_graph_uri,
+                value=value,
+                external=external,
+            )
+            e._created = created
+            block.generated.append(e)
+        block.memoized_from = URIRef(block_uri)
+        return True
+
+    def put(self, block: Block) -> bool:
+        """Caches the Entities a Block generated
+
+        :param block: The Block, once it has run
+        :type block: Block
+
+        :return: Whether the Block's result was cached: it's not if the Block can't be cached, see key(), or its
+            generated Entities' values can't be pickled
+        :rtype: bool
+        """
+        key = self.key(block)
+        if key is None:
+            return False
+        try:
+            generated = pickle.dumps(
+                [
+                    (
+                        str(e.uri),
+                        e.label,
+                        e.named_graph_uri,
+                        e.value,
+                        e.external,
+                        e._created,
+                    )
+                    for e in block.generated
+                ],
+                pickle.HIGHEST_PROTOCOL,
+            )
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+
+        with self._lock:
+            # a transaction, so that other processes sharing the database see the insert & eviction together
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    (key, str(block.uri), generated, len(generated), time.time_ns()),
+                )
+                self._evict()
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return True
+
+    def run(self, block: Block, fn: Callable[[], List[Entity]]) -> List[Entity]:
+        """Runs a Block, unless its result is cached, see get(), and caches its result
+
+        The Block is run as a context manager, so its times & resource use are those of fn.
+
+        :param block: The Block, with the Entities it used
+        :type block: Block
+
+        :param fn: A function of no arguments that does the Block's work and returns the Entities it generated, which
+            are added to the Block's generated Entities
+        :type fn: Callable[[], List[Entity]]
+
+        :return: The Block's generated Entities
+        :rtype: List[Entity]
+        """
+        if self.get(block):
+            return block.generated
+        with block:
+            generated = fn()
+        for e in generated or ():
+            if e not in block.generated:
+                block.generated.append(e)
+        self.put(block)
+        return block.generated
+
+    def clear(self):
+        """Removes all the cached results"""
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _size(self) -> int:
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+
+    def _evict(self):
+        excess = self._size() - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in self._db.execute(
+            "SELECT key, size FROM results ORDER BY last_used"
+        ):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", evicted)
@@ -0,0 +1,230 @@
+import hashlib
+import itertools
+import os
+import secrets
+import threading
+import weakref
+from typing import List, Optional
+
+from rdflib import URIRef
+
+from .namespace import PWFS
+
+# the number of URIs minted at a time by minters that pre-allocate them
+DEFAULT_BATCH_SIZE = 1024
+
+# every minter, so that each may forget any state copied from the parent when a process forks
+_minters = weakref.WeakSet()
+
+
+def new_uri(uri: str) -> URIRef:
+    """Returns a URIRef of a str known to be a valid IRI, such as one minted from a namespace and a generated ID, without
+    URIRef's per-character validation, which costs more than the minting
+
+    :param uri: The IRI
+    :type uri: str
+
+    :return: The URIRef
+    :rtype: URIRef
+    """
+    return str.__new__(URIRef, uri)
+
+
+class UriMinter:
+    """Mints URIs for ProvReporters that are not given one.
+
+    Subclasses implement mint() and may override mint_batch() to make minting many URIs at once cheaper than minting
+    them one at a time. All minters are thread-safe and mint URIs that are unique across the processes of a run,
+    whether those are forked or spawned.
+
+    :param namespace: The namespace minted URIs are in, defaults to PWFS
+    :type namespace: str, optional
+    """
+
+    def __init__(self, namespace: str = PWFS):
+        self.namespace = str(namespace)
+        _minters.add(self)
+
+    def mint(self, node=None) -> URIRef:
+        """Returns a new URI
+
+        :param node: The ProvReporter the URI is for, which some minters derive the URI from, defaults to None
+        :type node: ProvReporter, optional
+
+        :return: A URI not minted before
+        :rtype: URIRef
+        """
+        raise NotImplementedError
+
+    def mint_batch(self, n: int) -> List[URIRef]:
+        """Returns n new URIs, e.g. to give to ProvReporters created in bulk
+
+        :param n: The number of URIs
+        :type n: int
+
+        :return: n URIs not minted before
+        :rtype: List[URIRef]
+        """
+        return [self.mint() for _ in range(n)]
+
+    def _after_fork(self):
+        """Called in a forked child process to forget anything that would make it mint the same URIs as its parent"""
+        pass
+
+
+class UUID4Minter(UriMinter):
+    """Mints URIs of the form {namespace}{UUIDv4}, as ProvWF always has, but without the host's MAC address which
+    UUIDv1s contain.
+
+    Random bytes for batch_size UUIDs are read from the OS at a time, rather than once per URI.
+
+    :param namespace: The namespace minted URIs are in, defaults to PWFS
+    :type namespace: str, optional
+
+    :param batch_size: The number of URIs pre-allocated at a time, defaults to DEFAULT_BATCH_SIZE
+    :type batch_size: int, optional
+    """
+
+    def __init__(self, namespace: str = PWFS, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(namespace)
+        self.batch_size = batch_size
+        self._pool = []
+
+    def mint(self, node=None) -> URIRef:
+        # list.pop() is atomic so threads never share a URI. Two may both refill an empty pool, which is harmless
+        while True:
+            try:
+                return self._pool.pop()
+            except IndexError:
+                self._pool.extend(self.mint_batch(self.batch_size))
+
+    def mint_batch(self, n: int) -> List[URIRef]:
+        random = bytearray(os.urandom(16 * n))
+        # the version (4) & variant (RFC 4122) bits of each UUID
+        random[6::16] = bytes((b & 0x0F) | 0x40 for b in random[6::16])
+        random[8::16] = bytes((b & 0x3F) | 0x80 for b in random[8::16])
+        h = random.hex()
+        ns = self.namespace
+        return [
+            new_uri(
+                f"{ns}{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+            )
+            for i in range(0, 32 * n, 32)
+        ]
+
+    def _after_fork(self):
+        self._pool = []
+
+
+class CounterMinter(UriMinter):
+    """Mints URIs of the form {namespace}{run_id}-{process}-{n}: a run identifier, a random identifier for the process
+    and a counter. This is the cheapest minter and its URIs sort in creation order within a process.
+
+    The process identifier is drawn afresh in every process, including forked ones, so workers of the same run never
+    mint the same URI.
+
+    :param namespace: The namespace minted URIs are in, defaults to PWFS
+    :type namespace: str, optional
+
+    :param run_id: An identifier for this run, e.g. a job ID. If None, a random one is used, defaults to None
+    :type run_id: str, optional
+    """
+
+    def __init__(self, namespace: str = PWFS, run_id: str = None):
+        super().__init__(namespace)
+        self.run_id = run_id if run_id is not None else secrets.token_hex(6)
+        self._reset()
+
+    def _reset(self):
+        self.process_id = secrets.token_hex(4)
+        self._prefix = f"{self.namespace}{self.run_id}-{self.process_id}-"
+        # next() on an itertools.count is atomic so threads never share a number
+        self._counter = itertools.count()
+
+    def mint(self, node=None) -> URIRef:
+        return new_uri(f"{self._prefix}{next(self._counter)}")
+
+    def mint_batch(self, n: int) -> List[URIRef]:
+        prefix = self._prefix
+        return [new_uri(f"{prefix}{i}") for i in itertools.islice(self._counter, n)]
+
+    def _after_fork(self):
+        self._reset()
+
+
+class ContentHashMinter(UriMinter):
+    """Mints URIs of the form {namespace}{hash} for Entities with a value, where the hash is of the Entity's class, the
+    value's type and the value's content: its Entity.digest, see hashing.digest_value(), not its str(), which distinct
+    values may share. The same value gets the same URI in every run and process, so Entities with equal values are the
+    same RDF node and are exported only once. A file, given as an os.PathLike, is hashed by its path and its contents,
+    so the same file is one node but files with the same contents are not.
+
+    Nodes without a value, such as Activities and Agents, and Entities whose value can't be hashed get URIs from the
+    fallback minter.
+
+    :param namespace: The namespace minted URIs are in, defaults to PWFS
+    :type namespace: str, optional
+
+    :param fallback: The minter for nodes without a value. If None, a UUID4Minter in namespace is used, defaults to None
+    :type fallback: UriMinter, optional
+    """
+
+    def __init__(self, namespace: str = PWFS, fallback: UriMinter = None):
+        super().__init__(namespace)
+        self.fallback = fallback if fallback is not None else UUID4Minter(namespace)
+
+    def mint(self, node=None) -> URIRef:
+        value = getattr(node, "value", None)
+        digest = getattr(node, "digest", None) if value is not None else None
+        if digest is None:
+            return self.fallback.mint(node)
+
+        # the value's type is included so that "x" and b"x", whose contents are the same, differ
+        content = f"{type(node).__name__}\0{type(value).__name__}\0{digest}"
+        if isinstance(value, os.PathLike):
+            content += f"\0{os.path.realpath(value)}"
+        h = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        return new_uri(f"{self.namespace}{h}")
+
+    def mint_batch(self, n: int) -> List[URIRef]:
+        # with no nodes to hash
+        return self.fallback.mint_batch(n)
+
+
+_lock = threading.Lock()
+_minter: Optional[UriMinter] = None
+
+
+def get_minter() -> UriMinter:
+    """Gets the minter ProvReporters get their URIs from if not given one. This is a UUID4Minter unless set_minter() has
+    been called
+
+    :return: The minter
+    :rtype: UriMinter
+    """
+    global _minter
+    if _minter is None:
+        with _lock:
+            if _minter is None:
+                _minter = UUID4Minter()
+    return _minter
+
+
+def set_minter(minter: Optional[UriMinter]):
+    """Sets the minter ProvReporters get their URIs from if not given one, e.g. set_minter(CounterMinter()) for the
+    cheapest URIs. None restores the default
+
+    :param minter: The minter
+    :type minter: UriMinter
+    """
+    global _minter
+    _minter = minter
+
+
+def _after_fork_in_child():
+    for minter in list(_minters):
+        minter._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
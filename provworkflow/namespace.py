@@ -13,9 +13,22 @@ PROVWF = ClosedNamespace(
         "Machine",
         "hadBlock",
         "serviceParameters",
+        # an Activity's resource use, see instrumentation.ResourceUsage, defined in the README's "Resource usage"
+        "wallTime",
+        "cpuTime",
+        "peakMemoryIncrease",
+        "garbageCollections",
     ],
 )
 
+# the SPDX vocabulary, in which Entities' digests are given as spdx:checksum
+SPDX = Namespace("http://spdx.org/rdf/terms#")
+
 # this is the fall-back namespace for Workflow instances
 # Workflow instances will be allocated a URI of PWFS.{UUI} if not explicitly given one
 PWFS = Namespace("https://data.surroundaustralia.com/dataset/provworkflows/")
+
+# the base of skolem IRIs, minted for nodes that would otherwise be blank nodes, such as utils.iter_with_provenance()'s
+# statements & groups and Entities' checksums, under the PWFS authority as per
+# https://www.w3.org/TR/rdf11-concepts/#section-skolemization
+SKOLEM_BASE = "https://data.surroundaustralia.com/.well-known/genid/provworkflow/"
@@ -0,0 +1,141 @@
+import io
+import re
+from typing import IO, Iterable, Iterator, Union
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.term import Node
+
+# the approximate number of characters buffered before each write to the underlying file
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+_LITERAL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+_LITERAL_UNESCAPES = {"n": "\n", "r": "\r"}
+
+# a term as written by nt_term(): an IRI, a blank node or a literal with an optional language or datatype
+_TERM = re.compile(
+    r'<([^>]*)>|_:(\S+)|"((?:[^"\\]|\\.)*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?'
+)
+_ESCAPE = re.compile(r"\\(.)")
+
+
+def nt_term(term: Node) -> str:
+    """Returns the N-Triples form of an RDF term"""
+    # f-strings, not +, as rdflib terms' __radd__ would build new terms
+    if isinstance(term, URIRef):
+        return f"<{term}>"
+    elif isinstance(term, Literal):
+        lexical = str(term).translate(_LITERAL_ESCAPES)
+        if term.language is not None:
+            return f'"{lexical}"@{term.language}'
+        elif term.datatype is not None:
+            return f'"{lexical}"^^<{term.datatype}>'
+        return f'"{lexical}"'
+    elif isinstance(term, BNode):
+        return f"_:{term}"
+    raise ValueError(f"Cannot write {term!r} as an N-Triples term")
+
+
+def nt_line(s: Node, p: Node, o: Node, graph: Union[URIRef, None] = None) -> str:
+    """Returns a triple, or a quad if graph is given, as a single N-Triples / N-Quads line"""
+    if graph is None:
+        return f"{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n"
+    return f"{nt_term(s)} {nt_term(p)} {nt_term(o)} {nt_term(graph)} .\n"
+
+
+def parse_nt_term(text: str) -> Node:
+    """Returns the RDF term of its N-Triples form, as written by nt_term()"""
+    # most terms are IRIs, which need no regex
+    if text[0] == "<" and text[-1] == ">" and ">" not in text[1:-1]:
+        return URIRef(text[1:-1])
+    m = _TERM.fullmatch(text)
+    if m is None:
+        raise ValueError(f"Cannot read {text!r} as an N-Triples term")
+    iri, bnode, lexical, language, datatype = m.groups()
+    if iri is not None:
+        return URIRef(iri)
+    elif bnode is not None:
+        return BNode(bnode)
+    if "\\" in lexical:
+        lexical = _ESCAPE.sub(lambda m: _LITERAL_UNESCAPES.get(m[1], m[1]), lexical)
+    return Literal(
+        lexical,
+        lang=language,
+        datatype=URIRef(datatype) if datatype is not None else None,
+    )
+
+
+def iter_chunks(
+    triples: Iterable[tuple], buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[bytes]:
+    """Lazily yields triples, or quads, as UTF-8 N-Triples / N-Quads in chunks of about buffer_size characters, e.g. as
+    a streamed HTTP request body"""
+    buffer = []
+    buffered = 0
+    for t in triples:
+        line = nt_line(*t)
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= buffer_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+class NTriplesWriter:
+    """Writes triples or quads to an open file as N-Triples or N-Quads, in buffered chunks.
+
+    Triples are written as they are received so, fed by a ProvReporter's iter_triples() or iter_quads(), neither a
+    graph nor the whole serialisation is ever held in memory.
+
+    :param fh: A text or binary file-like object. Binary objects, such as a socket's makefile("wb"), are written UTF-8
+    :type fh: IO
+
+    :param buffer_size: The approximate number of characters written to fh at a time
+    :type buffer_size: int, optional
+    """
+
+    def __init__(self, fh: IO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.fh = fh
+        self.buffer_size = buffer_size
+        self.binary = not isinstance(fh, io.TextIOBase)
+        self.count = 0
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, triples: Iterable[tuple]):
+        """Writes (subject, predicate, object) triples or (subject, predicate, object, graph) quads. Quads with a graph
+        of None are written to the default graph"""
+        buffer = self._buffer
+        for t in triples:
+            line = nt_line(*t)
+            buffer.append(line)
+            self._buffered += len(line)
+            self.count += 1
+            if self._buffered >= self.buffer_size:
+                self._write_buffer()
+
+    def write_lines(self, lines: Iterable[str]):
+        """Writes lines already in N-Triples or N-Quads form, each ending with a newline, e.g. as per
+        fragments.Fragment.iter_nquads()"""
+        buffer = self._buffer
+        for line in lines:
+            buffer.append(line)
+            self._buffered += len(line)
+            self.count += 1
+            if self._buffered >= self.buffer_size:
+                self._write_buffer()
+
+    def flush(self):
+        """Writes anything buffered to the underlying file and flushes it"""
+        self._write_buffer()
+        if hasattr(self.fh, "flush"):
+            self.fh.flush()
+
+    def _write_buffer(self):
+        if self._buffer:
+            chunk = "".join(self._buffer)
+            self.fh.write(chunk.encode("utf-8") if self.binary else chunk)
+            self._buffer.clear()
+            self._buffered = 0
@@ -1,8 +1,9 @@
-from typing import Union
-from rdflib import Graph, URIRef
-from rdflib.namespace import PROV, RDF, SDO
+from typing import Iterator, Union
+from rdflib import URIRef
+from rdflib.namespace import PROV, SDO
 
 from .agent import Agent
+from .traversal import TraversalContext, Triple
 
 
 class Person(Agent):
@@ -19,6 +20,8 @@ class Person(Agent):
     :type named_graph_uri: Union[URIRef, str], optional
     """
 
+    __slots__ = ("email",)
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -35,15 +38,11 @@ class Person(Agent):
             acted_on_behalf_of=acted_on_behalf_of,
         )
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
-        g = super().prov_to_graph(g)
+    _rdf_type = PROV.Person
 
-        # add in type
-        g.add((self.uri, RDF.type, PROV.Person))
-        g.remove((self.uri, RDF.type, PROV.Agent))
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        yield from super()._triples(context)
 
         # special person properties
         if self.email is not None:
-            g.add((self.uri, SDO.email, self.email))
-
-        return g
+            yield self.uri, SDO.email, self.email
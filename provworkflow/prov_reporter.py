@@ -1,13 +1,16 @@
-import os
-import uuid
-from typing import Union
+from typing import Iterator, List, Union
 
 from rdflib import Graph, URIRef, Literal
-from rdflib.namespace import DCTERMS, PROV, OWL, RDF, RDFS, XSD
+from rdflib.namespace import DCAT, DCTERMS, PROV, OWL, RDF, RDFS, XSD
 
+from .clock import get_clock
 from .exceptions import ProvWorkflowException
+from .minting import get_minter
 from .namespace import PROVWF, PWFS
-from .utils import now_as_xsd_datetime_stamp
+from .ntriples import DEFAULT_BUFFER_SIZE, NTriplesWriter
+from .sinks import Sink, get_sink, write_to_sinks
+from .traversal import Quad, TraversalContext, Triple
+from .version import get_version_uri
 
 
 class class_or_instance_method(classmethod):
@@ -27,7 +30,8 @@ class ProvReporter:
     etc., including grandchildren such as Block & Workflow.
 
     ProvReporters automatically record created times (dcterms:created) and an instance version IRI which is collected
-    from the instance's Git version (URI of the Git origin repo, not local).
+    from the instance's Git version (URI of the Git origin repo, not local) or given in advance, see
+    version.get_version_uri().
 
     :param uri: A URI you assign to the ProvReporter instance. If None, a UUID-based URI will be created,
     defaults to None
@@ -40,6 +44,17 @@ class ProvReporter:
     :type named_graph_uri: Union[URIRef, str], optional
     """
 
+    # ProvReporters are slotted, rather than having a per-instance __dict__, as workflows may create millions of them
+    __slots__ = (
+        "uri",
+        "label",
+        "named_graph_uri",
+        "class_uri",
+        "_version_uri",
+        "_created",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         uri: Union[URIRef, str] = None,
@@ -47,17 +62,19 @@ class ProvReporter:
         named_graph_uri: Union[URIRef, str] = None,
         class_uri: Union[URIRef, str] = None,
     ):
-        # give it an opaque UUID-based URI if one not given
+        # give it an opaque URI, by default UUID-based, if one not given, see minting.set_minter()
         if uri is not None:
             self.uri = URIRef(uri) if type(uri) == str else uri
         else:
-            self.uri = URIRef(PWFS + str(uuid.uuid1()))
-        self.label = Literal(label) if type(label) == str else label
+            self.uri = get_minter().mint(self)
+        # kept as given: it's only made a Literal on export
+        self.label = label
         self.named_graph_uri = (
             URIRef(named_graph_uri) if type(named_graph_uri) == str else named_graph_uri
         )
 
         # class specialisations
+        self.class_uri = None
         if class_uri is not None:
             self.class_uri = URIRef(class_uri) if type(class_uri) == str else class_uri
 
@@ -77,47 +94,167 @@ class ProvReporter:
                     "If supplied, a class_uri must start with http"
                 )
 
-        git_info = os.getenv("INCLUDE_GIT_INFO")
-        if git_info == "true":
-        # from Git info
-            try:
-                from .git_utils import get_version_uri
-
-                uri_str = get_version_uri()
-                if uri_str is not None:
-                    self.version_uri = URIRef(uri_str)
+        # from a precomputed URI or Git info, resolved once per process and shared by all instances
+        self._version_uri = get_version_uri()
 
-            except ImportError:
-                print("Git executable not found on system - git related functionality not available")
+        # kept as nanoseconds since the epoch: it's only formatted on export, see clock.Clock
+        self._created = get_clock().now()
 
+    @property
+    def version_uri(self) -> URIRef:
         # fallback version
-        if not hasattr(self, "version_uri"):
-            self.version_uri = self.uri
+        return self._version_uri if self._version_uri is not None else self.uri
 
-        self.created = Literal(
-            now_as_xsd_datetime_stamp(),
-            datatype=XSD.dateTimeStamp,
+    @version_uri.setter
+    def version_uri(self, version_uri: Union[URIRef, str]):
+        self._version_uri = (
+            URIRef(version_uri) if type(version_uri) == str else version_uri
         )
 
+    @property
+    def created(self) -> Literal:
+        return get_clock().to_literal(self._created)
+
+    # the rdf:type of instances of this class
+    _rdf_type = PROVWF.ProvReporter
+
+    def prov_to_graph(self, g: Graph = None, context: TraversalContext = None) -> Graph:
+        """Adds this ProvReporter, and all the ProvReporters it references, to a graph
 
-    def prov_to_graph(self, g: Graph = None) -> Graph:
+        :param g: The graph to add to. If None, a new graph will be created, defaults to None
+        :type g: Graph, optional
+
+        :param context: The state of the export this call is part of. If None, a new export is started, defaults to None
+        :type context: TraversalContext, optional
+
+        :return: The graph
+        :rtype: Graph
+        """
         if g is None:
             if self.named_graph_uri is not None:
                 g = Graph(identifier=URIRef(self.named_graph_uri))
             else:
                 g = Graph()
-        g.bind("prov", PROV)
-        g.bind("provwf", PROVWF)
-        g.bind("pwfs", PWFS)
-        g.bind("owl", OWL)
-        g.bind("dcterms", DCTERMS)
 
+        # namespaces are bound once per export, not once per node
+        if context is None:
+            context = TraversalContext(default_graph=self.named_graph_uri)
+            g.bind("prov", PROV)
+            g.bind("provwf", PROVWF)
+            g.bind("pwfs", PWFS)
+            g.bind("owl", OWL)
+            g.bind("dcterms", DCTERMS)
+            g.bind("dcat", DCAT)
+
+        g.addN((s, p, o, g) for s, p, o in self.iter_triples(context))
+
+        return g
+
+    def iter_triples(self, context: TraversalContext = None) -> Iterator[Triple]:
+        """Lazily yields the triples of this ProvReporter, and all the ProvReporters it references, without building a
+        graph
+
+        Each node's triples are yielded once per export and no triple is yielded that prov_to_graph() would not add to
+        its graph.
+
+        :param context: The state of the export this call is part of. If None, a new export is started, defaults to None
+        :type context: TraversalContext, optional
+
+        :return: An iterator of (subject, predicate, object) triples
+        :rtype: Iterator[Triple]
+        """
+        return ((s, p, o) for s, p, o, _ in self.iter_quads(context))
+
+    def iter_quads(self, context: TraversalContext = None) -> Iterator[Quad]:
+        """As per iter_triples() but yields (subject, predicate, object, graph) quads. The graph is the named_graph_uri
+        of the node that produced the triple or, if that node has none, the context's default_graph which, for a new
+        export, is this ProvReporter's named_graph_uri. None indicates the default graph.
+
+        :param context: The state of the export this call is part of. If None, a new export is started, defaults to None
+        :type context: TraversalContext, optional
+
+        :return: An iterator of (subject, predicate, object, graph) quads
+        :rtype: Iterator[Quad]
+        """
+        if context is None:
+            context = TraversalContext(default_graph=self.named_graph_uri)
+
+        # Referenced nodes are queued, not recursed into, by _triples() so the outermost call drains the queue
+        context.schedule(self)
+        if context.exporting:
+            return
+        context.exporting = True
+        try:
+            while context.queue:
+                node = context.queue.popleft()
+                graph = (
+                    node.named_graph_uri
+                    if node.named_graph_uri is not None
+                    else context.default_graph
+                )
+                for s, p, o in node._triples(context):
+                    yield s, p, o, graph
+        finally:
+            context.exporting = False
+
+    def write_ntriples(self, fh, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Streams this ProvReporter's triples, as per iter_triples(), to an open file as N-Triples without building a
+        graph or the whole serialisation in memory
+
+        :param fh: A text or binary file-like object, e.g. an open file or a socket's makefile("wb")
+        :type fh: IO
+
+        :param buffer_size: The approximate number of characters written to fh at a time
+        :type buffer_size: int, optional
+        """
+        writer = NTriplesWriter(fh, buffer_size=buffer_size)
+        writer.write(self.iter_triples())
+        writer.flush()
+
+    def write_nquads(self, fh, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Streams this ProvReporter's quads, as per iter_quads(), to an open file as N-Quads without building a graph or
+        the whole serialisation in memory
+
+        :param fh: A text or binary file-like object, e.g. an open file or a socket's makefile("wb")
+        :type fh: IO
+
+        :param buffer_size: The approximate number of characters written to fh at a time
+        :type buffer_size: int, optional
+        """
+        writer = NTriplesWriter(fh, buffer_size=buffer_size)
+        writer.write(self.iter_quads())
+        writer.flush()
+
+    def persist(self, methods: List[Union[str, Sink]] = ("string",)):
+        """Exports this ProvReporter's graph once, with prov_to_graph(), and writes it to each of the given sinks in
+        parallel
+
+        :param methods: Sinks, or the names they're registered under, see sinks.register_sink(). The built-in sinks are
+            "string", "file", "graphdb" & "sop", defaults to ("string",)
+        :type methods: List[Union[str, Sink]], optional
+
+        :return: If "string" is one of the methods, its serialisation, otherwise the graph
+        :rtype: Union[str, Graph]
+        """
+        if isinstance(methods, (str, Sink)):
+            methods = [methods]
+        sinks = [get_sink(m) if isinstance(m, str) else m for m in methods]
+        if not sinks:
+            raise ProvWorkflowException("At least one persist method must be given")
+
+        g = self.prov_to_graph()
+        results = write_to_sinks(g, self, sinks)
+        if "string" in methods:
+            return results[methods.index("string")]
+        return g
+
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        """Yields this instance's own triples. Subclasses extend this, handing any referenced ProvReporters to
+        context.schedule() rather than serialising them directly"""
         # this instance's URI
-        g.add((self.uri, RDF.type, PROVWF.ProvReporter))
-        g.add((self.uri, DCTERMS.created, self.created))
+        yield self.uri, RDF.type, self._rdf_type
+        yield self.uri, DCTERMS.created, self.created
 
         # add a label if this Activity has one
         if self.label is not None:
-            g.add((self.uri, RDFS.label, Literal(self.label, datatype=XSD.string)))
-
-        return g
+            yield self.uri, RDFS.label, Literal(self.label, datatype=XSD.string)
@@ -0,0 +1,180 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.exceptions import UniquenessError
+from rdflib.namespace import DCTERMS, PROV, RDF
+from rdflib.term import Node
+from rdflib.util import from_n3
+
+from .exceptions import ProvWorkflowException
+from .ntriples import nt_line, nt_term
+from .traversal import Triple
+from .utils import created_now
+
+# the media type under which RDF4J & GraphDB accept RDF-star, of which the lines written here are a subset, e.g. for
+# graphdb.Transaction.add_data()
+TURTLE_STAR = "text/x-turtlestar"
+
+# an N-Triples term, the start or end of a quoted triple or annotation, or punctuation
+_TOKEN = re.compile(
+    r'<<|>>|\{\||\|\}|<[^>\s]*>|_:[^\s;|]+|"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>\s]*>)?|[.;]'
+)
+_REIFICATION = (RDF.subject, RDF.predicate, RDF.object)
+
+
+def quoted(s: Node, p: Node, o: Node) -> str:
+    """Returns the N-Triples-star form of a quoted triple"""
+    return f"<< {nt_term(s)} {nt_term(p)} {nt_term(o)} >>"
+
+
+def iter_with_provenance_star(
+    triples: Iterable[Triple],
+    block_uri: URIRef,
+    created: Literal = None,
+    compact: bool = False,
+) -> Iterator[str]:
+    """Lazily yields each of the given triples and its provenance as RDF-star lines that annotate the quoted triple with
+    dcterms:created & prov:wasAssociatedWith.
+
+    This is the RDF-star equivalent of utils.iter_with_provenance(): 3 triples per data triple rather than 7. By default
+    the lines are N-Triples-star, 3 per data triple. If compact, they use Turtle-star's annotation syntax,
+    s p o {| dcterms:created ... ; prov:wasAssociatedWith ... |} ., 1 per data triple and less than half the size of
+    the reified N-Triples. rdflib cannot hold quoted triples, so the lines are for writing to a file, or uploading as
+    TURTLE_STAR, directly.
+
+    :param triples: The data triples
+    :type triples: Iterable[Triple]
+
+    :param block_uri: The Block the triples are associated with
+    :type block_uri: URIRef
+
+    :param created: The created time, shared by all the triples. If None, now, defaults to None
+    :type created: Literal, optional
+
+    :param compact: Whether to write Turtle-star annotations, rather than N-Triples-star, defaults to False
+    :type compact: bool, optional
+
+    :return: An iterator of lines
+    :rtype: Iterator[str]
+    """
+    created = f"{nt_term(DCTERMS.created)} {nt_term(created if created is not None else created_now())}"
+    associated_with = f"{nt_term(PROV.wasAssociatedWith)} {nt_term(block_uri)}"
+    if compact:
+        annotation = f" {{| {created} ; {associated_with} |}} .\n"
+        for s, p, o in triples:
+            yield f"{nt_term(s)} {nt_term(p)} {nt_term(o)}{annotation}"
+        return
+
+    annotations = (f" {created} .\n", f" {associated_with} .\n")
+    for s, p, o in triples:
+        yield nt_line(s, p, o)
+        q = quoted(s, p, o)
+        for annotation in annotations:
+            yield q + annotation
+
+
+def reified_to_star(g: Graph) -> Iterator[str]:
+    """Converts a graph with reified statement provenance, as made by utils.add_with_provenance(),
+    add_with_provenance_bulk() or star_to_reified(), to N-Triples-star lines.
+
+    Each rdf:Statement's other properties annotate its quoted triple. Those of a group a statement is dcterms:isPartOf,
+    from add_with_provenance_bulk(group_size=...), annotate each of the group's quoted triples. All other triples are
+    yielded as they are.
+
+    :param g: The graph
+    :type g: Graph
+
+    :return: An iterator of N-Triples-star lines
+    :rtype: Iterator[str]
+    """
+    statements: Dict[Node, str] = {}
+    for x in g.subjects(RDF.type, RDF.Statement):
+        try:
+            s, p, o = (g.value(x, r, any=False) for r in _REIFICATION)
+        except UniquenessError:
+            raise ProvWorkflowException(f"The statement {x} is reified more than once")
+        if s is None or p is None or o is None:
+            raise ProvWorkflowException(f"The statement {x} is not fully reified")
+        statements[x] = quoted(s, p, o)
+
+    groups: Dict[Node, List[str]] = {}
+    for x, q in statements.items():
+        for group in g.objects(x, DCTERMS.isPartOf):
+            if group not in statements:
+                groups.setdefault(group, []).append(q)
+
+    for s, p, o in g:
+        if s in statements:
+            if p == RDF.type and o == RDF.Statement or p in _REIFICATION:
+                continue
+            if p == DCTERMS.isPartOf and o in groups:
+                continue
+            yield f"{statements[s]} {nt_term(p)} {nt_term(o)} .\n"
+        elif s in groups:
+            annotation = f" {nt_term(p)} {nt_term(o)} .\n"
+            for q in groups[s]:
+                yield q + annotation
+        else:
+            yield nt_line(s, p, o)
+
+
+def star_to_reified(lines: Iterable[str]) -> Iterator[Triple]:
+    """Converts RDF-star lines, as made by iter_with_provenance_star() or reified_to_star(), to triples in which each
+    quoted triple is an rdf:Statement, as made by utils.add_with_provenance(), e.g. for loading into rdflib.
+
+    Lines may be N-Triples, N-Triples-star with a quoted triple as the subject, or a triple with a Turtle-star
+    {| ... |} annotation. Nested quoted triples are not supported.
+
+    :param lines: Lines, e.g. an open file
+    :type lines: Iterable[str]
+
+    :return: An iterator of triples
+    :rtype: Iterator[Triple]
+    """
+    statements: Dict[Tuple[Node, Node, Node], BNode] = {}
+
+    def annotate(triple, annotations, n):
+        x = statements.get(triple)
+        if x is None:
+            x = statements[triple] = BNode()
+            yield x, RDF.type, RDF.Statement
+            yield x, RDF.subject, triple[0]
+            yield x, RDF.predicate, triple[1]
+            yield x, RDF.object, triple[2]
+        for p, o in annotations:
+            yield x, _term(p, n), _term(o, n)
+
+    for n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        tokens = _TOKEN.findall(line)
+        if tokens[0] == "<<":
+            if len(tokens) != 8 or tokens[4] != ">>" or tokens[7] != ".":
+                raise ProvWorkflowException(
+                    f"Line {n} is not an annotated quoted triple: {line}"
+                )
+            triple = tuple(_term(t, n) for t in tokens[1:4])
+            yield from annotate(triple, [tokens[5:7]], n)
+        elif len(tokens) == 4 and tokens[3] == ".":
+            yield tuple(_term(t, n) for t in tokens[:3])
+        elif len(tokens) > 7 and tokens[3] == "{|" and tokens[-2:] == ["|}", "."]:
+            triple = tuple(_term(t, n) for t in tokens[:3])
+            yield triple
+            annotations = tokens[4:-2]
+            if len(annotations) % 3 != 2 or annotations[2::3] != [";"] * (
+                len(annotations) // 3
+            ):
+                raise ProvWorkflowException(
+                    f"Line {n} has a malformed annotation: {line}"
+                )
+            yield from annotate(triple, zip(annotations[0::3], annotations[1::3]), n)
+        else:
+            raise ProvWorkflowException(f"Line {n} is not a triple: {line}")
+
+
+def _term(token: str, n: int) -> Node:
+    if token in ("<<", ">>", "{|", "|}", ".", ";"):
+        raise ProvWorkflowException(f"Line {n} has {token} where a term should be")
+    return from_n3(token)
@@ -0,0 +1,234 @@
+import asyncio
+import inspect
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Dict, List, Mapping, Set
+
+from .block import Block
+from .clock import get_clock
+from .exceptions import ProvWorkflowException
+from .instrumentation import ResourceUsage
+
+EXECUTORS = ("thread", "process", "asyncio")
+
+# a Block's task: a function of no arguments or, for the asyncio executor, a coroutine function
+Task = Callable[[], object]
+
+
+def infer_dependencies(blocks: List[Block]) -> Dict[Block, List[Block]]:
+    """Infers which of the given Blocks each depends on: those that generated an Entity it used. Entities are the same
+    if they have the same URI
+
+    :param blocks: The Blocks
+    :type blocks: List[Block]
+
+    :return: Each Block's dependencies, in the order given
+    :rtype: Dict[Block, List[Block]]
+
+    :raises ProvWorkflowException: if the dependencies are cyclic
+    """
+    generators: Dict[object, List[Block]] = {}
+    for b in blocks:
+        for e in b.generated:
+            generators.setdefault(e.uri, []).append(b)
+
+    dependencies = {}
+    for b in blocks:
+        # a dict, used as an insertion-ordered set
+        deps = {}
+        for e in b.used:
+            for d in generators.get(e.uri, ()):
+                if d is not b:
+                    deps[d] = None
+        dependencies[b] = list(deps)
+
+    _check_acyclic(dependencies)
+    return dependencies
+
+
+def _check_acyclic(dependencies: Dict[Block, List[Block]]):
+    remaining = {b: len(deps) for b, deps in dependencies.items()}
+    dependents = _dependents(dependencies)
+    ready = [b for b, n in remaining.items() if n == 0]
+    done = 0
+    while ready:
+        b = ready.pop()
+        done += 1
+        for d in dependents[b]:
+            remaining[d] -= 1
+            if remaining[d] == 0:
+                ready.append(d)
+    if done != len(dependencies):
+        cyclic = [str(b.uri) for b, n in remaining.items() if n > 0]
+        raise ProvWorkflowException(
+            f"The Blocks' used & generated Entities are cyclic, involving {', '.join(cyclic)}"
+        )
+
+
+def _dependents(dependencies: Dict[Block, List[Block]]) -> Dict[Block, List[Block]]:
+    dependents = {b: [] for b in dependencies}
+    for b, deps in dependencies.items():
+        for d in deps:
+            dependents[d].append(b)
+    return dependents
+
+
+def _timed_call(task: Task):
+    """Runs a task, in whichever thread or process it's sent to, returning its result or exception and when it ran"""
+    clock = get_clock()
+    usage = ResourceUsage()
+    started = clock.now()
+    usage.start()
+    result = error = None
+    try:
+        result = task()
+    except Exception as e:
+        error = e
+    usage.stop()
+    return result, error, started, clock.now(), usage
+
+
+async def _timed_call_async(task: Task):
+    if not inspect.iscoroutinefunction(task):
+        return await asyncio.get_running_loop().run_in_executor(None, _timed_call, task)
+    clock = get_clock()
+    usage = ResourceUsage()
+    started = clock.now()
+    usage.start()
+    result = error = None
+    try:
+        result = await task()
+    except Exception as e:
+        error = e
+    usage.stop()
+    return result, error, started, clock.now(), usage
+
+
+class _Run:
+    """The state of one run of a set of Blocks' tasks"""
+
+    def __init__(self, tasks: Mapping[Block, Task], on_end: Callable[[Block], None]):
+        self.tasks = tasks
+        self.on_end = on_end
+        dependencies = infer_dependencies(list(tasks))
+        self.dependents = _dependents(dependencies)
+        self.remaining = {b: len(deps) for b, deps in dependencies.items()}
+        self.results = {}
+        self.errors = []
+
+        # recorded on the dependent Block, so that flushing a Block doesn't export those it informed before they've run
+        for b, deps in dependencies.items():
+            for d in deps:
+                if d not in b.was_informed_by:
+                    b.was_informed_by.append(d)
+
+    def ready(self) -> List[Block]:
+        return [b for b, n in self.remaining.items() if n == 0]
+
+    def finish(self, block: Block, outcome) -> List[Block]:
+        """Records a finished Block's outcome and returns the Blocks that are now ready to run"""
+        result, error, block.started_at_time, block.ended_at_time, usage = outcome
+        block.resource_usage = usage
+        self.on_end(block)
+        if error is not None:
+            self.errors.append(error)
+            return []
+        self.results[block] = result
+        if self.errors:
+            return []
+        ready = []
+        for d in self.dependents[block]:
+            self.remaining[d] -= 1
+            if self.remaining[d] == 0:
+                ready.append(d)
+        return ready
+
+    def outcome(self) -> Dict[Block, object]:
+        if self.errors:
+            raise self.errors[0]
+        return self.results
+
+
+def run_blocks(
+    tasks: Mapping[Block, Task],
+    executor: str = "thread",
+    max_workers: int = None,
+    on_end: Callable[[Block], None] = None,
+) -> Dict[Block, object]:
+    """Runs each Block's task once the tasks of the Blocks it depends on, see infer_dependencies(), have finished, with
+    independent tasks running concurrently.
+
+    Each Block's startedAtTime & endedAtTime are set to when its task ran, and its resource use recorded as per Block's
+    use as a context manager. Each Block prov:wasInformedBy the Blocks it depends on.
+
+    If a task raises an exception, no more tasks are started and, once running ones finish, the first exception is
+    raised.
+
+    :param tasks: Each Block's task, a function of no arguments. For the "process" executor, tasks must be picklable,
+        e.g. module-level functions or functools.partial()s of them. For "asyncio", tasks may be coroutine functions;
+        other functions are run in the event loop's default executor
+    :type tasks: Mapping[Block, Callable[[], object]]
+
+    :param executor: "thread", "process" or "asyncio", defaults to "thread"
+    :type executor: str, optional
+
+    :param max_workers: The most tasks run at once, for the "thread" & "process" executors. If None, the executor's
+        default, defaults to None
+    :type max_workers: int, optional
+
+    :param on_end: Called with each Block as its task finishes, in the calling thread, defaults to None
+    :type on_end: Callable[[Block], None], optional
+
+    :return: Each Block's task's result
+    :rtype: Dict[Block, object]
+    """
+    if executor not in EXECUTORS:
+        raise ProvWorkflowException(
+            f"The executor must be one of {', '.join(EXECUTORS)}, not {executor}"
+        )
+    run = _Run(tasks, on_end if on_end is not None else lambda block: None)
+    if executor == "asyncio":
+        return asyncio.run(_run_async(run))
+
+    pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    with pool_class(max_workers=max_workers) as pool:
+        running = {pool.submit(_timed_call, tasks[b]): b for b in run.ready()}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                for b in run.finish(running.pop(f), f.result()):
+                    running[pool.submit(_timed_call, tasks[b])] = b
+    return run.outcome()
+
+
+async def run_blocks_async(
+    tasks: Mapping[Block, Task], on_end: Callable[[Block], None] = None
+) -> Dict[Block, object]:
+    """As per run_blocks() with the "asyncio" executor, but run in the current event loop"""
+    return await _run_async(
+        _Run(tasks, on_end if on_end is not None else lambda block: None)
+    )
+
+
+async def _run_async(run: _Run) -> Dict[Block, object]:
+    running: Set[asyncio.Task] = set()
+    blocks = {}
+
+    def start(b: Block):
+        t = asyncio.ensure_future(_timed_call_async(run.tasks[b]))
+        blocks[t] = b
+        running.add(t)
+
+    for b in run.ready():
+        start(b)
+    while running:
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for t in done:
+            running.discard(t)
+            for b in run.finish(blocks.pop(t), t.result()):
+                start(b)
+    return run.outcome()
@@ -0,0 +1,200 @@
+import threading
+from pathlib import Path
+from typing import Dict, Union
+
+from rdflib import Graph, URIRef
+
+from .exceptions import ProvWorkflowException
+
+# rdflib serialisation formats that write every term in full, so bind no prefixes into the graph
+_UNPREFIXED_FORMATS = {"nt", "nt11", "ntriples", "nquads", "application/n-triples"}
+
+
+class Sink:
+    """A destination that ProvReporter.persist() writes provenance to.
+
+    persist() exports a ProvReporter's graph once and hands the same graph to every Sink it's writing to, in parallel,
+    so a Sink must only read the graph. Sinks are registered under a name with register_sink() so that they can be
+    given to persist() by name, or may be given to persist() directly.
+
+    rdflib's prefixed serialisers, e.g. Turtle's, bind prefixes such as ns1 into the graph's namespace store, which is
+    shared by every Sink. A Sink that serialises so must say so with binds_namespaces, and such Sinks are written to one
+    at a time, while the others are written to in parallel.
+    """
+
+    # whether write() binds prefixes into the graph's namespace store
+    binds_namespaces = False
+
+    def write(self, g: Graph, reporter) -> object:
+        """Writes a graph of provenance
+
+        :param g: The graph exported from reporter. Must not be modified
+        :type g: Graph
+
+        :param reporter: The ProvReporter being persisted
+        :type reporter: ProvReporter
+
+        :return: Anything useful to the caller, e.g. a serialisation, or None
+        :rtype: object
+        """
+        raise NotImplementedError
+
+
+class StringSink(Sink):
+    """Serialises the graph, returning the serialisation
+
+    :param format: An rdflib serialisation format, defaults to "turtle"
+    :type format: str, optional
+    """
+
+    def __init__(self, format: str = "turtle"):
+        self.format = format
+
+    @property
+    def binds_namespaces(self) -> bool:
+        return self.format not in _UNPREFIXED_FORMATS
+
+    def write(self, g: Graph, reporter) -> str:
+        return g.serialize(format=self.format)
+
+
+class FileSink(Sink):
+    """Serialises the graph to a file, returning the file's path
+
+    :param path: The file's path, defaults to "prov_reporter.ttl"
+    :type path: Union[Path, str], optional
+
+    :param format: An rdflib serialisation format, defaults to "turtle"
+    :type format: str, optional
+    """
+
+    def __init__(
+        self, path: Union[Path, str] = "prov_reporter.ttl", format: str = "turtle"
+    ):
+        self.path = Path(path)
+        self.format = format
+
+    @property
+    def binds_namespaces(self) -> bool:
+        return self.format not in _UNPREFIXED_FORMATS
+
+    def write(self, g: Graph, reporter) -> Path:
+        g.serialize(destination=str(self.path), format=self.format)
+        return self.path
+
+
+class GraphDBSink(Sink):
+    """Uploads the graph to a GraphDB repository in one streamed transaction, see graphdb.GraphDBClient. Triples go
+    into the ProvReporter's named graph, if it has one, returning the number of triples uploaded
+
+    :param client: The client to upload with. If None, one configured from the environment is made on first use,
+        defaults to None
+    :type client: GraphDBClient, optional
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from .graphdb import GraphDBClient
+
+                self._client = GraphDBClient()
+            return self._client
+
+    def write(self, g: Graph, reporter) -> int:
+        return self.client.upload(g, graph_uri=reporter.named_graph_uri)
+
+
+class SopSink(Sink):
+    """Inserts the graph into a SOP graph with sop.get_sop_client(), returning a bulk_load.BulkLoadReport
+
+    :param named_graph_uri: The SOP graph, using it's internal name e.g. "urn:x-evn-master:test-datagraph". If None, the
+        ProvReporter's named_graph_uri, defaults to None
+    :type named_graph_uri: Union[URIRef, str], optional
+    """
+
+    def __init__(self, named_graph_uri: Union[URIRef, str] = None):
+        self.named_graph_uri = named_graph_uri
+
+    def write(self, g: Graph, reporter):
+        from .sop import get_sop_client
+
+        named_graph_uri = (
+            self.named_graph_uri
+            if self.named_graph_uri is not None
+            else reporter.named_graph_uri
+        )
+        if named_graph_uri is None:
+            raise ProvWorkflowException(
+                "To persist to SOP, either the SopSink or the ProvReporter must have a named_graph_uri"
+            )
+        return get_sop_client().insert_data(named_graph_uri, g)
+
+
+_lock = threading.Lock()
+_sinks: Dict[str, Sink] = {
+    "string": StringSink(),
+    "file": FileSink(),
+    "graphdb": GraphDBSink(),
+    "sop": SopSink(),
+}
+
+
+def register_sink(name: str, sink: Sink):
+    """Registers a Sink so that ProvReporter.persist() can write to it by name. Replaces any Sink of that name,
+    including the built-in "string", "file", "graphdb" & "sop" Sinks
+
+    :param name: The name
+    :type name: str
+
+    :param sink: The Sink
+    :type sink: Sink
+    """
+    with _lock:
+        _sinks[name] = sink
+
+
+def get_sink(name: str) -> Sink:
+    """Gets the Sink registered under a name
+
+    :param name: The name
+    :type name: str
+
+    :return: The Sink
+    :rtype: Sink
+    """
+    try:
+        return _sinks[name]
+    except KeyError:
+        raise ProvWorkflowException(
+            f"No sink is registered as {name}. Registered sinks are {', '.join(sorted(_sinks))}"
+        )
+
+
+def write_to_sinks(g: Graph, reporter, sinks) -> list:
+    """Writes a graph to each of the given Sinks in parallel, waiting for all of them. If any fail, the first failure is
+    raised once the others have finished. Sinks that bind namespaces are written to one at a time, see Sink
+
+    :return: The Sinks' results, in order
+    :rtype: list
+    """
+    if len(sinks) == 1:
+        return [sinks[0].write(g, reporter)]
+    # imported here as most exports write to one sink, and importing it adds noticeably to import provworkflow
+    from concurrent.futures import ThreadPoolExecutor
+
+    binding = threading.Lock()
+
+    def write(sink: Sink):
+        if sink.binds_namespaces:
+            with binding:
+                return sink.write(g, reporter)
+        return sink.write(g, reporter)
+
+    with ThreadPoolExecutor(max_workers=len(sinks)) as pool:
+        futures = [pool.submit(write, sink) for sink in sinks]
+    return [f.result() for f in futures]
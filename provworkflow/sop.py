@@ -0,0 +1,257 @@
+import atexit
+import os
+import threading
+from typing import Optional
+
+from .bulk_load import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_IN_FLIGHT,
+    BulkLoadReport,
+    bulk_insert_data,
+)
+from .exceptions import ProvWorkflowException
+
+# the number of connections kept open to a SOP instance, and so the number of queries that may run at once
+DEFAULT_POOL_SIZE = 10
+
+
+class SopClient:
+    """A long-lived client for a Surround Ontology Platform (SOP) instance's SPARQL endpoint.
+
+    The client logs in once and then reuses its session, and the pooled connections of that session, for every query,
+    rather than logging in and out around each one. If SOP expires the session, the client logs in again and retries
+    the query once. A client may be shared by many threads: they query concurrently and, if the session expires, only
+    one of them logs in again.
+
+    requests is only imported when a client is first used, keeping it out of "import provworkflow".
+
+    :param base_uri: The base URI of the SOP instance. If None, the SOP_BASE_URI environment variable or
+        http://localhost:8083, defaults to None
+    :type base_uri: str, optional
+
+    :param username: If None, the SOP_USR environment variable or "Administrator", defaults to None
+    :type username: str, optional
+
+    :param password: If None, the SOP_PWD environment variable or "", defaults to None
+    :type password: str, optional
+
+    :param pool_size: The number of connections kept open to SOP, defaults to DEFAULT_POOL_SIZE
+    :type pool_size: int, optional
+
+    :param timeout: Seconds to wait for each HTTP response. If None, wait indefinitely, defaults to None
+    :type timeout: float, optional
+    """
+
+    def __init__(
+        self,
+        base_uri: str = None,
+        username: str = None,
+        password: str = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = None,
+    ):
+        self.base_uri = (
+            base_uri
+            if base_uri is not None
+            else os.environ.get("SOP_BASE_URI", "http://localhost:8083")
+        ).rstrip("/")
+        self.username = (
+            username
+            if username is not None
+            else os.environ.get("SOP_USR", "Administrator")
+        )
+        self.password = (
+            password if password is not None else os.environ.get("SOP_PWD", "")
+        )
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._logged_in = False
+        # incremented on each login so that, of the threads that see a session expire, only the first logs in again
+        self._generation = 0
+
+    def query(self, named_graph_uri, query, update=False):
+        """Perform read and write SPARQL queries against this client's SOP instance
+
+        :param named_graph_uri: the graph to write to within SOP, using it's internal name e.g.
+        "urn:x-evn-master:test-datagraph"
+        :param query: SPARQL query to send to the SPARQL endpoint
+        :param update: update = write
+        :return: HTTP response
+        :raises ProvWorkflowException: if SOP refuses this client's user access, with 403 Forbidden, or the session
+            can't be renewed
+        """
+        data = {
+            "default-graph-uri": named_graph_uri,
+        }
+        if update:
+            data["update"] = query
+            data["using-graph-uri"] = named_graph_uri
+        else:
+            data["query"] = query
+            data["with-imports"] = "true"
+
+        for _ in range(2):
+            session, generation = self._login()
+            response = session.post(
+                self.base_uri + "/tbl/sparql",
+                data=data,
+                headers={"Accept": "application/sparql-results+json"},
+                timeout=self.timeout,
+            )
+            if response.status_code == 403:
+                # logged in, but not allowed: logging in again won't help
+                raise ProvWorkflowException(
+                    f"SOP at {self.base_uri} refused {self.username} access to {named_graph_uri}: "
+                    f"{response.status_code} {response.text}"
+                )
+            if not _is_logged_out(response):
+                return response
+            self._expire(generation)
+
+        raise ProvWorkflowException(
+            f"The SOP session at {self.base_uri} expired and could not be renewed"
+        )
+
+    def insert_data(
+        self,
+        named_graph_uri,
+        triples,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> BulkLoadReport:
+        """Streams triples into a graph as size-bounded INSERT DATA queries sent concurrently over this client's pooled
+        connections, see bulk_load.bulk_insert_data()
+
+        :param named_graph_uri: the graph to write to within SOP, using it's internal name e.g.
+        "urn:x-evn-master:test-datagraph"
+        :param triples: triples, or quads whose graph is ignored, e.g. from a ProvReporter's iter_triples()
+        :param max_bytes: the most bytes of triples in each query
+        :param max_in_flight: the most queries sent at once. More than the client's pool_size opens extra connections
+        :return: the number of triples & queries sent and the triples per second
+        """
+
+        def update(query):
+            response = self.query(named_graph_uri, query, update=True)
+            if not response.ok:
+                raise ProvWorkflowException(
+                    f"SOP at {self.base_uri} rejected an INSERT DATA query: {response.status_code} {response.text}"
+                )
+            return response
+
+        return bulk_insert_data(
+            (t[:3] for t in triples),
+            update,
+            graph_uri=named_graph_uri,
+            max_bytes=max_bytes,
+            max_in_flight=max_in_flight,
+        )
+
+    def close(self):
+        """Logs out of SOP and closes this client's connections. The client logs in again if used afterwards"""
+        with self._lock:
+            session, self._session = self._session, None
+            logged_in, self._logged_in = self._logged_in, False
+        if session is None:
+            return
+        try:
+            if logged_in:
+                session.get(
+                    self.base_uri + "/tbl/purgeuser?app=edg", timeout=self.timeout
+                )
+        finally:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _login(self):
+        """Returns the session, logging in first if it isn't, and the generation of the login"""
+        with self._lock:
+            if self._session is None:
+                self._session = self._new_session()
+            if not self._logged_in:
+                # SOP only accepts credentials for a session it has already issued
+                self._session.get(self.base_uri + "/tbl", timeout=self.timeout)
+                response = self._session.post(
+                    self.base_uri + "/tbl/j_security_check",
+                    {"j_username": self.username, "j_password": self.password},
+                    timeout=self.timeout,
+                )
+                if not response.ok or _is_logged_out(response):
+                    raise ProvWorkflowException(
+                        f"Could not log in to SOP at {self.base_uri} as {self.username}"
+                    )
+                self._logged_in = True
+                self._generation += 1
+            return self._session, self._generation
+
+    def _expire(self, generation: int):
+        with self._lock:
+            if generation == self._generation:
+                self._logged_in = False
+                self._session.cookies.clear()
+
+    def _new_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+def _is_logged_out(response) -> bool:
+    # SOP answers requests from sessions it doesn't know with its login form, or with 401 Unauthorized. 403 Forbidden is
+    # an authorisation failure of a session that is logged in
+    if response.status_code == 401:
+        return True
+    return (
+        "html" in response.headers.get("Content-Type", "")
+        and "j_security_check" in response.text
+    )
+
+
+_lock = threading.Lock()
+_client: Optional[SopClient] = None
+
+
+def get_sop_client() -> SopClient:
+    """Gets the SopClient that utils.query_sop_sparql() uses. This is a client configured from the SOP_BASE_URI, SOP_USR
+    & SOP_PWD environment variables unless set_sop_client() has been called
+
+    :return: The SopClient
+    :rtype: SopClient
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = SopClient()
+    return _client
+
+
+def set_sop_client(client: Optional[SopClient]):
+    """Sets the SopClient that utils.query_sop_sparql() uses. The previous client is closed. None restores the default
+
+    :param client: The SopClient
+    :type client: SopClient
+    """
+    global _client
+    with _lock:
+        previous, _client = _client, client
+    if previous is not None and previous is not client:
+        previous.close()
+
+
+# SOP keeps sessions until they time out, so the shared client logs out when the process exits
+atexit.register(set_sop_client, None)
@@ -0,0 +1,53 @@
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Set, Tuple
+
+from rdflib import URIRef
+from rdflib.term import Node
+
+Triple = Tuple[Node, Node, Node]
+Quad = Tuple[Node, Node, Node, Optional[URIRef]]
+
+
+class TraversalContext:
+    """Tracks the state of a single export of a ProvReporter graph.
+
+    A ProvReporter node may be referenced by many others - a single Agent associated with thousands of Blocks, for
+    example - so the context records which nodes have already been serialised and each is emitted only once per export.
+
+    Nodes are identified by their URI: two Python objects with the same URI describe the same RDF node.
+
+    Referenced nodes are not serialised recursively but are placed on a work queue which the export drains, so cycles
+    (Entity.was_used_by -> Activity.used -> the same Entity) and very long chains (was_revision_of, informed) are
+    exported in bounded stack space.
+
+    An export may defer nodes, e.g. Activities that have not yet ended when a Workflow flushes a Block: nodes for which
+    defer(node) is true are not queued, or marked visited, but kept in deferred, by URI, for a later part of the export.
+
+    :param default_graph: The named graph of triples from nodes with no named_graph_uri of their own. None indicates the
+        default graph, defaults to None
+    :type default_graph: URIRef, optional
+    """
+
+    def __init__(self, default_graph: URIRef = None):
+        self.default_graph = default_graph
+        self.visited: Set[URIRef] = set()
+        self.queue: Deque = deque()
+        self.exporting = False
+        self.defer: Optional[Callable[[object], bool]] = None
+        self.deferred: Dict[URIRef, object] = {}
+
+    def visit(self, node) -> bool:
+        """Marks a node as visited, returning True if this is the first time it has been seen in this export"""
+        if node.uri in self.visited:
+            return False
+        self.visited.add(node.uri)
+        return True
+
+    def schedule(self, node):
+        """Queues a node for serialisation, unless it has already been visited in this export or is deferred"""
+        if self.defer is not None and self.defer(node):
+            if node.uri not in self.visited:
+                self.deferred[node.uri] = node
+            return
+        if self.visit(node):
+            self.queue.append(node)
@@ -1,11 +1,16 @@
-import os
+import itertools
+import secrets
 from datetime import datetime
-from typing import Union
+from typing import Iterable, Iterator, Union
 
-import requests
 from rdflib import Graph, URIRef, BNode, Literal
 from rdflib.namespace import DCTERMS, PROV, RDF, XSD
 
+from .minting import new_uri
+from .namespace import SKOLEM_BASE
+from .sop import get_sop_client
+from .traversal import Triple
+
 
 def now_as_xsd_datetime_stamp() -> str:
     """Return a local timezone-aware timestamp for xsd:dateTimeStamp values."""
@@ -20,52 +25,16 @@ def query_sop_sparql(named_graph_uri, query, update=False):
     :param query: SPARQL query to send to the SPARQL endpoint
     :param update: update = write
     :return: HTTP response
-    """
-
-    endpoint = os.environ.get("SOP_BASE_URI", "http://localhost:8083")
-    username = os.environ.get("SOP_USR", "Administrator")
-    password = os.environ.get("SOP_PWD", "")
-
-    global saved_session_cookies
-    with requests.session() as s:
-        s.get(endpoint + "/tbl")
-        reuse_sessions = False
-        # should be able to check the response contains
-        if reuse_sessions and saved_session_cookies:
-            s.cookies = saved_session_cookies
-        else:
-            s.post(
-                endpoint + "/tbl/j_security_check",
-                {"j_username": username, "j_password": password},
-            )
-            # detect success!
-            if reuse_sessions:
-                saved_session_cookies = s.cookies
-
-        data = {
-            "default-graph-uri": named_graph_uri,
-        }
-        if update:
-            data["update"] = query
-            data["using-graph-uri"] = named_graph_uri
-        else:
-            data["query"] = query
-            data["with-imports"] = "true"
 
-        response = s.post(
-            endpoint + "/tbl/sparql",
-            data=data,
-            headers={"Accept": "application/sparql-results+json"},
-        )
-        # force logout of session
-        s.get(endpoint + "/tbl/purgeuser?app=edg")
-        return response
-        # .json() if response.text else {}
+    Queries are sent by the process-wide SopClient, which logs in once and reuses its connections, see
+    sop.get_sop_client()
+    """
+    return get_sop_client().query(named_graph_uri, query, update=update)
 
 
 def make_sparql_insert_data(graph_uri, g):
-    """Places RDF into a SPARQL INSERT DATA query"""
-    nt = g.serialize(format="nt").decode()
+    """Places RDF into a SPARQL INSERT DATA query. For large graphs, see bulk_load.iter_insert_data()"""
+    nt = g.serialize(format="nt")
 
     q = """
     INSERT DATA {{
@@ -109,3 +78,125 @@ def add_with_provenance(
     g.add((x, PROV.wasAssociatedWith, block_uri))
 
     return g
+
+
+def created_now() -> Literal:
+    """Returns the current time as the xsd:dateTime dcterms:created of statement-level provenance"""
+    return Literal(datetime.now().strftime("%Y-%m-%dT%H:%M:%S"), datatype=XSD.dateTime)
+
+
+def iter_with_provenance(
+    triples: Iterable[Triple],
+    block_uri: URIRef,
+    created: Literal = None,
+    group_size: int = None,
+    skolemize: bool = True,
+) -> Iterator[Triple]:
+    """Lazily yields each of the given triples followed by its reified provenance, as per add_with_provenance(), for
+    annotating large data graphs without building a graph per triple.
+
+    One dcterms:created timestamp is shared by all the triples rather than being taken per triple.
+
+    If group_size is given, the triples are grouped: each reified statement is dcterms:isPartOf a group of up to
+    group_size statements and the group, rather than each statement, has the dcterms:created & prov:wasAssociatedWith,
+    taken when the group starts. This writes 6, rather than 7, triples per data triple.
+
+    Statements & groups are skolem IRIs, under SKOLEM_BASE, rather than blank nodes, so the triples may be split into
+    several requests, e.g. by bulk_load.bulk_insert_data(): a blank node's label is scoped to a single SPARQL update
+    request, so one split across requests becomes several disconnected nodes. If not skolemize, they are blank nodes and
+    a statement's triples, and a group's, must be loaded in one request.
+
+    :param triples: The data triples
+    :type triples: Iterable[Triple]
+
+    :param block_uri: The Block the triples are associated with
+    :type block_uri: URIRef
+
+    :param created: The created time. If None, now, as an xsd:dateTime, defaults to None
+    :type created: Literal, optional
+
+    :param group_size: The most statements in a group. If None, statements aren't grouped, defaults to None
+    :type group_size: int, optional
+
+    :param skolemize: Whether statements & groups are skolem IRIs, rather than blank nodes, defaults to True
+    :type skolemize: bool, optional
+
+    :return: An iterator of triples, e.g. for Graph.addN(), an NTriplesWriter or bulk_load.bulk_insert_data()
+    :rtype: Iterator[Triple]
+    """
+    # node IDs from a per-call random prefix & a counter are far cheaper than BNode()'s per-node random IDs
+    prefix = f"s{secrets.token_hex(16)}_"
+    ids = itertools.count()
+    if skolemize:
+        prefix = SKOLEM_BASE + prefix
+        node = new_uri
+    else:
+        node = BNode
+    statement, subject, predicate, object_ = (
+        RDF.Statement,
+        RDF.subject,
+        RDF.predicate,
+        RDF.object,
+    )
+    type_, created_, associated_with, part_of = (
+        RDF.type,
+        DCTERMS.created,
+        PROV.wasAssociatedWith,
+        DCTERMS.isPartOf,
+    )
+
+    def timestamp():
+        return created if created is not None else created_now()
+
+    if group_size is None:
+        when = timestamp()
+    else:
+        in_group = group_size
+
+    for s, p, o in triples:
+        yield s, p, o
+
+        x = node(f"{prefix}{next(ids)}")
+        yield x, type_, statement
+        yield x, subject, s
+        yield x, predicate, p
+        yield x, object_, o
+        if group_size is None:
+            yield x, created_, when
+            yield x, associated_with, block_uri
+        else:
+            if in_group == group_size:
+                group = node(f"{prefix}g{next(ids)}")
+                yield group, created_, timestamp()
+                yield group, associated_with, block_uri
+                in_group = 0
+            yield x, part_of, group
+            in_group += 1
+
+
+def add_with_provenance_bulk(
+    triples: Iterable[Triple],
+    block_uri: URIRef,
+    g: Graph = None,
+    created: Literal = None,
+    group_size: int = None,
+    skolemize: bool = True,
+) -> Graph:
+    """Adds the given triples and their reified provenance to a graph, see iter_with_provenance() for the parameters
+    not listed here
+
+    :param g: The graph to add to. If None, a new graph will be created, defaults to None
+    :type g: Graph, optional
+
+    :return: The graph
+    :rtype: Graph
+    """
+    if g is None:
+        g = Graph()
+    g.addN(
+        (s, p, o, g)
+        for s, p, o in iter_with_provenance(
+            triples, block_uri, created, group_size, skolemize
+        )
+    )
+    return g
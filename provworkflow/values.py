@@ -0,0 +1,313 @@
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import PROV, RDF, XSD
+
+from .namespace import SKOLEM_BASE, SPDX
+from .traversal import Triple
+
+# the longest value, in characters of its lexical form, written inline as a Literal if there is a BlobStore. Longer
+# values are stored in it and referenced
+DEFAULT_MAX_INLINE = 1 << 16
+# the directory of the default policy's BlobStore, if set. If not, the default policy writes all values inline
+BLOB_STORE_ENV = "PROVWF_BLOB_STORE"
+DEFAULT_BLOB_STORE_PATH = Path.home() / ".cache" / "provworkflow" / "blobs"
+# the characters of a str encoded, and written to a blob, at a time
+_CHUNK_SIZE = 1 << 20
+# the SPDX checksum algorithms, as in spdx:checksumAlgorithm_sha256, of hashlib's algorithms
+_SPDX_ALGORITHMS = {
+    "md5": "md5",
+    "sha1": "sha1",
+    "sha224": "sha224",
+    "sha256": "sha256",
+    "sha384": "sha384",
+    "sha512": "sha512",
+    "sha3_256": "sha3_256",
+    "sha3_384": "sha3_384",
+    "sha3_512": "sha3_512",
+    "blake2b": "blake2b512",
+}
+
+
+def _json_literal(value) -> Literal:
+    import json
+
+    return Literal(
+        json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str),
+        datatype=RDF.JSON,
+    )
+
+
+# converters of Python values to typed Literals, by type, see register_converter(). Types rdflib already gives XSD
+# datatypes, such as int, float, bool, Decimal & datetime, need none
+_converters: Dict[type, Callable[[object], Literal]] = {
+    bytes: lambda v: Literal(
+        base64.b64encode(v).decode("ascii"), datatype=XSD.base64Binary
+    ),
+    bytearray: lambda v: Literal(
+        base64.b64encode(v).decode("ascii"), datatype=XSD.base64Binary
+    ),
+    dict: _json_literal,
+    list: _json_literal,
+    tuple: _json_literal,
+}
+
+
+def register_converter(type_: type, converter: Callable[[object], Literal]):
+    """Registers how values of a type, and its subclasses, are converted to Literals, e.g. a pandas DataFrame to CSV
+    text, rather than by str()
+
+    :param type_: The type
+    :type type_: type
+
+    :param converter: A function of a value returning a Literal, ideally with a datatype
+    :type converter: Callable[[object], Literal]
+    """
+    _converters[type_] = converter
+
+
+def to_literal(value) -> Literal:
+    """Converts a Python value to a Literal with, where known, an XSD or rdf:JSON datatype: by a registered converter,
+    see register_converter(), for the value's type or the nearest of its superclasses or, failing that, by rdflib
+
+    :param value: The value
+    :return: The Literal
+    :rtype: Literal
+    """
+    if isinstance(value, Literal):
+        return value
+    for t in type(value).__mro__:
+        converter = _converters.get(t)
+        if converter is not None:
+            return converter(value)
+    return Literal(value)
+
+
+def _base64_length(data) -> int:
+    return 4 * ((memoryview(data).nbytes + 2) // 3)
+
+
+class BlobStore:
+    """A local, content-addressed store of values too large to write inline into provenance. Each blob is written once,
+    to a file named by the SHA-256 digest of its contents, so a value stored again, in any run, costs only its hashing.
+
+    :param path: The store's directory. If None, the PROVWF_BLOB_STORE environment variable or, if that's not set,
+        ~/.cache/provworkflow/blobs, defaults to None
+    :type path: Union[Path, str], optional
+    """
+
+    def __init__(self, path: Union[Path, str] = None):
+        if path is None:
+            path = os.getenv(BLOB_STORE_ENV, DEFAULT_BLOB_STORE_PATH)
+        self.path = Path(path)
+
+    def put(self, data: Union[str, bytes, bytearray, memoryview]) -> Tuple[URIRef, str]:
+        """Stores a value's lexical form, UTF-8 encoded, or bytes as they are, unless it's already stored. Either way,
+        the blob's digest is the value's, see hashing.digest_value()
+
+        :param data: The value's lexical form, or bytes
+        :type data: Union[str, bytes, bytearray, memoryview]
+
+        :return: The file URI of the blob and its digest, as per hashing.digest_value(), e.g. "sha256:9f86d0..."
+        :rtype: Tuple[URIRef, str]
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        h = hashlib.sha256()
+        # written to a temporary file while hashing, then renamed, so that a blob is never seen partly written
+        fd, temp = tempfile.mkstemp(dir=self.path, prefix=".blob-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(data, str):
+                    chunks = (
+                        data[start : start + _CHUNK_SIZE].encode("utf-8")
+                        for start in range(0, len(data), _CHUNK_SIZE)
+                    )
+                else:
+                    view = memoryview(data).cast("B")
+                    chunks = (
+                        view[start : start + _CHUNK_SIZE]
+                        for start in range(0, len(view), _CHUNK_SIZE)
+                    )
+                for chunk in chunks:
+                    h.update(chunk)
+                    f.write(chunk)
+            hexdigest = h.hexdigest()
+            blob = self.blob_path(hexdigest)
+            if blob.exists():
+                os.remove(temp)
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp, blob)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return URIRef(blob.resolve().as_uri()), f"sha256:{hexdigest}"
+
+    def blob_path(self, hexdigest: str) -> Path:
+        """The path of the blob with the given SHA-256 hex digest"""
+        return self.path / "sha256" / hexdigest[:2] / hexdigest
+
+
+class ValuePolicy:
+    """Decides how Entities' values are written to provenance, alongside each Entity's digest, as an spdx:checksum.
+
+    Without a store, every value is written inline, as a typed Literal, see to_literal(), so provenance is portable.
+    With a store, values whose lexical form is longer than max_inline characters are instead stored in it and referenced
+    by the blob's file URI, and the checksum is the blob's digest, so the blob can be verified against it. Files, given
+    as os.PathLikes such as pathlib.Paths, are then already out of line so are referenced where they are. File URIs are
+    only meaningful on the host that wrote them, so a store is opt-in: set one, or the PROVWF_BLOB_STORE environment
+    variable for the default policy.
+
+    Values are stored when first exported and the blob's URI remembered by the Entity's digest, so exporting the
+    Entity again neither converts nor stores its value again.
+
+    :param max_inline: The longest value, in characters, written inline if there is a store, defaults to
+        DEFAULT_MAX_INLINE, 64 Ki
+    :type max_inline: int, optional
+
+    :param store: Where longer values are stored. If None, all values are written inline, defaults to None
+    :type store: BlobStore, optional
+    """
+
+    def __init__(self, max_inline: int = DEFAULT_MAX_INLINE, store: BlobStore = None):
+        self.max_inline = max_inline
+        self.store = store
+        self._lock = threading.Lock()
+        # the URIs & digests of stored blobs, by the digests of the values stored
+        self._stored: Dict[str, Tuple[URIRef, str]] = {}
+
+    def triples(self, entity) -> Iterator[Triple]:
+        """Yields an Entity's prov:value and its digest as an spdx:checksum, see checksum_triples(), if it has a value
+
+        :param entity: The Entity
+        :type entity: Entity
+
+        :return: An iterator of triples
+        :rtype: Iterator[Triple]
+        """
+        value = entity.value
+        if value is None:
+            return
+        digest = entity.digest
+
+        if isinstance(value, os.PathLike) and self.store is not None:
+            yield entity.uri, PROV.value, URIRef(Path(value).resolve().as_uri())
+        else:
+            node, blob_digest = self._place(value, digest)
+            yield entity.uri, PROV.value, node
+            if blob_digest is not None:
+                digest = blob_digest
+
+        if digest is not None:
+            yield from checksum_triples(entity.uri, digest)
+
+    def to_node(self, value, digest: Optional[str] = None) -> Union[Literal, URIRef]:
+        """Returns a value as a Literal or, if there is a store and the value is too long to write inline, the URI of
+        the blob it's stored in
+
+        :param value: The value
+        :param digest: The value's digest, by which the URIs of stored values are remembered, defaults to None
+        :type digest: str, optional
+
+        :return: The Literal or URI
+        :rtype: Union[Literal, URIRef]
+        """
+        return self._place(value, digest)[0]
+
+    def _place(
+        self, value, digest: Optional[str]
+    ) -> Tuple[Union[Literal, URIRef], Optional[str]]:
+        """Returns a value as a Literal, and None, or as the URI of the blob it's stored in, and the blob's digest"""
+        if self.store is None:
+            return to_literal(value), None
+
+        if digest is not None:
+            with self._lock:
+                stored = self._stored.get(digest)
+            if stored is not None:
+                return stored
+
+        # a str's length, and bytes' base64 length, is known without converting it. Bytes are stored as they are, not as
+        # base64, so their blob is no larger than they are and has the same digest
+        if isinstance(value, str) and len(value) > self.max_inline:
+            data = value
+        elif (
+            isinstance(value, (bytes, bytearray, memoryview))
+            and _base64_length(value) > self.max_inline
+        ):
+            data = value
+        else:
+            literal = to_literal(value)
+            if len(literal) <= self.max_inline:
+                return literal, None
+            data = str(literal)
+
+        stored = self.store.put(data)
+        if digest is not None:
+            with self._lock:
+                self._stored[digest] = stored
+        return stored
+
+
+def checksum_triples(uri: URIRef, digest: str) -> Iterator[Triple]:
+    """Yields a digest, as per hashing.digest_value(), as the spdx:checksum of the node with the given URI. The
+    spdx:Checksum is a skolem IRI, under SKOLEM_BASE, of the node's URI & the digest, so it's the same in every export.
+    Digests by algorithms SPDX has no term for are not written
+
+    :param uri: The URI of the node, e.g. an Entity
+    :type uri: URIRef
+
+    :param digest: The digest, e.g. "sha256:9f86d0..."
+    :type digest: str
+
+    :return: An iterator of triples
+    :rtype: Iterator[Triple]
+    """
+    algorithm, _, hexdigest = digest.partition(":")
+    spdx_algorithm = _SPDX_ALGORITHMS.get(algorithm)
+    if spdx_algorithm is None or not hexdigest:
+        return
+    key = hashlib.blake2b(f"{uri}\0{digest}".encode("utf-8"), digest_size=16)
+    checksum = URIRef(f"{SKOLEM_BASE}checksum/{key.hexdigest()}")
+    yield uri, SPDX.checksum, checksum
+    yield checksum, RDF.type, SPDX.Checksum
+    yield checksum, SPDX.algorithm, SPDX[f"checksumAlgorithm_{spdx_algorithm}"]
+    yield checksum, SPDX.checksumValue, Literal(hexdigest, datatype=XSD.hexBinary)
+
+
+_lock = threading.Lock()
+_value_policy: Optional[ValuePolicy] = None
+
+
+def get_value_policy() -> ValuePolicy:
+    """Gets the ValuePolicy Entities' values are written by. Unless set_value_policy() has been called, this writes all
+    values inline or, if the PROVWF_BLOB_STORE environment variable is set, stores long values in a BlobStore there
+
+    :return: The ValuePolicy
+    :rtype: ValuePolicy
+    """
+    global _value_policy
+    if _value_policy is None:
+        with _lock:
+            if _value_policy is None:
+                path = os.getenv(BLOB_STORE_ENV)
+                _value_policy = ValuePolicy(store=BlobStore(path) if path else None)
+    return _value_policy
+
+
+def set_value_policy(policy: Optional[ValuePolicy]):
+    """Sets the ValuePolicy Entities' values are written by, e.g. set_value_policy(ValuePolicy(store=BlobStore())) to
+    store long values out of line. None restores the default
+
+    :param policy: The ValuePolicy
+    :type policy: ValuePolicy
+    """
+    global _value_policy
+    _value_policy = policy
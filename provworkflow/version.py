@@ -0,0 +1,85 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from rdflib import URIRef
+
+from .exceptions import ProvWorkflowException
+
+# a precomputed version URI, e.g. set at container build time
+VERSION_URI_ENV = "PROVWF_VERSION_URI"
+# the path of a file containing a precomputed version URI, e.g. written at build time
+VERSION_FILE_ENV = "PROVWF_VERSION_FILE"
+# set to "true" to resolve the version URI from the Git repo the process runs in
+INCLUDE_GIT_INFO_ENV = "INCLUDE_GIT_INFO"
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def get_version_uri() -> Optional[URIRef]:
+    """Gets the version URI recorded for ProvReporters, resolving it only once per process.
+
+    The version URI is, in order of preference:
+
+    1. the value of the PROVWF_VERSION_URI environment variable
+    2. the contents of the file named by the PROVWF_VERSION_FILE environment variable
+    3. if INCLUDE_GIT_INFO is "true", the URI of the Git commit or tag of the repo the process is running in
+
+    The first two never import GitPython. Git resolution walks directories, opens the repo and spawns git processes so
+    its result is cached for the life of the process; call clear_version_cache() if the repo changes underneath it.
+
+    :return: The version URI or None if there is none
+    :rtype: Optional[URIRef]
+    """
+    key = (
+        os.getenv(VERSION_URI_ENV),
+        os.getenv(VERSION_FILE_ENV),
+        os.getenv(INCLUDE_GIT_INFO_ENV) == "true",
+    )
+    try:
+        return _cache[key]
+    except KeyError:
+        pass
+
+    with _lock:
+        if key not in _cache:
+            _cache[key] = _resolve_version_uri(*key)
+        return _cache[key]
+
+
+def clear_version_cache():
+    """Forgets any resolved version URI so that it is resolved again on next use"""
+    with _lock:
+        _cache.clear()
+
+
+def _resolve_version_uri(
+    version_uri: Optional[str], version_file: Optional[str], include_git_info: bool
+) -> Optional[URIRef]:
+    if version_uri:
+        return URIRef(version_uri.strip())
+
+    if version_file:
+        try:
+            return URIRef(Path(version_file).read_text().strip())
+        except OSError as e:
+            raise ProvWorkflowException(
+                f"Could not read the version URI file {version_file} given in {VERSION_FILE_ENV}: {e}"
+            )
+
+    if include_git_info:
+        try:
+            from .git_utils import get_version_uri as get_git_version_uri
+
+            uri_str = get_git_version_uri()
+            if uri_str is not None:
+                return URIRef(uri_str)
+
+        except ImportError:
+            print(
+                "Git executable not found on system - git related functionality not available"
+            )
+
+    return None
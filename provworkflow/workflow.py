@@ -1,13 +1,17 @@
-from typing import List, Union
+from typing import Callable, Dict, Iterator, List, Mapping, Union
 
-from rdflib import URIRef, Graph, Literal
+from rdflib import URIRef, Literal
 from rdflib.namespace import OWL, PROV, RDF, RDFS, XSD
+from rdflib.term import Node
 
 from .namespace import PROVWF
 from .activity import Activity
 from .agent import Agent
 from .block import Block
 from . import ProvWorkflowException
+from .traversal import Quad, TraversalContext, Triple
+from .clock import get_clock
+from .ntriples import DEFAULT_BUFFER_SIZE, NTriplesWriter
 
 
 class Workflow(Activity):
@@ -37,8 +41,22 @@ class Workflow(Activity):
 
     :param blocks: A list of Blocks that were run by this Workflow
     :type blocks: List[Block], optional
+
+    :param sink: Where end_block() & end() flush provenance to incrementally: any object with write(quads) and flush()
+        methods, such as an NTriplesWriter, defaults to None
+    :type sink: NTriplesWriter, optional
     """
 
+    __slots__ = (
+        "blocks",
+        "sink",
+        "_flush_context",
+        "_flush_io",
+        "_flushed_blocks",
+        "_merged",
+        "_positions",
+    )
+
     def __init__(
         self,
         uri: URIRef = None,
@@ -47,6 +65,7 @@ class Workflow(Activity):
         was_associated_with: Agent = None,
         blocks: List[Block] = None,
         class_uri: Union[URIRef, str] = None,
+        sink=None,
     ):
         super().__init__(
             uri=uri,
@@ -60,63 +79,320 @@ class Workflow(Activity):
         if self.blocks is None:
             self.blocks = []
 
-    def prov_to_graph(self, g=None):
-        if self.blocks is None or len(self.blocks) < 1:
+        # incremental flushing state, see end_block()
+        self.sink = sink
+        self._flush_context = None
+        self._flush_io = None
+        self._flushed_blocks = []
+        # the positions of Blocks in blocks, by id(), so that ended Blocks are released in constant time. May be stale
+        # as blocks may be changed directly, so checked before use
+        self._positions: Dict[int, int] = {}
+
+        # the provenance of Blocks run in other processes, see merge()
+        self._merged = []
+
+    def end_block(self, block: Block):
+        """Ends a Block, flushes its provenance to this Workflow's sink and releases it from this Workflow.
+
+        The Block's triples, and those of any nodes it references that have not already been flushed, are written
+        immediately, so a long-running Workflow holds in memory only the Blocks that have not yet ended and a crash loses
+        only their provenance. The Workflow itself, and its prov:used/prov:generated summary, are written by end().
+
+        Nodes referenced by this Block are flushed with it, other than Activities, such as other Blocks, that have not
+        yet ended. Those are flushed when they end or, if they never are, by end().
+
+        :param block: The Block that has ended. It need not have been added to this Workflow's blocks
+        :type block: Block
+        """
+        self._start_flushing()
+
+        if block.ended_at_time is None:
+            block.ended_at_time = get_clock().now()
+
+        context = self._flush_context
+        context.defer = _not_ended
+        try:
+            self.sink.write(self._flush_io.observe(block.iter_quads(context)))
+        finally:
+            context.defer = None
+        self.sink.flush()
+
+        context.deferred.pop(block.uri, None)
+        self._flushed_blocks.append(block.uri)
+        self._release(block)
+
+    def _release(self, block: Block):
+        """Removes a Block from blocks, if it's there, in constant time by moving the last Block into its place: the
+        order of blocks is unimportant"""
+        blocks = self.blocks
+        positions = self._positions
+        i = positions.pop(id(block), None)
+        if blocks and blocks[-1] is block:
+            # typically, a Block appended & then ended
+            blocks.pop()
+            return
+        if i is None or i >= len(blocks) or blocks[i] is not block:
+            # blocks has changed since it was indexed, e.g. by appending, or block isn't in it
+            positions = self._positions = {id(b): j for j, b in enumerate(blocks)}
+            i = positions.pop(id(block), None)
+            if i is None:
+                return
+        last = blocks.pop()
+        if last is not block:
+            blocks[i] = last
+            positions[id(last)] = i
+
+    def merge(self, fragment: "Fragment"):
+        """Merges the provenance of Blocks run in another process, captured there by fragments.capture(), into this
+        Workflow.
+
+        Nodes are the same if they have the same URI, so those in more than one fragment, or also in this Workflow's own
+        export, are only exported once. Merging doesn't depend on the size of this Workflow: the fragment is only decoded
+        on export or, if this Workflow has a sink, written to the sink immediately, as per end_block(). Written as N-Quads,
+        by write_nquads() or to an NTriplesWriter sink, its triples aren't decoded at all but written as captured.
+
+        :param fragment: The fragment
+        :type fragment: Fragment
+        """
+        if self.sink is not None:
+            self._start_flushing()
+            _write_fragment(self.sink, fragment, self._flush_context, self._flush_io)
+            self.sink.flush()
+        else:
+            self._merged.append(fragment)
+        self._flushed_blocks.extend(fragment.blocks)
+
+    def run(
+        self,
+        tasks: Mapping[Block, Callable[[], object]],
+        executor: str = "thread",
+        max_workers: int = None,
+    ) -> Dict[Block, object]:
+        """Runs each Block's task, running Blocks that don't depend on one another concurrently, see
+        scheduler.run_blocks().
+
+        A Block depends on those that generated the Entities it used, and is recorded as having been informed by them.
+        Each Block's startedAtTime & endedAtTime are when its task ran. The Blocks are added to this Workflow and, if it
+        has a sink, each is flushed by end_block() as it finishes.
+
+        :param tasks: Each Block's task, a function of no arguments
+        :type tasks: Mapping[Block, Callable[[], object]]
+
+        :param executor: "thread", "process" or "asyncio", defaults to "thread"
+        :type executor: str, optional
+
+        :param max_workers: The most tasks run at once, for the "thread" & "process" executors, defaults to None
+        :type max_workers: int, optional
+
+        :return: Each Block's task's result
+        :rtype: Dict[Block, object]
+        """
+        from .scheduler import run_blocks
+
+        self._add_blocks(tasks)
+        return run_blocks(
+            tasks,
+            executor=executor,
+            max_workers=max_workers,
+            on_end=self.end_block if self.sink is not None else None,
+        )
+
+    async def run_async(
+        self, tasks: Mapping[Block, Callable[[], object]]
+    ) -> Dict[Block, object]:
+        """As per run() with the "asyncio" executor, but run in the current event loop"""
+        from .scheduler import run_blocks_async
+
+        self._add_blocks(tasks)
+        return await run_blocks_async(
+            tasks, on_end=self.end_block if self.sink is not None else None
+        )
+
+    def _add_blocks(self, blocks):
+        present = {id(b) for b in self.blocks}
+        self.blocks.extend(b for b in blocks if id(b) not in present)
+
+    def end(self):
+        """Ends this Workflow and flushes the remainder of its provenance to its sink: the Workflow itself, any Blocks not
+        already flushed by end_block() and the Workflow's prov:used/prov:generated summary
+        """
+        self._start_flushing()
+        self._finalise()
+        self._write(self.sink, self._flush_context, self._flush_io)
+        self.sink.flush()
+
+    def _start_flushing(self):
+        if self.sink is None:
+            raise ProvWorkflowException(
+                "A Workflow must have a sink to flush its Blocks to"
+            )
+
+        # the same export state spans all flushes so that nodes shared between Blocks are written once
+        if self._flush_context is None:
+            self._flush_context = TraversalContext(default_graph=self.named_graph_uri)
+            self._flush_io = _BlockIO()
+
+    def iter_quads(self, context: TraversalContext = None) -> Iterator[Quad]:
+        self._finalise()
+        if context is None:
+            context = TraversalContext(default_graph=self.named_graph_uri)
+        return self._iter_quads(context, _BlockIO())
+
+    def write_nquads(self, fh, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self._finalise()
+        writer = NTriplesWriter(fh, buffer_size=buffer_size)
+        self._write(
+            writer, TraversalContext(default_graph=self.named_graph_uri), _BlockIO()
+        )
+        writer.flush()
+
+    def _finalise(self):
+        if len(self.blocks) + len(self._flushed_blocks) < 1:
             raise ProvWorkflowException(
                 "A Workflow must have at least one Block within it"
             )
 
-        if g is None:
-            if self.named_graph_uri is not None:
-                g = Graph(identifier=URIRef(self.named_graph_uri))
-            else:
-                g = Graph()
+        # Blocks end before the Workflow that contains them does
+        for block in self.blocks:
+            if block.ended_at_time is None:
+                block.ended_at_time = get_clock().now()
+        if self.ended_at_time is None:
+            self.ended_at_time = get_clock().now()
+
+    def _iter_quads(
+        self, context: TraversalContext, block_io: "_BlockIO"
+    ) -> Iterator[Quad]:
+        yield from block_io.observe(self._iter_own_quads(context))
+        for fragment in self._merged:
+            yield from block_io.observe(fragment.iter_quads(context))
+        yield from self._iter_summary(block_io)
+
+    def _write(self, sink, context: TraversalContext, block_io: "_BlockIO"):
+        """Writes the quads of _iter_quads() to a sink, writing merged fragments' as they were captured if it can"""
+        if not hasattr(sink, "write_lines"):
+            sink.write(self._iter_quads(context, block_io))
+            return
+        sink.write(block_io.observe(self._iter_own_quads(context)))
+        for fragment in self._merged:
+            _write_fragment(sink, fragment, context, block_io)
+        sink.write(self._iter_summary(block_io))
+
+    def _iter_own_quads(self, context: TraversalContext) -> Iterator[Quad]:
+        yield from super().iter_quads(context)
+        # Activities deferred by end_block(), and not flushed since, that nothing exported since references
+        deferred, context.deferred = context.deferred, {}
+        for node in deferred.values():
+            yield from node.iter_quads(context)
+
+    def _iter_summary(self, block_io: "_BlockIO") -> Iterator[Quad]:
+        for p, o in block_io.summary():
+            yield self.uri, p, o, self.named_graph_uri
+
+    def _triples(self, context: TraversalContext) -> Iterator[Triple]:
+        # build all the details for the Workflow itself
+        yield from super()._triples(context)
 
         # add in type
-        g.add((self.uri, RDF.type, PROVWF.Workflow))
-        g.remove((self.uri, RDF.type, PROV.Activity))
+        yield self.uri, RDF.type, PROVWF.Workflow
 
         # add in type
         if self.__class__.__name__ != "Workflow":
-            g.add((self.uri, RDFS.subClassOf, PROVWF.Block))
-            g.add((self.uri, RDF.type, self.class_uri))
-            g.remove((self.uri, RDF.type, PROV.Activity))
+            yield self.uri, RDFS.subClassOf, PROVWF.Block
+            yield self.uri, RDF.type, self.class_uri
 
         # soft typing using the version_uri
         if self.version_uri is not None:
-            g.add(
-                (
-                    self.uri,
-                    OWL.versionIRI,
-                    Literal(str(self.version_uri), datatype=XSD.anyURI),
-                )
+            yield self.uri, OWL.versionIRI, Literal(
+                str(self.version_uri), datatype=XSD.anyURI
             )
 
+        # Blocks already flushed by end_block() or merged from other processes
+        for block_uri in self._flushed_blocks:
+            yield self.uri, PROVWF.hadBlock, block_uri
+
         # add the prov graph of each block to this Workflow's prov graph
         for block in self.blocks:
-            block.prov_to_graph(g)
+            context.schedule(block)
             # associate this Block with this Workflow
-            g.add((self.uri, PROVWF.hadBlock, block.uri))
+            yield self.uri, PROVWF.hadBlock, block.uri
 
-        # build all the details for the Workflow itself
-        g = super().prov_to_graph(g)
 
+# the object of the prov:wasAttributedTo triple with which an Entity marks itself as external
+_EXTERNAL = Literal("Workflow")
+
+
+class _BlockIO:
+    """An index of the inputs, outputs & externals of a Workflow's Blocks from which the Workflow's own prov:used &
+    prov:generated are calculated.
+
+    The index is updated as each Block's triples pass by, whether in a full export or as Blocks are flushed by
+    Workflow.end_block(), so the Workflow's triples are never rescanned. Each is kept as a dict, used as an
+    insertion-ordered set, so the summary is linear in the number of Entities."""
+
+    # the predicates of the triples of interest
+    PREDICATES = (PROV.used, PROV.generated, PROV.wasAttributedTo)
+
+    def __init__(self):
+        self.inputs = {}
+        self.outputs = {}
+        self.externals = {}
+
+    def observe(self, quads: Iterator[Quad]) -> Iterator[Quad]:
+        # looking predicates up in a dict, rather than comparing each with ==, avoids rdflib's Python-level term
+        # equality for the many triples that are of no interest here
+        indexes = {PROV.used: self.inputs, PROV.generated: self.outputs}
+        attributed_to = PROV.wasAttributedTo
+        for s, p, o, graph in quads:
+            yield s, p, o, graph
+            index = indexes.get(p)
+            if index is not None:
+                index[o] = None
+            elif type(o) is Literal and p == attributed_to and o == _EXTERNAL:
+                self.externals[s] = None
+
+    def see(self, s: Node, p: Node, o: Node):
+        """Updates the index with a triple, as per observe(), for triples seen other than as quads. Only those with one
+        of PREDICATES are of interest"""
+        if p == PROV.used:
+            self.inputs[o] = None
+        elif p == PROV.generated:
+            self.outputs[o] = None
+        elif p == PROV.wasAttributedTo and type(o) is Literal and o == _EXTERNAL:
+            self.externals[s] = None
+
+    def summary(self) -> Iterator[tuple]:
+        """Yields the (predicate, object) pairs of the Workflow's prov:used & prov:generated"""
         # attach external Block inputs and outputs to the Workflow
-        all_inputs = [o for o in g.objects(subject=None, predicate=PROV.used)]
-        all_outputs = [o for o in g.objects(subject=None, predicate=PROV.generated)]
-        for i in [x for x in all_inputs if x not in all_outputs]:
-            g.add((self.uri, PROV.used, i))
+        for i in self.inputs:
+            if i not in self.outputs:
+                yield PROV.used, i
 
-        for o in [x for x in all_outputs if x not in all_inputs]:
-            g.add((self.uri, PROV.generated, o))
+        workflow_outputs = {o: None for o in self.outputs if o not in self.inputs}
+        for o in workflow_outputs:
+            yield PROV.generated, o
 
         # add back in any externals
-        for s in g.subjects(predicate=PROV.wasAttributedTo, object=Literal("Workflow")):
-            g.add((self.uri, PROV.generated, s))
-            g.remove((s, PROV.generated, Literal("")))
-
-        return g
+        for e in self.externals:
+            if e not in workflow_outputs:
+                yield PROV.generated, e
 
 
 class WorkflowException(Exception):
     pass
+
+
+def _write_fragment(
+    sink, fragment: "Fragment", context: TraversalContext, block_io: _BlockIO
+):
+    """Writes a merged fragment's quads to a sink: as the N-Quads lines it was captured as, without parsing its terms,
+    if the sink can write lines, such as an NTriplesWriter, or else as quads"""
+    write_lines = getattr(sink, "write_lines", None)
+    if write_lines is not None:
+        write_lines(fragment.iter_nquads(context, block_io.see, _BlockIO.PREDICATES))
+    else:
+        sink.write(block_io.observe(fragment.iter_quads(context)))
+
+
+def _not_ended(node) -> bool:
+    """Whether a node is an Activity that has not yet ended, so must not be flushed"""
+    return isinstance(node, Activity) and node.ended_at_time is None
@@ -0,0 +1,264 @@
+import asyncio
+import atexit
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .exceptions import ProvWorkflowException
+from .traversal import Quad
+
+# the most finished ProvReporters' exports, or Workflow flushes, waiting to be uploaded before submit() blocks
+DEFAULT_MAX_QUEUE = 1000
+# the most queued items uploaded in one batch
+DEFAULT_MAX_BATCH = 100
+# how long the uploader waits for more items to fill a batch, in seconds
+DEFAULT_LINGER = 0.05
+
+# put on the queue to stop the uploader
+_STOP = object()
+
+
+class WriteBehindStats:
+    """A snapshot of a WriteBehindSink's queue and uploads"""
+
+    def __init__(self):
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.uploaded = 0
+        self.failed = 0
+        self.batches = 0
+        self.quads = 0
+        # seconds taken by each call to upload()
+        self.upload_seconds = 0.0
+        self.max_upload_seconds = 0.0
+        # seconds from an item's submission to the end of its upload
+        self.latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+    @property
+    def mean_upload_seconds(self) -> float:
+        return self.upload_seconds / self.batches if self.batches else 0.0
+
+    @property
+    def mean_latency_seconds(self) -> float:
+        done = self.uploaded + self.failed
+        return self.latency_seconds / done if done else 0.0
+
+    def copy(self) -> "WriteBehindStats":
+        stats = WriteBehindStats()
+        stats.__dict__.update(self.__dict__)
+        return stats
+
+    def __repr__(self):
+        return (
+            f"WriteBehindStats(queue_depth={self.queue_depth}, submitted={self.submitted}, "
+            f"uploaded={self.uploaded}, failed={self.failed}, batches={self.batches}, "
+            f"mean_upload_seconds={self.mean_upload_seconds:.3f}, mean_latency_seconds={self.mean_latency_seconds:.3f})"
+        )
+
+
+class WriteBehindSink:
+    """Uploads provenance from a background thread so that workflows don't wait on the network.
+
+    Finished ProvReporters, typically Blocks & Workflows, are handed to submit(), or from asyncio code to
+    submit_async(), exported there, on the calling thread, and their quads placed on a bounded queue. Exporting reads
+    the nodes a ProvReporter references, which the workflow may still be changing, and stamps the ended_at_time of
+    Activities that haven't ended, so it isn't left to the uploader. A background thread takes the quads off the queue in
+    batches and makes a single upload() call per batch. When the queue is full, submit() blocks until the uploader
+    catches up, so a workflow producing provenance faster than it can be uploaded is slowed rather than using unbounded
+    memory.
+
+    A WriteBehindSink may also be a Workflow's sink, receiving each Block's quads from Workflow.end_block(), likewise
+    exported on the calling thread and only uploaded in the background.
+
+    Everything submitted is uploaded before close() returns. close() is called on interpreter exit if it hasn't been
+    already. Upload failures don't stop the uploader: they are counted in stats() and the first is raised by close().
+
+    :param upload: Uploads a list of quads, raising an exception if it fails, e.g. GraphDBClient.upload
+    :type upload: Callable[[List[Quad]], object]
+
+    :param max_queue: The most items waiting to be uploaded, defaults to DEFAULT_MAX_QUEUE
+    :type max_queue: int, optional
+
+    :param max_batch: The most items uploaded together, defaults to DEFAULT_MAX_BATCH
+    :type max_batch: int, optional
+
+    :param linger: Seconds the uploader waits for more items before uploading a partial batch, defaults to
+        DEFAULT_LINGER
+    :type linger: float, optional
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[List[Quad]], object],
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        linger: float = DEFAULT_LINGER,
+    ):
+        self.upload = upload
+        self.max_batch = max_batch
+        self.linger = linger
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stats = WriteBehindStats()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        # the number of _put()s between checking that the sink is open & queueing, which close() waits for so that
+        # nothing is queued after _STOP
+        self._putting = 0
+        self._idle = threading.Condition(self._lock)
+        # a daemon, so that interpreter shutdown reaches the atexit handler that drains it
+        self._thread = threading.Thread(
+            target=self._run, name="provworkflow-write-behind", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, reporter, timeout: float = None):
+        """Exports a finished ProvReporter, and the nodes it references, and queues its quads for upload. It may be
+        modified once this returns without changing what is uploaded
+
+        :param reporter: The ProvReporter
+        :type reporter: ProvReporter
+
+        :param timeout: The most seconds to wait for room in the queue. If None, wait indefinitely, defaults to None
+        :type timeout: float, optional
+        """
+        self._put(list(reporter.iter_quads()), timeout)
+
+    async def submit_async(self, reporter, timeout: float = None):
+        """As per submit() but, while the queue is full, waits without blocking the event loop. The ProvReporter is still
+        exported in the calling coroutine, before waiting"""
+        quads = list(reporter.iter_quads())
+        try:
+            self._put(quads, 0)
+        except ProvWorkflowException:
+            if self._closed:
+                raise
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._put, quads, timeout)
+
+    def write(self, quads):
+        """Queues quads for upload, as the sink of a Workflow"""
+        quads = list(quads)
+        if quads:
+            self._put(quads, None)
+
+    def flush(self):
+        """Does nothing, as write() has already queued everything. Use drain() to wait for uploads"""
+        pass
+
+    def drain(self):
+        """Waits until everything submitted so far has been uploaded"""
+        self._queue.join()
+
+    def stats(self) -> WriteBehindStats:
+        """Returns a snapshot of the queue depth, the numbers of items & batches uploaded and upload latencies
+
+        :return: The stats
+        :rtype: WriteBehindStats
+        """
+        with self._lock:
+            stats = self._stats.copy()
+        stats.queue_depth = self._queue.qsize()
+        return stats
+
+    def close(self):
+        """Uploads everything submitted and stops the uploader. Raises the first upload failure, if there was one"""
+        with self._idle:
+            closed, self._closed = self._closed, True
+            while self._putting:
+                self._idle.wait()
+        if not closed:
+            atexit.unregister(self.close)
+            self._queue.put(_STOP)
+            self._thread.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise ProvWorkflowException(
+                f"Provenance failed to upload: {error!r}"
+            ) from error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _put(self, quads: List[Quad], timeout: Optional[float]):
+        with self._idle:
+            if self._closed:
+                raise ProvWorkflowException("The WriteBehindSink is closed")
+            self._putting += 1
+        # not holding the lock, which the uploader needs, as this blocks while the queue is full
+        queued = False
+        try:
+            self._queue.put(
+                (quads, time.perf_counter()), block=timeout != 0, timeout=timeout
+            )
+            queued = True
+        except queue.Full:
+            raise ProvWorkflowException("The WriteBehindSink's queue is full") from None
+        finally:
+            with self._idle:
+                self._putting -= 1
+                if queued:
+                    self._stats.submitted += 1
+                    self._stats.max_queue_depth = max(
+                        self._stats.max_queue_depth, self._queue.qsize()
+                    )
+                if not self._putting:
+                    self._idle.notify_all()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.linger
+            while len(batch) < self.max_batch and batch[-1] is not _STOP:
+                try:
+                    batch.append(
+                        self._queue.get(
+                            timeout=max(0.0, deadline - time.perf_counter())
+                        )
+                    )
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                batch.pop()
+                stopping = True
+            if batch:
+                self._upload(batch)
+            for _ in range(len(batch) + stopping):
+                self._queue.task_done()
+
+    def _upload(self, batch):
+        start = time.perf_counter()
+        error = None
+        quads = []
+        try:
+            for item, _ in batch:
+                quads.extend(item)
+            self.upload(quads)
+        except Exception as e:
+            error = e
+        end = time.perf_counter()
+
+        with self._lock:
+            s = self._stats
+            s.batches += 1
+            s.upload_seconds += end - start
+            s.max_upload_seconds = max(s.max_upload_seconds, end - start)
+            for _, submitted in batch:
+                s.latency_seconds += end - submitted
+                s.max_latency_seconds = max(s.max_latency_seconds, end - submitted)
+            if error is None:
+                s.uploaded += len(batch)
+                s.quads += len(quads)
+            else:
+                s.failed += len(batch)
+                if self._error is None:
+                    self._error = error
@@ -20,5 +20,28 @@ def test_prov_to_graph():
     ), "An Activity's endedAtTime must be greater than, or equal to, its startedAtTime"
 
 
+def test_long_informed_chain():
+    """A long chain of Activities, each informing the next, must export without exceeding the recursion limit
+
+    :return: None
+    """
+
+    links = 10_000
+    first = a = Activity()
+    for _ in range(links):
+        nxt = Activity()
+        a.informed.append(nxt)
+        a = nxt
+    g = first.prov_to_graph()
+
+    assert len(list(g.subject_objects(predicate=PROV.wasInformedBy))) == links
+    assert (
+        a.uri,
+        RDF.type,
+        PROV.Activity,
+    ) in g, "g must contain the last Activity in the chain"
+
+
 if __name__ == "__main__":
     test_prov_to_graph()
+    test_long_informed_chain()
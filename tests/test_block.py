@@ -1,6 +1,11 @@
-from provworkflow import Block, PROVWF
+import gc
+import time
+
+import pytest
+from provworkflow import Block, PROVWF, Workflow
+from provworkflow.clock import DeterministicClock, set_clock
 from rdflib import Literal
-from rdflib.namespace import OWL, RDF, XSD
+from rdflib.namespace import OWL, PROV, RDF, XSD
 
 
 def test_prov_to_graph():
@@ -22,5 +27,82 @@ def test_prov_to_graph():
     ) in g, "g must contain an owl:versionIRI property for a provwf:Block instance"
 
 
+def _seconds(duration: Literal) -> float:
+    return float(str(duration)[2:-1])
+
+
+def test_context_manager():
+    """A Block used as a context manager must be timed by, and record the resources used in, its with block
+
+    :return: None
+    """
+    set_clock(DeterministicClock(start=1_000_000_000_000_000_000))
+    try:
+        b = Block()
+        with b as entered:
+            assert entered is b
+            start = time.process_time()
+            while time.process_time() - start < 0.05:
+                pass
+            garbage = [[] for _ in range(1000)]
+            gc.collect()
+            del garbage
+            data = bytearray(64 * 2**20)
+            data[::4096] = b"x" * len(data[::4096])
+            del data
+        g = b.prov_to_graph()
+    finally:
+        set_clock(None)
+
+    # the clock's 1st & 2nd reads were Block creation, the 3rd & 4th entry & exit
+    assert g.value(b.uri, PROV.startedAtTime) == Literal(
+        "2001-09-09T01:46:42.000000+00:00", datatype=XSD.dateTimeStamp
+    )
+    assert g.value(b.uri, PROV.endedAtTime) == Literal(
+        "2001-09-09T01:46:43.000000+00:00", datatype=XSD.dateTimeStamp
+    )
+
+    wall = g.value(b.uri, PROVWF.wallTime)
+    cpu = g.value(b.uri, PROVWF.cpuTime)
+    assert wall.datatype == cpu.datatype == XSD.duration
+    assert _seconds(wall) >= _seconds(cpu) >= 0.04
+    assert g.value(b.uri, PROVWF.garbageCollections).value >= 1
+    peak = g.value(b.uri, PROVWF.peakMemoryIncrease)
+    if peak is not None:
+        assert peak.value >= 0
+
+
+def test_context_manager_exception():
+    b = Block()
+    with pytest.raises(ValueError):
+        with b:
+            raise ValueError()
+    assert b.ended_at_time is not None
+    assert b.resource_usage.wall_time_ns is not None
+
+
+def test_timed():
+    w = Workflow()
+
+    @Block.timed(workflow=w, label="Add")
+    def add(x, y):
+        return x + y
+
+    assert add(1, 2) == 3
+    assert add(3, 4) == 7
+    assert add.__name__ == "add"
+    assert len(w.blocks) == 2
+    g = w.prov_to_graph()
+    for b in w.blocks:
+        assert b.label == "Add"
+        assert (b.uri, PROVWF.wallTime, None) in g
+
+
+def test_untimed():
+    """Blocks not used as context managers record no resource use"""
+    g = Block().prov_to_graph()
+    assert (None, PROVWF.wallTime, None) not in g
+
+
 if __name__ == "__main__":
     test_prov_to_graph()
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+from provworkflow import Block, Entity, Workflow
+from provworkflow.bulk_load import bulk_insert_data, iter_insert_data
+from provworkflow.utils import make_sparql_insert_data
+from rdflib import Dataset, Graph, URIRef
+
+
+def make_workflow() -> Workflow:
+    w = Workflow(label="Bulk Load Workflow", named_graph_uri="https://example.com/g/w")
+    for i in range(20):
+        b = Block(label=f"Block {i}")
+        b.used.append(Entity(value=f"input {i} – ünïcode"))
+        b.generated.append(Entity(value=f"output {i}"))
+        w.blocks.append(b)
+    # a Block in a graph of its own, so quads span graphs
+    w.blocks.append(Block(named_graph_uri="https://example.com/g/b"))
+    return w
+
+
+def test_iter_insert_data_batches():
+    """Queries must stay within max_bytes and, run in turn, insert exactly the exported quads
+
+    :return: None
+    """
+    w = make_workflow()
+    quads = list(w.iter_quads())
+
+    ds = Dataset()
+    batches = list(iter_insert_data(quads, max_bytes=2000))
+    assert len(batches) > 1
+    assert sum(n for _, n in batches) == len(quads)
+    for query, n in batches:
+        body = query[len("INSERT DATA {") : -1]
+        if n > 1:
+            assert len(body.encode("utf-8")) < 2000 + 200
+        ds.update(query)
+
+    expected = Dataset()
+    for s, p, o, g in quads:
+        expected.graph(g).add((s, p, o))
+    for g in (URIRef("https://example.com/g/w"), URIRef("https://example.com/g/b")):
+        assert set(ds.graph(g)) == set(expected.graph(g))
+    assert len(ds) == len(quads)
+
+
+def test_iter_insert_data_graph_uri():
+    """Triples go into graph_uri"""
+    w = make_workflow()
+    ds = Dataset()
+    for query, _ in iter_insert_data(w.iter_triples(), "https://example.com/g/x"):
+        ds.update(query)
+    assert len(ds.graph(URIRef("https://example.com/g/x"))) == len(
+        list(w.iter_triples())
+    )
+
+
+def test_bulk_insert_data_bounds_in_flight():
+    w = make_workflow()
+    lock = threading.Lock()
+    in_flight = [0]
+    most_in_flight = [0]
+    ds = Dataset()
+
+    def update(query):
+        with lock:
+            in_flight[0] += 1
+            most_in_flight[0] = max(most_in_flight[0], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            ds.update(query)
+            in_flight[0] -= 1
+
+    report = bulk_insert_data(w.iter_quads(), update, max_bytes=1000, max_in_flight=3)
+
+    assert report.triples == len(ds) == len(list(w.iter_quads()))
+    assert report.batches > 3
+    assert report.triples_per_second > 0
+    assert 1 < most_in_flight[0] <= 3
+
+
+def test_bulk_insert_data_failure():
+    calls = []
+
+    def update(query):
+        calls.append(query)
+        raise ValueError("endpoint unavailable")
+
+    with pytest.raises(ValueError):
+        bulk_insert_data(
+            make_workflow().iter_triples(), update, max_bytes=500, max_in_flight=2
+        )
+    assert len(calls) < 10, "queries must stop being sent after a failure"
+
+
+def test_make_sparql_insert_data():
+    w = make_workflow()
+    g = Graph()
+    for s, p, o in w.iter_triples():
+        g.add((s, p, o))
+    ds = Dataset()
+    ds.update(make_sparql_insert_data("https://example.com/g/x", g))
+    assert len(ds.graph(URIRef("https://example.com/g/x"))) == len(g)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from provworkflow import Block, ProvWorkflowException, Workflow
+from provworkflow.clock import Clock, DeterministicClock, get_clock, set_clock
+from rdflib import Literal, URIRef
+from rdflib.namespace import PROV, XSD
+
+# 2026-01-01T00:00:00Z
+START = 1767225600 * 10**9
+
+
+@pytest.fixture
+def clock():
+    """Restores the default Clock after a test sets its own"""
+    yield
+    set_clock(None)
+
+
+def test_precision():
+    ns = START + 123456789
+    assert Clock(precision="seconds", tz=timezone.utc).format(ns) == (
+        "2026-01-01T00:00:00+00:00"
+    )
+    assert Clock(precision="milliseconds", tz=timezone.utc).format(ns) == (
+        "2026-01-01T00:00:00.123+00:00"
+    )
+    assert Clock(tz=timezone.utc).format(ns) == "2026-01-01T00:00:00.123456+00:00"
+    aest = timezone(timedelta(hours=10))
+    assert Clock(precision="nanoseconds", tz=aest).format(ns) == (
+        "2026-01-01T10:00:00.123456789+10:00"
+    )
+
+    with pytest.raises(ProvWorkflowException):
+        Clock(precision="fortnights")
+
+
+def test_clock_is_monotonic_and_current():
+    c = Clock()
+    times = [c.now() for _ in range(1000)]
+    assert times == sorted(times)
+    assert abs(
+        datetime.fromisoformat(c.format(times[-1])) - datetime.now(timezone.utc)
+    ) < timedelta(seconds=5)
+
+
+def test_deterministic_clock(clock):
+    """An injected DeterministicClock must make a run's timestamps the same every time it's run
+
+    :return: None
+    """
+
+    def run():
+        set_clock(DeterministicClock(start=START, step=1000))
+        w = Workflow(uri="http://example.com/w")
+        w.blocks.append(Block(uri="http://example.com/b"))
+        return w.prov_to_graph()
+
+    g = run()
+    assert set(g) == set(run())
+    # created & startedAtTime for the Workflow then the Block, then the Block's endedAtTime and the Workflow's
+    assert g.value(URIRef("http://example.com/b"), PROV.endedAtTime) == Literal(
+        "2026-01-01T00:00:00.000004+00:00", datatype=XSD.dateTimeStamp
+    )
+    assert g.value(URIRef("http://example.com/w"), PROV.endedAtTime) == Literal(
+        "2026-01-01T00:00:00.000005+00:00", datatype=XSD.dateTimeStamp
+    )
+
+
+def test_sub_second_blocks_are_distinguishable():
+    b1 = Block()
+    b1.ended_at_time = get_clock().now()
+    b2 = Block()
+    assert b1.started_at_time < b1.ended_at_time <= b2.started_at_time
+    assert b2.prov_to_graph().value(b2.uri, PROV.startedAtTime) != (
+        b1.prov_to_graph().value(b1.uri, PROV.startedAtTime)
+    )
+
+
+def test_timestamps_set_by_hand():
+    b = Block()
+    b.started_at_time = "2020-01-01T00:00:00+10:00"
+    b.ended_at_time = "2020-01-01T00:00:01+10:00"
+    g = b.prov_to_graph()
+    assert g.value(b.uri, PROV.startedAtTime) == Literal(
+        "2020-01-01T00:00:00+10:00", datatype=XSD.dateTimeStamp
+    )
+    assert g.value(b.uri, PROV.endedAtTime) == Literal(
+        "2020-01-01T00:00:01+10:00", datatype=XSD.dateTimeStamp
+    )
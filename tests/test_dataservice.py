@@ -47,5 +47,16 @@ def test_prov_to_graph():
         )
 
 
+def test_value():
+    ds = DataService(value="x")
+    assert ds.value == "x"
+    g = ds.prov_to_graph()
+    assert (
+        ds.uri,
+        PROV.value,
+        Literal("x"),
+    ) in g, "g must contain the DataService's prov:value"
+
+
 if __name__ == "__main__":
     test_prov_to_graph()
@@ -26,5 +26,47 @@ def test_prov_to_graph():
     ) in g, "g must contain a prov:Activity with URI <https://something.com/x>"
 
 
+def test_used_by_cycle():
+    """An Entity used by an Activity that also lists the Entity in its used list forms a cycle which must be exported
+    once, without recursing
+
+    :return: None
+    """
+
+    a = Activity()
+    e = Entity(was_used_by=a)
+    a.used.append(e)
+    g = e.prov_to_graph()
+
+    assert (
+        a.uri,
+        PROV.used,
+        e.uri,
+    ) in g, "g must contain the Activity prov:used the Entity"
+    assert len(list(g.subjects(predicate=RDF.type, object=PROV.Entity))) == 1
+
+
+def test_long_revision_chain():
+    """A 100k-link prov:wasRevisionOf chain must export without exceeding the recursion limit
+
+    :return: None
+    """
+
+    links = 100_000
+    first = e = Entity()
+    for _ in range(links):
+        e = Entity(was_revision_of=e)
+    g = e.prov_to_graph()
+
+    assert len(list(g.subject_objects(predicate=PROV.wasRevisionOf))) == links
+    assert (
+        first.uri,
+        RDF.type,
+        PROV.Entity,
+    ) in g, "g must contain the first Entity in the chain"
+
+
 if __name__ == "__main__":
     test_prov_to_graph()
+    test_used_by_cycle()
+    test_long_revision_chain()
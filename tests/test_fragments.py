@@ -0,0 +1,119 @@
+import io
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from provworkflow import Agent, Block, Entity, Workflow, PROVWF
+from provworkflow.fragments import Fragment, capture
+from provworkflow.ntriples import NTriplesWriter
+from provworkflow.traversal import TraversalContext
+from rdflib import Dataset, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import PROV, RDFS, XSD
+
+AGENT = URIRef("http://example.com/agent/shared")
+
+
+def work(i: int, known=()) -> Fragment:
+    """Runs in a worker process, returning the provenance of the Blocks it ran"""
+    agent = Agent(uri=AGENT, label="Shared Agent")
+    blocks = []
+    for j in range(3):
+        b = Block(label=f"{i}.{j}", was_associated_with=agent)
+        b.used.append(Entity(value=f"in {i}.{j}", was_attributed_to=agent))
+        b.generated.append(Entity(value=f"out {i}.{j}"))
+        blocks.append(b)
+    return capture(blocks, known=known)
+
+
+def test_capture():
+    agent = Agent(uri=AGENT)
+    b = Block(was_associated_with=agent, used=[Entity(was_attributed_to=agent)])
+    fragment = capture([b])
+    assert fragment.blocks == [b.uri]
+    assert len(fragment) == 3, "the shared Agent must be captured once"
+
+    g = Graph()
+    for s, p, o, _ in fragment.iter_quads():
+        g.add((s, p, o))
+    assert isomorphic(g, b.prov_to_graph())
+
+    fragment = capture([b], known=[AGENT])
+    assert str(AGENT) not in fragment.nodes
+    unpickled = pickle.loads(pickle.dumps(fragment))
+    assert list(unpickled.iter_quads()) == list(fragment.iter_quads())
+
+
+def test_merge():
+    """Fragments from worker processes must merge into the same graph as the Blocks themselves would give"""
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        fragments = list(pool.map(work, range(4)))
+
+    agent = Agent(uri=AGENT, label="Shared Agent")
+    w = Workflow(was_associated_with=agent)
+    for fragment in fragments:
+        w.merge(fragment)
+    g = w.prov_to_graph()
+
+    # the parent's copy of the shared Agent is kept
+    context = TraversalContext()
+    context.visited.add(AGENT)
+    merged = Graph()
+    for fragment in fragments:
+        for s, p, o, _ in fragment.iter_quads(context):
+            merged.add((s, p, o))
+    assert len(merged - g) == 0, "the Workflow must contain all the fragments' triples"
+
+    assert len(list(g.objects(w.uri, PROVWF.hadBlock))) == 12
+    assert len(list(g.objects(w.uri, PROV.used))) == 12
+    assert len(list(g.objects(w.uri, PROV.generated))) == 12
+    assert len(list(g.triples((AGENT, RDFS.label, None)))) == 1
+    assert g.value(AGENT, RDFS.label) == Literal("Shared Agent", datatype=XSD.string)
+
+
+def test_merge_flushing():
+    """A Workflow with a sink writes merged fragments to it immediately, writing shared nodes once"""
+    agent = Agent(uri=AGENT, label="Shared Agent")
+    out = io.StringIO()
+    w = Workflow(was_associated_with=agent, sink=NTriplesWriter(out))
+    w.end_block(Block(was_associated_with=agent))
+    for i in range(3):
+        w.merge(work(i, known=[AGENT]))
+        w.merge(work(i))
+    written = out.getvalue()
+    assert len(written.splitlines()) == len(set(written.splitlines()))
+    w.end()
+
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert len(list(g.objects(w.uri, PROVWF.hadBlock))) == 1 + 2 * 3 * 3
+    assert len(list(g.triples((AGENT, RDFS.label, None)))) == 1
+
+
+def test_write_nquads():
+    """Merged fragments are written as captured, giving the same N-Quads as writing their quads would"""
+    agent = Agent(uri=AGENT, label="Shared Agent")
+    fragments = [work(i, known=[AGENT]) for i in range(2)]
+    b = Block(label="escaped", generated=[Entity(value='a "quoted"\nline\\')])
+    b.named_graph_uri = URIRef("http://example.com/graph/b")
+    fragments.append(capture([b]))
+
+    w = Workflow(
+        was_associated_with=agent,
+        named_graph_uri=URIRef("http://example.com/graph/w"),
+    )
+    for fragment in fragments:
+        w.merge(fragment)
+    out = io.StringIO()
+    w.write_nquads(out)
+    lines = out.getvalue()
+    out = io.StringIO()
+    writer = NTriplesWriter(out)
+    writer.write(w.iter_quads())
+    writer.flush()
+    assert sorted(lines.splitlines()) == sorted(out.getvalue().splitlines())
+    assert "<http://example.com/graph/b> .\n" in lines
+
+    g = Dataset(default_union=True).parse(data=lines, format="nquads")
+    assert len(list(g.objects(w.uri, PROVWF.hadBlock))) == 7
+    assert len(list(g.objects(w.uri, PROV.used))) == 6
+    assert len(list(g.objects(w.uri, PROV.generated))) == 7
+    assert Literal('a "quoted"\nline\\') in set(g.objects(None, PROV.value))
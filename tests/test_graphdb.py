@@ -0,0 +1,209 @@
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from provworkflow import Block, Entity, Workflow
+from provworkflow.exceptions import ProvWorkflowException
+from provworkflow.graphdb import GraphDBClient
+from provworkflow.sinks import GraphDBSink
+from rdflib import Dataset, URIRef
+
+
+class FakeRdf4j(ThreadingHTTPServer):
+    """A stand-in for an RDF4J server's transactions API, holding a single repository, "test", in memory"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRdf4jHandler)
+        self.lock = threading.Lock()
+        self.store = Dataset()
+        # transaction ID -> the request bodies added to it
+        self.transactions = {}
+        self.connections = 0
+        self.chunked_requests = 0
+        self.reject_adds = False
+        self.reject_commits = False
+
+    @property
+    def system_uri(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeRdf4jHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            with self.server.lock:
+                self.server.chunked_requests += 1
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunk = self.rfile.read(size)
+                self.rfile.readline()
+                if size == 0:
+                    return body
+                body += chunk
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        self._body()
+        if self.path != "/repositories/test/transactions":
+            return self._reply(404)
+        txn = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.transactions[txn] = []
+        self._reply(201, headers={"Location": f"/repositories/test/transactions/{txn}"})
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        body = self._body()
+        txn = url.path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            if txn not in self.server.transactions:
+                return self._reply(404)
+            if params["action"] == ["ADD"]:
+                if self.server.reject_adds:
+                    return self._reply(400, b"MALFORMED DATA")
+                self.server.transactions[txn].append(
+                    (body, self.headers["Content-Type"], params.get("context"))
+                )
+            elif params["action"] == ["COMMIT"]:
+                if self.server.reject_commits:
+                    return self._reply(500, b"COMMIT FAILED")
+                for data, content_type, context in self.server.transactions.pop(txn):
+                    if content_type.startswith("application/n-quads"):
+                        self.server.store.parse(data=data, format="nquads")
+                    else:
+                        g = self.server.store.graph(URIRef(context[0][1:-1]))
+                        g.parse(data=data, format="turtle")
+        self._reply(200)
+
+    def do_DELETE(self):
+        txn = urlparse(self.path).path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            self.server.transactions.pop(txn, None)
+        self._reply(204)
+
+
+@pytest.fixture
+def rdf4j():
+    server = FakeRdf4j()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_workflow() -> Workflow:
+    w = Workflow(named_graph_uri="https://example.com/g/w")
+    for i in range(200):
+        b = Block(label=f"Block {i}")
+        b.used.append(Entity(value=f"input {i}"))
+        w.blocks.append(b)
+    return w
+
+
+def test_upload(rdf4j):
+    w = make_workflow()
+    with GraphDBClient(rdf4j.system_uri, "test", buffer_size=1000) as client:
+        n = client.upload(w.iter_quads())
+        # a second upload reuses the connection
+        client.upload([(w.uri, URIRef("https://example.com/p"), w.uri)])
+
+    assert n == len(list(w.iter_quads()))
+    g = rdf4j.store.graph(URIRef("https://example.com/g/w"))
+    assert set(g) == set(w.iter_triples())
+    assert len(rdf4j.store.default_graph) == 1
+    assert rdf4j.chunked_requests == 2, "statements must be streamed"
+    assert rdf4j.connections == 1
+    assert not rdf4j.transactions
+
+
+def test_upload_graph_uri(rdf4j):
+    w = make_workflow()
+    with GraphDBClient(rdf4j.system_uri, "test") as client:
+        client.upload(w.iter_triples(), graph_uri="https://example.com/g/x")
+    assert len(rdf4j.store.graph(URIRef("https://example.com/g/x"))) == len(
+        list(w.iter_triples())
+    )
+
+
+def test_add_turtle(rdf4j):
+    w = make_workflow()
+    with GraphDBClient(rdf4j.system_uri, "test") as client:
+        with client.transaction() as txn:
+            txn.add_data(
+                w.prov_to_graph().serialize(format="turtle"),
+                "text/turtle",
+                graph_uri="https://example.com/g/t",
+            )
+    assert len(rdf4j.store.graph(URIRef("https://example.com/g/t"))) == len(
+        list(w.iter_triples())
+    )
+
+
+def test_rollback(rdf4j):
+    rdf4j.reject_adds = True
+    with GraphDBClient(rdf4j.system_uri, "test") as client:
+        with pytest.raises(ProvWorkflowException):
+            client.upload(make_workflow().iter_quads())
+    assert len(rdf4j.store) == 0
+    assert not rdf4j.transactions, "a failed upload must be rolled back"
+
+
+def test_rollback_failed_commit(rdf4j):
+    rdf4j.reject_commits = True
+    with GraphDBClient(rdf4j.system_uri, "test") as client:
+        with pytest.raises(ProvWorkflowException, match="commit"):
+            client.upload(make_workflow().iter_quads())
+        with pytest.raises(ProvWorkflowException):
+            with client.transaction() as txn:
+                txn.add([(URIRef("https://example.com/s"),) * 3])
+        assert not txn.open
+    assert len(rdf4j.store) == 0
+    assert not rdf4j.transactions, "a failed commit must be rolled back"
+
+
+def test_env(monkeypatch):
+    monkeypatch.setenv("GRAPH_DB_SYSTEM_URI", "http://example.com:7200/")
+    monkeypatch.setenv("GRAPH_DB_REPO_ID", "provwf")
+    assert (
+        GraphDBClient().repository_uri == "http://example.com:7200/repositories/provwf"
+    )
+
+    monkeypatch.delenv("GRAPH_DB_REPO_ID")
+    with pytest.raises(ProvWorkflowException):
+        GraphDBClient()
+
+
+def test_persist(rdf4j):
+    w = make_workflow()
+    with GraphDBClient(rdf4j.system_uri, "test") as client:
+        ttl = w.persist(methods=[GraphDBSink(client), "string"])
+
+    assert ttl.startswith("@prefix")
+    assert set(rdf4j.store.graph(URIRef("https://example.com/g/w"))) == set(
+        w.iter_triples()
+    )
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from provworkflow import Entity
+from provworkflow.hashing import (
+    HashCache,
+    digest_file,
+    digest_value,
+    get_hash_cache,
+    register_serialiser,
+    set_hash_cache,
+)
+from provworkflow.namespace import SPDX
+from rdflib import Literal
+from rdflib.namespace import XSD
+
+
+def sha256(data: bytes) -> str:
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+@pytest.fixture
+def hash_cache():
+    cache = HashCache()
+    set_hash_cache(cache)
+    yield cache
+    set_hash_cache(None)
+
+
+def test_digest_value(monkeypatch):
+    # hashed in chunks
+    monkeypatch.setattr("provworkflow.hashing.CHUNK_SIZE", 3)
+    assert digest_value("tschüß") == sha256("tschüß".encode("utf-8"))
+    assert digest_value(b"0123456789") == sha256(b"0123456789")
+    assert digest_value(bytearray(b"0123456789")) == sha256(b"0123456789")
+    assert digest_value(memoryview(b"0123456789")) == sha256(b"0123456789")
+    assert digest_value(["x" * 10]) == digest_value(["x" * 10])
+    assert digest_value(b"x", algorithm="md5") == "md5:" + hashlib.md5(b"x").hexdigest()
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+
+def test_digest_value_canonical():
+    # equal values, however built, are hashed alike
+    assert digest_value({"a": 1, "b": [2, 3]}) == digest_value({"b": [2, 3], "a": 1})
+    assert digest_value({"x", "y", "z"}) == digest_value({"z", "y", "x"})
+    assert digest_value(Decimal("1.0")) == digest_value(Decimal("1.00"))
+    # and values of different types or shapes aren't
+    distinct = [
+        None,
+        True,
+        1,
+        1.0,
+        "1",
+        [1],
+        (1,),
+        {1},
+        {1: None},
+        [[1]],
+        ["a", "b"],
+        ["ab"],
+        Decimal(1),
+        datetime(2021, 1, 1),
+        datetime(2021, 1, 1, tzinfo=timezone.utc),
+    ]
+    assert len({digest_value([v]) for v in distinct}) == len(distinct)
+
+    # objects without a canonical encoding have no digest
+    assert digest_value(Point(1, 2)) is None
+    assert digest_value({"p": Point(1, 2)}) is None
+    cyclic = []
+    cyclic.append(cyclic)
+    assert digest_value(cyclic) is None
+    assert Entity(value=Point(1, 2)).digest is None
+
+    register_serialiser(Point, lambda p: f"{p.x},{p.y}".encode("ascii"))
+    assert digest_value(Point(1, 2)) == digest_value(Point(1, 2))
+    assert digest_value(Point(1, 2)) != digest_value(Point(2, 1))
+
+
+def test_digest_value_across_processes():
+    """Digests are the same whatever the interpreter's hash seed, so memoized results can be found across runs"""
+    code = (
+        "from provworkflow.hashing import digest_value;"
+        "print(digest_value({'s': {'a', 'b', 'c', 'd'}, 'f': frozenset([1.5, 'x']), 'd': dict.fromkeys('wxyz')}))"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(digests) == 1
+
+
+def test_digest_file(tmp_path, hash_cache, monkeypatch):
+    path = tmp_path / "data.bin"
+    data = os.urandom(100_000)
+    path.write_bytes(data)
+    monkeypatch.setattr("provworkflow.hashing.CHUNK_SIZE", 4096)
+    assert digest_file(path) == sha256(data)
+    assert digest_value(path) == sha256(data)
+
+    empty = tmp_path / "empty"
+    empty.touch()
+    assert digest_file(empty) == sha256(b"")
+
+    # cached by path, size & modification time
+    stat = path.stat()
+    hash_cache.put(os.path.realpath(path), "sha256", stat, "sha256:cached")
+    assert digest_file(path) == "sha256:cached"
+    path.write_bytes(data + b"more")
+    assert digest_file(path) == sha256(data + b"more")
+
+
+def test_persistent_hash_cache(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("data")
+    cache = HashCache(tmp_path / "hashes.sqlite3")
+    assert digest_file(path, cache=cache) == sha256(b"data")
+    cache.close()
+
+    # a later run doesn't hash the file again
+    cache = HashCache(tmp_path / "hashes.sqlite3")
+    assert cache.get(os.path.realpath(path), "sha256", path.stat()) == sha256(b"data")
+    cache.close()
+
+
+def test_entity_digest(tmp_path, hash_cache):
+    e = Entity(value="x")
+    assert e.digest == sha256(b"x")
+    g = e.prov_to_graph()
+    checksum = g.value(e.uri, SPDX.checksum)
+    assert g.value(checksum, SPDX.checksumValue) == Literal(
+        hashlib.sha256(b"x").hexdigest(), datatype=XSD.hexBinary
+    )
+
+    # a new value, a new digest
+    e.value = "y"
+    assert e.digest == sha256(b"y")
+
+    path = tmp_path / "input.csv"
+    path.write_text("a,b\n1,2\n")
+    e = Entity(value=path)
+    assert e.digest == sha256(b"a,b\n1,2\n")
+
+    # values that can't be hashed have no digest
+    for value in (tmp_path / "missing", lambda: None):
+        e = Entity(value=value)
+        assert e.digest is None
+        assert (e.uri, SPDX.checksum, None) not in e.prov_to_graph()
+    assert Entity().digest is None
+
+    e = Entity(value="x")
+    e.digest = "sha256:precomputed"
+    assert e.digest == "sha256:precomputed"
+
+
+def test_default_hash_cache(tmp_path, monkeypatch):
+    set_hash_cache(None)
+    monkeypatch.setenv("PROVWF_HASH_CACHE", str(tmp_path / "hashes.sqlite3"))
+    try:
+        assert get_hash_cache().path == tmp_path / "hashes.sqlite3"
+    finally:
+        set_hash_cache(None)
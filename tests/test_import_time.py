@@ -0,0 +1,66 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# the most that importing provworkflow may add to the time taken to import rdflib, which it cannot do without, as a
+# fraction of rdflib's import time. Importing requests at module load, for example, roughly doubles it
+IMPORT_OVERHEAD_BUDGET = 0.25
+
+ENV = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent))
+for var in ("PROVWF_VERSION_URI", "PROVWF_VERSION_FILE", "INCLUDE_GIT_INFO"):
+    ENV.pop(var, None)
+
+
+def cumulative_import_times(code: str) -> dict:
+    """Runs code in a fresh interpreter and returns the cumulative import time, in microseconds, of each module"""
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=ENV,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in p.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$", line)
+        if m is not None:
+            times.setdefault(m.group(2), int(m.group(1)))
+    return times
+
+
+def test_heavy_dependencies_not_imported():
+    """Using Entities, Blocks & Workflows must not import requests or GitPython
+
+    :return: None
+    """
+
+    code = (
+        "import sys\n"
+        "from provworkflow import Block, Entity, Workflow\n"
+        "w = Workflow()\n"
+        "w.blocks.append(Block(used=[Entity(value='x')]))\n"
+        "w.prov_to_graph()\n"
+        "heavy = [m for m in ('requests', 'git') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    subprocess.run([sys.executable, "-c", code], env=ENV, check=True)
+
+
+def test_import_time_budget():
+    """A cold "import provworkflow" must add little to the time taken to import rdflib
+
+    :return: None
+    """
+
+    # the best of a few runs, to reduce noise
+    overheads = []
+    for _ in range(3):
+        times = cumulative_import_times("import provworkflow")
+        overheads.append((times["provworkflow"] - times["rdflib"]) / times["rdflib"])
+
+    assert min(overheads) <= IMPORT_OVERHEAD_BUDGET, (
+        f"import provworkflow adds {min(overheads):.0%} to rdflib's import time, more than the "
+        f"{IMPORT_OVERHEAD_BUDGET:.0%} budget"
+    )
@@ -0,0 +1,146 @@
+import pytest
+from provworkflow import Block, Entity, ProvWorkflowException, Workflow
+from provworkflow.lineage import LineageIndex
+
+
+def make_workflow():
+    """raw -> clean -> cleaned -> model -> (predictions, report); other -> model; cleaned -> plot -> figure"""
+    raw, other = Entity(label="raw"), Entity(label="other")
+    cleaned, figure = Entity(label="cleaned"), Entity(label="figure")
+    predictions, report = Entity(label="predictions"), Entity(label="report")
+    clean = Block(label="clean", used=[raw], generated=[cleaned])
+    model = Block(label="model", used=[cleaned, other], generated=[predictions, report])
+    plot = Block(label="plot", used=[cleaned], generated=[figure])
+    w = Workflow(blocks=[clean, model, plot])
+    return w, {n.label: n for n in (raw, other, cleaned, figure, predictions, report)}
+
+
+def labels(nodes):
+    return {n.label for n in nodes}
+
+
+def test_ancestors_and_descendants():
+    w, e = make_workflow()
+    index = LineageIndex(w)
+    assert len(index) == 9
+    assert labels(index.ancestors(e["predictions"])) == {
+        "model",
+        "cleaned",
+        "other",
+        "clean",
+        "raw",
+    }
+    assert labels(index.ancestors(e["raw"])) == set()
+    assert labels(index.descendants(e["raw"])) == {
+        "clean",
+        "cleaned",
+        "model",
+        "predictions",
+        "report",
+        "plot",
+        "figure",
+    }
+    assert labels(index.descendants(e["other"])) == {"model", "predictions", "report"}
+    # by URI too
+    assert index.ancestors(str(e["figure"].uri)) == index.ancestors(e["figure"])
+
+    with pytest.raises(ProvWorkflowException):
+        index.ancestors(Entity())
+
+
+def test_path():
+    w, e = make_workflow()
+    index = LineageIndex(w)
+    assert labels(index.path(e["raw"], e["report"])) == {
+        "raw",
+        "clean",
+        "cleaned",
+        "model",
+        "report",
+    }
+    assert [n.label for n in index.path(e["raw"], e["report"])][0] == "raw"
+    assert index.path(e["report"], e["raw"]) is None
+    assert index.path(e["other"], e["figure"]) is None
+    assert index.path(e["raw"], e["raw"]) == [e["raw"]]
+
+    # ruled out by memoized closures alike
+    index.descendants(e["other"])
+    assert index.path(e["other"], e["figure"]) is None
+    index.ancestors(e["figure"])
+    assert index.path(e["report"], e["figure"]) is None
+
+
+def test_memoized_closures():
+    w, e = make_workflow()
+    index = LineageIndex(w, max_cached=2)
+    first = index.ancestors(e["report"])
+    assert index.ancestors(e["report"]) == first
+    index.ancestors(e["predictions"])
+    index.ancestors(e["figure"])
+    assert len(index._closures[0]) == 2, "least recently used closures are evicted"
+
+    # adding nodes invalidates memoized closures
+    later = Block(label="later", used=[e["report"]], generated=[Entity(label="final")])
+    index.add(later)
+    assert labels(index.descendants(e["raw"])) >= {"later", "final"}
+    assert labels(index.ancestors(later.generated[0])) >= {"raw", "model", "report"}
+
+
+def test_object_model():
+    """Edges given only by one end, revisions and informed Activities are all lineage"""
+    source = Entity(label="source")
+    derived = Entity(label="derived", was_revision_of=source)
+    a = Block(label="a")
+    b = Block(label="b")
+    b.was_informed_by = [a]
+    out = Entity(label="out", was_generated_by=b)
+    derived.was_used_by = [a]
+
+    index = LineageIndex(out, derived)
+    assert labels(index.ancestors(out)) == {"b", "a", "derived", "source"}
+    assert [n.label for n in index.path(source, out)] == [
+        "source",
+        "derived",
+        "a",
+        "b",
+        "out",
+    ]
+
+
+def test_cycles():
+    e = Entity(label="e")
+    a = Block(label="a", used=[e], generated=[e])
+    index = LineageIndex(a)
+    assert labels(index.ancestors(e)) == {"a"}
+    assert labels(index.descendants(a)) == {"e"}
+    assert labels(index.descendants(e)) == {"a"}
+
+
+def test_re_add():
+    """A node added again after it has changed is indexed as it is now"""
+    w, e = make_workflow()
+    index = LineageIndex(w)
+    model = next(b for b in w.blocks if b.label == "model")
+    assert labels(index.descendants(e["raw"])) >= {"model"}
+
+    extra_in, extra_out = Entity(label="extra in"), Entity(label="extra out")
+    model.used.append(extra_in)
+    model.generated.append(extra_out)
+    index.add(model)
+    assert extra_in in index and extra_out in index
+    assert labels(index.ancestors(extra_out)) >= {"model", "extra in", "raw"}
+    assert labels(index.descendants(extra_in)) == {
+        "model",
+        "predictions",
+        "report",
+        "extra out",
+    }
+
+    # and by re-adding its Workflow
+    late = Entity(label="late")
+    model.generated.append(late)
+    index.add(w)
+    assert labels(index.descendants(e["raw"])) >= {"late", "extra out"}
+    assert len(index._adjacency_of(1)[1]) == len(
+        set(zip(index._sources, index._targets))
+    )
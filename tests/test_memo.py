@@ -0,0 +1,116 @@
+from provworkflow import Block, Entity
+from provworkflow.memo import MemoCache, content_hash
+from rdflib.namespace import PROV
+
+CLASS_URI = "http://example.com/Doubler"
+VERSION_URI = "http://example.com/version/1"
+
+
+class Doubler(Block):
+    pass
+
+
+def make_block(value, version_uri=VERSION_URI) -> Block:
+    b = Doubler(class_uri=CLASS_URI, used=[Entity(value=value)])
+    b.version_uri = version_uri
+    return b
+
+
+def test_content_hash():
+    assert content_hash(Entity(value="x")) == content_hash(Entity(value=b"x"))
+    assert content_hash(Entity(value=[1, 2])) == content_hash(Entity(value=[1, 2]))
+    assert content_hash(Entity(value=[1, 2])) != content_hash(Entity(value=[2, 1]))
+    e = Entity()
+    assert content_hash(e) == f"uri:{e.uri}"
+
+
+def test_run(tmp_path):
+    runs = []
+
+    def double(b: Block):
+        def fn():
+            runs.append(b)
+            return [Entity(label="doubled", value=b.used[0].value * 2)]
+
+        return fn
+
+    with MemoCache(tmp_path / "memo.sqlite3") as cache:
+        first = make_block("ab")
+        generated = cache.run(first, double(first))
+        assert generated[0].value == "abab"
+        assert first.memoized_from is None
+        assert first.resource_usage is not None
+
+        # the same class & version on the same data
+        second = make_block("ab")
+        generated = cache.run(second, double(second))
+        assert runs == [first], "a cached Block must not be run again"
+        assert generated[0].uri == first.generated[0].uri
+        assert generated[0].value == "abab"
+        assert generated[0].created == first.generated[0].created
+
+        g = second.prov_to_graph()
+        assert (second.uri, PROV.wasInfluencedBy, first.uri) in g
+        assert (second.uri, PROV.generated, first.generated[0].uri) in g
+        assert (second.uri, PROV.used, second.used[0].uri) in g
+
+        # different data, a different version or no class_uri or version
+        for b in (
+            make_block("abc"),
+            make_block("ab", version_uri="http://example.com/version/2"),
+            Block(used=[Entity(value="ab")]),
+        ):
+            cache.run(b, double(b))
+            assert b.memoized_from is None
+        assert len(runs) == 4
+        assert len(cache) == 3
+
+    # the cache persists
+    with MemoCache(tmp_path / "memo.sqlite3") as cache:
+        b = make_block("ab")
+        assert cache.get(b)
+        assert b.memoized_from == first.uri
+
+
+def test_lru_eviction(tmp_path):
+    cache = MemoCache(tmp_path / "memo.sqlite3", max_bytes=7000)
+    for i in range(3):
+        b = make_block(i)
+        b.generated.append(Entity(value="x" * 2000))
+        assert cache.put(b)
+
+    # using the first makes the second the least recently used
+    assert cache.get(make_block(0))
+    b = make_block(3)
+    b.generated.append(Entity(value="x" * 2000))
+    cache.put(b)
+
+    assert cache.size() <= 7000
+    assert [cache.get(make_block(i)) for i in range(4)] == [True, False, True, True]
+
+    # unpicklable values aren't cached
+    b = make_block(4)
+    b.generated.append(Entity(value=lambda: None))
+    assert not cache.put(b)
+    cache.close()
+
+
+def test_shared_between_processes(tmp_path):
+    """Blocks run in another process hit the same cache"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = tmp_path / "memo.sqlite3"
+    with MemoCache(path) as cache:
+        b = make_block("shared")
+        b.generated.append(Entity(value="result"))
+        cache.put(b)
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_get_in_process, path).result() == str(b.uri)
+
+
+def _get_in_process(path) -> str:
+    with MemoCache(path) as cache:
+        b = make_block("shared")
+        cache.get(b)
+        return str(b.memoized_from)
@@ -0,0 +1,154 @@
+import multiprocessing
+import threading
+import uuid
+
+import pytest
+from provworkflow import Block, Entity, ErrorEntity
+from provworkflow.data_service import DataService
+from provworkflow.hashing import register_serialiser
+from provworkflow.minting import (
+    ContentHashMinter,
+    CounterMinter,
+    UUID4Minter,
+    get_minter,
+    set_minter,
+)
+from provworkflow.namespace import PWFS
+from rdflib import URIRef
+
+
+@pytest.fixture
+def minter():
+    """Restores the default minter after a test sets its own"""
+    yield
+    set_minter(None)
+
+
+def _mint_in_child(queue):
+    queue.put([str(u) for u in get_minter().mint_batch(100)])
+
+
+def test_uuid4_minter():
+    m = UUID4Minter(batch_size=8)
+    uris = [m.mint() for _ in range(20)] + m.mint_batch(20)
+    assert len(set(uris)) == 40
+    for u in uris:
+        assert type(u) == URIRef and u.startswith(PWFS)
+        assert uuid.UUID(u[len(PWFS) :]).version == 4
+        assert uuid.UUID(u[len(PWFS) :]).variant == uuid.RFC_4122
+
+
+def test_default_minter_has_no_mac():
+    """Minted URIs must not be UUIDv1s, which contain the host's MAC address
+
+    :return: None
+    """
+    e = Entity()
+    assert uuid.UUID(e.uri[len(PWFS) :]).version == 4
+
+
+def test_counter_minter(minter):
+    set_minter(CounterMinter(namespace="http://example.com/", run_id="run1"))
+    b = Block(used=[Entity(), Entity()])
+    assert b.uri.startswith("http://example.com/run1-")
+    # the Entities are created first
+    assert [n.uri.rsplit("-", 1)[1] for n in b.used + [b]] == ["0", "1", "2"]
+    assert (
+        len(set(get_minter().mint_batch(10) + [b.uri] + [e.uri for e in b.used])) == 13
+    )
+
+
+def test_threads_mint_unique_uris():
+    for m in (UUID4Minter(batch_size=16), CounterMinter()):
+        results = [[] for _ in range(8)]
+
+        def work(out):
+            for _ in range(500):
+                out.append(m.mint())
+
+        threads = [threading.Thread(target=work, args=(r,)) for r in results]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(u for r in results for u in r)) == 8 * 500
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+@pytest.mark.parametrize("minter_class", [UUID4Minter, CounterMinter])
+def test_forked_workers_mint_unique_uris(minter, minter_class):
+    """Forked workers inherit their parent's minter, which must not make them mint the URIs their parent or siblings do
+
+    :return: None
+    """
+    set_minter(minter_class())
+    # URIs pre-allocated, or a counter advanced, before forking
+    parent = [str(u) for u in get_minter().mint_batch(10)]
+    get_minter().mint()
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    workers = [ctx.Process(target=_mint_in_child, args=(queue,)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    children = [u for _ in workers for u in queue.get(timeout=30)]
+    for w in workers:
+        w.join()
+
+    assert len(set(parent + children)) == len(parent) + len(children)
+
+
+def test_content_hash_minter(minter):
+    set_minter(ContentHashMinter())
+    a, b, c, d = (
+        Entity(value="x"),
+        Entity(value="x"),
+        Entity(value=1),
+        Entity(value="1"),
+    )
+    assert a.uri == b.uri
+    assert len({a.uri, c.uri, d.uri}) == 3
+
+    # nodes without values get URIs from the fallback minter
+    assert len({Entity().uri, Entity().uri, Block().uri}) == 3
+
+    # an Entity used twice, by value, is one node
+    g = Block(used=[a, b]).prov_to_graph()
+    assert len(list(g.objects(None, URIRef("http://www.w3.org/ns/prov#value")))) == 1
+
+
+class Opaque:
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return "Opaque"
+
+
+register_serialiser(Opaque, lambda o: str(o.data).encode("utf-8"))
+
+
+def test_content_hash_minter_hashes_content(minter, tmp_path):
+    set_minter(ContentHashMinter())
+
+    # values with the same str() but different contents are different nodes
+    assert Entity(value=Opaque(1)).uri != Entity(value=Opaque(2)).uri
+    assert Entity(value=Opaque(1)).uri == Entity(value=Opaque(1)).uri
+    assert Entity(value="x").uri != Entity(value=b"x").uri
+    # values that can't be hashed are never conflated
+    assert Entity(value=lambda: 1).uri != Entity(value=lambda: 1).uri
+
+    # files by their contents
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n")
+    before = Entity(value=path).uri
+    assert Entity(value=path).uri == before
+    path.write_text("a,b\n1,2\n")
+    assert Entity(value=path).uri != before
+
+    # ErrorEntity & DataService values are set before their URIs are minted
+    assert ErrorEntity(value="failed").uri == ErrorEntity(value="failed").uri
+    assert ErrorEntity(value="failed").uri != ErrorEntity(value="timed out").uri
+    assert DataService(value="x").uri == DataService(value="x").uri
@@ -0,0 +1,99 @@
+import io
+
+from provworkflow import Block, Entity, Workflow
+from provworkflow.ntriples import NTriplesWriter, nt_line, nt_term, parse_nt_term
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDFS, XSD
+
+
+def make_workflow():
+    w = Workflow(label="Workflow", named_graph_uri="http://example.com/graph/workflow")
+    b = Block(named_graph_uri="http://example.com/graph/block")
+    b.used.append(Entity(label='A "quoted"\nmulti-line\\label', value=42))
+    b.generated.append(Entity(value="tschüß"))
+    w.blocks.append(b)
+    return w, b
+
+
+def test_nt_line():
+    s = URIRef("http://example.com/s")
+    assert nt_line(s, RDFS.label, Literal("x", lang="en")) == (
+        '<http://example.com/s> <http://www.w3.org/2000/01/rdf-schema#label> "x"@en .\n'
+    )
+    assert nt_line(s, RDFS.label, Literal("1", datatype=XSD.integer), s) == (
+        "<http://example.com/s> <http://www.w3.org/2000/01/rdf-schema#label> "
+        '"1"^^<http://www.w3.org/2001/XMLSchema#integer> <http://example.com/s> .\n'
+    )
+
+
+def test_parse_nt_term():
+    for t in (
+        Literal('A "quoted"\nmulti-line\\label ', lang="en"),
+        Literal(42),
+        Literal("tschüß"),
+        Literal(""),
+        BNode(),
+        URIRef("http://example.com/s"),
+    ):
+        assert parse_nt_term(nt_term(t)) == t
+
+
+def test_write_ntriples():
+    """write_ntriples() must produce the same graph as prov_to_graph(), to text and binary file handles
+
+    :return: None
+    """
+
+    w, _ = make_workflow()
+    g = w.prov_to_graph()
+
+    text = io.StringIO()
+    w.write_ntriples(text)
+    assert isomorphic(Graph().parse(data=text.getvalue(), format="nt"), g)
+
+    binary = io.BytesIO()
+    w.write_ntriples(binary, buffer_size=64)
+    assert binary.getvalue().decode("utf-8") == text.getvalue()
+
+
+def test_write_nquads():
+    """write_nquads() must place each node's triples in that node's named graph, falling back to the Workflow's
+
+    :return: None
+    """
+
+    w, b = make_workflow()
+    nq = io.StringIO()
+    w.write_nquads(nq)
+    d = Dataset().parse(data=nq.getvalue(), format="nquads")
+
+    block_graph = d.graph(URIRef("http://example.com/graph/block"))
+    workflow_graph = d.graph(URIRef("http://example.com/graph/workflow"))
+    assert (b.uri, RDFS.label, None) not in workflow_graph
+    assert len(list(block_graph.subjects())) > 0
+    assert all(s == b.uri for s in block_graph.subjects())
+    assert (b.used[0].uri, RDFS.label, None) in workflow_graph
+
+
+def test_writer_buffering():
+    """The writer must only write to its file in chunks of about buffer_size characters
+
+    :return: None
+    """
+
+    class CountingIO(io.StringIO):
+        writes = 0
+
+        def write(self, s):
+            self.writes += 1
+            return super().write(s)
+
+    w, _ = make_workflow()
+    fh = CountingIO()
+    writer = NTriplesWriter(fh, buffer_size=1 << 20)
+    writer.write(w.iter_triples())
+    assert fh.writes == 0
+    writer.flush()
+    assert fh.writes == 1
+    assert writer.count == len(fh.getvalue().splitlines())
@@ -1,6 +1,7 @@
 from provworkflow.prov_reporter import ProvReporter
 from provworkflow import ProvWorkflowException
 from provworkflow.namespace import PROVWF
+from provworkflow.sinks import FileSink, Sink, get_sink, register_sink
 from rdflib import URIRef, Graph, Literal
 from rdflib.namespace import DCTERMS, RDF, RDFS, XSD
 import os
@@ -8,6 +9,7 @@ import requests
 import pytest
 from tests._graphdb_utils import setup_graphdb
 import tempfile
+import threading
 
 
 def test_prov_to_graph():
@@ -38,6 +40,33 @@ def test_prov_to_graph():
     ) in g2, "g must contain the label 'Test PR'"
 
 
+def test_slots():
+    """ProvReporters are slotted so that large workflows hold no per-instance __dict__ but, as before, subclasses
+    defined outside ProvWF may add attributes of their own
+
+    :return: None
+    """
+    from provworkflow import Block, Entity, Workflow
+    from provworkflow.agent import Agent
+
+    for cls in (ProvReporter, Entity, Agent, Block, Workflow):
+        assert not hasattr(
+            cls(), "__dict__"
+        ), f"{cls.__name__} must not have a __dict__"
+
+    class MyBlock(Block):
+        pass
+
+    b = MyBlock(class_uri="http://example.com/MyBlock")
+    b.extra = "x"
+    assert (b.uri, RDF.type, URIRef("http://example.com/MyBlock")) in b.prov_to_graph()
+
+    e = Entity()
+    assert e.version_uri in (e.uri, ProvReporter().version_uri)
+    e.version_uri = "http://example.com/version/1"
+    assert e.version_uri == URIRef("http://example.com/version/1")
+
+
 def test_persist_to_string():
     pr = ProvReporter()
     p = pr.prov_to_graph().serialize()
@@ -100,3 +129,89 @@ def test_persist_to_graphdb():
     )
     gdb_pr_uri = r.json()["results"]["bindings"][0]["pr_uri"]["value"]
     assert gdb_pr_uri == pr_uri
+
+
+def test_persist():
+    pr = ProvReporter()
+    ttl = pr.persist(methods=["string"])
+    assert (pr.uri, RDF.type, PROVWF.ProvReporter) in Graph().parse(
+        data=ttl, format="turtle"
+    )
+
+    path = os.path.join(tempfile.mkdtemp(), "pr.nt")
+    g = pr.persist(methods=[FileSink(path, format="nt")])
+    assert (pr.uri, RDF.type, PROVWF.ProvReporter) in g
+    assert set(Graph().parse(path, format="nt")) == set(g)
+    os.unlink(path)
+
+
+def test_persist_unknown():
+    with pytest.raises(ProvWorkflowException):
+        ProvReporter().persist(methods=["string", "nowhere"])
+
+
+def test_persist_parallel(monkeypatch):
+    """Writing to several sinks must export the graph once and write it to all sinks at the same time
+
+    :return: None
+    """
+
+    class SlowSink(Sink):
+        def __init__(self):
+            self.graphs = []
+
+        def write(self, g, reporter):
+            # only returns once every sink is writing
+            barrier.wait(timeout=5)
+            self.graphs.append(g)
+            return len(g)
+
+    barrier = threading.Barrier(3)
+    sinks = [SlowSink(), SlowSink()]
+    register_sink("slow", SlowSink())
+    exports = []
+    pr = ProvReporter()
+    prov_to_graph = ProvReporter.prov_to_graph
+
+    def counting_prov_to_graph(self, *args, **kwargs):
+        exports.append(self)
+        return prov_to_graph(self, *args, **kwargs)
+
+    monkeypatch.setattr(ProvReporter, "prov_to_graph", counting_prov_to_graph)
+
+    ttl = pr.persist(methods=sinks + ["string", "slow"])
+    assert ttl.startswith("@prefix")
+    assert len(exports) == 1
+    assert sinks[0].graphs[0] is sinks[1].graphs[0]
+    assert get_sink("slow").graphs[0] is sinks[0].graphs[0]
+
+
+def test_persist_binding_sinks_serially(tmp_path):
+    """Sinks that bind namespaces into the shared graph, as Turtle serialisers do, must not write at the same time
+
+    :return: None
+    """
+    writing = []
+    overlaps = []
+
+    class BindingSink(Sink):
+        binds_namespaces = True
+
+        def write(self, g, reporter):
+            writing.append(self)
+            if len(writing) > 1:
+                overlaps.append(list(writing))
+            threading.Event().wait(0.05)
+            g.bind(f"ns{id(self)}", URIRef(f"https://example.com/{id(self)}/"))
+            writing.remove(self)
+
+    pr = ProvReporter()
+    pr.persist(methods=[BindingSink() for _ in range(4)])
+    assert overlaps == []
+
+    assert get_sink("string").binds_namespaces
+    assert not FileSink(tmp_path / "pr.nt", format="nt").binds_namespaces
+    ttl = pr.persist(methods=["string", FileSink(tmp_path / "pr.ttl")])
+    assert set(Graph().parse(data=ttl, format="turtle")) == set(
+        Graph().parse(tmp_path / "pr.ttl", format="turtle")
+    )
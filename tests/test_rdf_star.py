@@ -0,0 +1,130 @@
+import io
+
+import pytest
+from provworkflow.exceptions import ProvWorkflowException
+from provworkflow.ntriples import NTriplesWriter
+from provworkflow.rdf_star import (
+    iter_with_provenance_star,
+    reified_to_star,
+    star_to_reified,
+)
+from provworkflow.utils import add_with_provenance, add_with_provenance_bulk
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import DCTERMS, PROV, XSD
+
+EX = Namespace("https://example.com/")
+BLOCK = URIRef("https://example.com/block/1")
+CREATED = Literal("2026-06-19T15:31:14", datatype=XSD.dateTime)
+
+
+def data_triples():
+    return [
+        (EX.a, EX.p, Literal('a "quoted"\nvalue >> with arrows')),
+        (EX.a, EX.p, Literal("chat", lang="fr")),
+        (EX.b, EX.q, EX.c),
+        (BNode("x1"), EX.q, Literal(3)),
+    ]
+
+
+def test_iter_with_provenance_star():
+    """3 lines per data triple, with the annotations on the quoted triple
+
+    :return: None
+    """
+    lines = list(iter_with_provenance_star(data_triples(), BLOCK, CREATED))
+    assert len(lines) == 3 * len(data_triples())
+    assert lines[7] == (
+        f"<< <{EX.b}> <{EX.q}> <{EX.c}> >> <{DCTERMS.created}> "
+        f'"2026-06-19T15:31:14"^^<{XSD.dateTime}> .\n'
+    )
+    assert lines[8] == (
+        f"<< <{EX.b}> <{EX.q}> <{EX.c}> >> <{PROV.wasAssociatedWith}> <{BLOCK}> .\n"
+    )
+
+
+def test_round_trip():
+    """Converting the reified form to RDF-star and back must be lossless, and match the direct RDF-star output"""
+    # blank nodes, as star_to_reified() makes, so that the round trip is isomorphic
+    reified = add_with_provenance_bulk(
+        data_triples(), BLOCK, created=CREATED, skolemize=False
+    )
+
+    star = list(reified_to_star(reified))
+    assert sorted(star) == sorted(
+        iter_with_provenance_star(data_triples(), BLOCK, CREATED)
+    )
+
+    back = Graph()
+    for t in star_to_reified(star):
+        back.add(t)
+    assert isomorphic(back, reified)
+
+    # add_with_provenance()'s output converts too
+    single = add_with_provenance(EX.b, EX.q, EX.c, BLOCK)
+    assert len(list(reified_to_star(single))) == 3
+    back = Graph()
+    for t in star_to_reified(reified_to_star(single)):
+        back.add(t)
+    assert isomorphic(back, single)
+
+
+def test_grouped():
+    """Group annotations are spread over each quoted triple of the group"""
+    grouped = add_with_provenance_bulk(
+        data_triples(), BLOCK, created=CREATED, group_size=3
+    )
+    assert sorted(reified_to_star(grouped)) == sorted(
+        iter_with_provenance_star(data_triples(), BLOCK, CREATED)
+    )
+
+
+def test_compact():
+    lines = list(
+        iter_with_provenance_star(data_triples(), BLOCK, CREATED, compact=True)
+    )
+    assert len(lines) == len(data_triples())
+    assert lines[2] == (
+        f"<{EX.b}> <{EX.q}> <{EX.c}> {{| <{DCTERMS.created}> "
+        f'"2026-06-19T15:31:14"^^<{XSD.dateTime}> ; <{PROV.wasAssociatedWith}> <{BLOCK}> |}} .\n'
+    )
+
+    back = Graph()
+    for t in star_to_reified(lines):
+        back.add(t)
+    assert isomorphic(
+        back,
+        add_with_provenance_bulk(
+            data_triples(), BLOCK, created=CREATED, skolemize=False
+        ),
+    )
+
+
+def test_fewer_triples():
+    """RDF-star must store less than half as many triples, and compact RDF-star upload less than half as much, as
+    reification"""
+    n = 1000
+    triples = [(EX[f"s{i}"], EX.p, Literal(i)) for i in range(n)]
+    reified = io.StringIO()
+    writer = NTriplesWriter(reified)
+    writer.write(add_with_provenance_bulk(triples, BLOCK))
+    writer.flush()
+    star = "".join(iter_with_provenance_star(triples, BLOCK))
+    compact = "".join(iter_with_provenance_star(triples, BLOCK, compact=True))
+
+    assert writer.count == 7 * n
+    assert star.count("\n") == 3 * n
+    assert len(compact) < len(reified.getvalue()) / 2
+
+
+def test_bad_lines():
+    with pytest.raises(ProvWorkflowException):
+        list(star_to_reified([f"<< <{EX.a}> <{EX.p}> >> <{EX.q}> <{EX.b}> .\n"]))
+    with pytest.raises(ProvWorkflowException):
+        list(star_to_reified([f"<{EX.a}> <{EX.p}> .\n"]))
+    with pytest.raises(ProvWorkflowException):
+        list(
+            star_to_reified(
+                [f"<{EX.a}> <{EX.p}> <{EX.b}> {{| <{EX.q}> ; <{EX.b}> |}} .\n"]
+            )
+        )
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+import io
+import os
+import time
+
+import pytest
+from provworkflow import Block, Entity, ProvWorkflowException, Workflow
+from provworkflow.ntriples import NTriplesWriter
+from provworkflow.scheduler import infer_dependencies, run_blocks
+from rdflib import Graph
+from rdflib.namespace import PROV
+
+
+def diamond():
+    """a -> (b, c) -> d"""
+    e1, e2, e3, e4 = (Entity(value=i) for i in range(4))
+    a = Block(label="a", generated=[e1])
+    b = Block(label="b", used=[e1], generated=[e2])
+    c = Block(label="c", used=[e1], generated=[e3])
+    d = Block(label="d", used=[e2, e3], generated=[e4])
+    return a, b, c, d
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def overlap(x: Block, y: Block) -> bool:
+    return x.started_at_time < y.ended_at_time and y.started_at_time < x.ended_at_time
+
+
+def check_diamond(w: Workflow, a, b, c, d):
+    assert overlap(b, c), "independent Blocks must run concurrently"
+    assert a.ended_at_time <= b.started_at_time and a.ended_at_time <= c.started_at_time
+    assert d.started_at_time >= max(b.ended_at_time, c.ended_at_time)
+
+    g = w.prov_to_graph()
+    assert set(g.subject_objects(PROV.wasInformedBy)) == {
+        (b.uri, a.uri),
+        (c.uri, a.uri),
+        (d.uri, b.uri),
+        (d.uri, c.uri),
+    }
+
+
+def test_infer_dependencies():
+    a, b, c, d = diamond()
+    assert infer_dependencies([d, c, b, a]) == {d: [b, c], c: [a], b: [a], a: []}
+
+    # an Entity with the same URI is the same Entity
+    e = Block(used=[Entity(uri=a.generated[0].uri)])
+    assert infer_dependencies([a, e])[e] == [a]
+
+    a.used.append(d.generated[0])
+    with pytest.raises(ProvWorkflowException):
+        infer_dependencies([a, b, c, d])
+
+
+def test_thread_executor():
+    w = Workflow()
+    a, b, c, d = diamond()
+    tasks = {blk: functools.partial(sleep, 0.1) for blk in (a, b, c, d)}
+
+    start = time.perf_counter()
+    results = w.run(tasks)
+    assert time.perf_counter() - start < 0.35
+
+    assert set(results) == {a, b, c, d}
+    assert w.blocks == [a, b, c, d]
+    check_diamond(w, a, b, c, d)
+    assert a.resource_usage.wall_time_ns >= 100_000_000
+
+
+def test_process_executor():
+    w = Workflow()
+    a, b, c, d = diamond()
+    results = w.run(
+        {blk: functools.partial(sleep, 0.2) for blk in (a, b, c, d)},
+        executor="process",
+        max_workers=2,
+    )
+    assert os.getpid() not in results.values()
+    check_diamond(w, a, b, c, d)
+
+
+def test_asyncio_executor():
+    w = Workflow()
+    a, b, c, d = diamond()
+
+    async def nap():
+        await asyncio.sleep(0.1)
+        return "napped"
+
+    tasks = {a: nap, b: nap, c: functools.partial(sleep, 0.1), d: nap}
+    results = w.run(tasks, executor="asyncio")
+    assert results[a] == "napped"
+    check_diamond(w, a, b, c, d)
+
+    # and from within a running event loop
+    a, b, c, d = diamond()
+    w2 = Workflow()
+    asyncio.run(w2.run_async({a: nap, b: nap, c: nap, d: nap}))
+    check_diamond(w2, a, b, c, d)
+
+
+def test_failure():
+    a, b, c, d = diamond()
+    ran = []
+
+    def fail():
+        raise ValueError("a failed")
+
+    def record(name):
+        ran.append(name)
+
+    with pytest.raises(ValueError):
+        run_blocks(
+            {
+                a: fail,
+                b: functools.partial(record, "b"),
+                c: functools.partial(record, "c"),
+                d: functools.partial(record, "d"),
+            }
+        )
+    assert ran == [], "Blocks depending on a failed Block must not run"
+    assert a.ended_at_time is not None
+
+    with pytest.raises(ProvWorkflowException):
+        run_blocks({a: fail}, executor="fibers")
+
+
+def test_flushing():
+    """A Workflow with a sink flushes each Block as it finishes"""
+    out = io.StringIO()
+    w = Workflow(sink=NTriplesWriter(out))
+    a, b, c, d = diamond()
+    w.run({blk: functools.partial(sleep, 0.01) for blk in (a, b, c, d)})
+    assert w.blocks == []
+    w.end()
+
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert (b.uri, PROV.wasInformedBy, a.uri) in g
+    assert len(set(g.subjects(PROV.wasInformedBy, None))) == 3
+    # each Block is flushed when it ends, not before it has run
+    for blk in (a, b, c, d):
+        assert len(list(g.objects(blk.uri, PROV.endedAtTime))) == 1
+        assert g.value(blk.uri, PROV.endedAtTime) == blk.prov_to_graph().value(
+            blk.uri, PROV.endedAtTime
+        )
@@ -0,0 +1,235 @@
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+from provworkflow import Block, Workflow
+from provworkflow.exceptions import ProvWorkflowException
+from provworkflow.sop import SopClient, get_sop_client, set_sop_client
+from provworkflow.utils import query_sop_sparql
+
+LOGIN_FORM = b'<html><form action="j_security_check" method="post"></form></html>'
+
+
+class FakeSop(ThreadingHTTPServer):
+    """A stand-in for SOP's form login, SPARQL endpoint and logout, counting what clients do"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeSopHandler)
+        self.lock = threading.Lock()
+        # session ID -> whether it's logged in
+        self.sessions = {}
+        self.logins = 0
+        self.logouts = 0
+        self.queries = 0
+        self.connections = 0
+        # the status of replies to unknown sessions' queries: 200, with the login form, or 401
+        self.logged_out_status = 200
+        # graphs the user may not query, which are answered 403
+        self.forbidden = set()
+
+    @property
+    def base_uri(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def expire_sessions(self):
+        with self.lock:
+            self.sessions.clear()
+
+
+class FakeSopHandler(BaseHTTPRequestHandler):
+    # keep-alive, so that connection reuse can be counted
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _session_id(self):
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "JSESSIONID":
+                return value
+        return None
+
+    def _reply(self, status, body=b"", content_type="text/plain", session_id=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if session_id is not None:
+            self.send_header("Set-Cookie", f"JSESSIONID={session_id}; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        sop = self.server
+        session_id = self._session_id()
+        if self.path == "/tbl":
+            with sop.lock:
+                if session_id not in sop.sessions:
+                    session_id = uuid.uuid4().hex
+                    sop.sessions[session_id] = False
+            self._reply(200, LOGIN_FORM, "text/html", session_id)
+        elif self.path.startswith("/tbl/purgeuser"):
+            with sop.lock:
+                sop.sessions.pop(session_id, None)
+                sop.logouts += 1
+            self._reply(200)
+        else:
+            self._reply(404)
+
+    def do_POST(self):
+        sop = self.server
+        session_id = self._session_id()
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if self.path == "/tbl/j_security_check":
+            with sop.lock:
+                if session_id in sop.sessions and form["j_password"] == ["secret"]:
+                    sop.sessions[session_id] = True
+                    sop.logins += 1
+                    ok = True
+                else:
+                    ok = False
+            self._reply(200, b"welcome" if ok else LOGIN_FORM, "text/html")
+        elif self.path == "/tbl/sparql":
+            with sop.lock:
+                logged_in = sop.sessions.get(session_id, False)
+                if logged_in:
+                    sop.queries += 1
+            graph = form["default-graph-uri"][0]
+            if not logged_in and sop.logged_out_status == 401:
+                self._reply(401)
+            elif not logged_in:
+                self._reply(200, LOGIN_FORM, "text/html")
+            elif graph in sop.forbidden:
+                self._reply(403, b"forbidden")
+            else:
+                body = json.dumps({"graph": graph, "update": "update" in form}).encode()
+                self._reply(200, body, "application/sparql-results+json")
+        else:
+            self._reply(404)
+
+
+@pytest.fixture
+def sop():
+    server = FakeSop()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_one_login_per_session(sop):
+    with SopClient(sop.base_uri, password="secret") as client:
+        for _ in range(5):
+            r = client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+            assert r.json() == {"graph": "urn:x-evn-master:test", "update": False}
+        r = client.query("urn:x-evn-master:test", "INSERT DATA {}", update=True)
+        assert r.json()["update"]
+
+    assert sop.logins == 1
+    assert sop.queries == 6
+    assert sop.logouts == 1, "closing the client must log out"
+    assert sop.connections == 1, "sequential queries must reuse one connection"
+
+
+def test_reauthenticates_on_expiry(sop):
+    with SopClient(sop.base_uri, password="secret") as client:
+        client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+        sop.expire_sessions()
+        r = client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+        assert r.json()["graph"] == "urn:x-evn-master:test"
+
+    assert sop.logins == 2
+    assert sop.queries == 2
+
+
+def test_reauthenticates_on_401(sop):
+    sop.logged_out_status = 401
+    with SopClient(sop.base_uri, password="secret") as client:
+        client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+        sop.expire_sessions()
+        r = client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+        assert r.ok
+
+    assert sop.logins == 2
+
+
+def test_forbidden(sop):
+    """403 is an authorisation failure, reported as such, not an expired session to log in to again"""
+    sop.forbidden.add("urn:x-evn-master:secret")
+    with SopClient(sop.base_uri, password="secret") as client:
+        with pytest.raises(ProvWorkflowException, match="refused"):
+            client.query("urn:x-evn-master:secret", "SELECT * WHERE {?s ?p ?o}")
+        # the session is still good
+        assert client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}").ok
+
+    assert sop.logins == 1
+
+
+def test_bad_credentials(sop):
+    with SopClient(sop.base_uri, password="wrong") as client:
+        with pytest.raises(ProvWorkflowException):
+            client.query("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+
+
+def test_concurrent_use(sop):
+    client = SopClient(sop.base_uri, password="secret", pool_size=4)
+
+    def query(i):
+        if i == 20:
+            sop.expire_sessions()
+        return client.query(f"urn:x-evn-master:{i}", "SELECT * WHERE {?s ?p ?o}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(query, range(40)))
+    client.close()
+
+    assert [r.json()["graph"] for r in responses] == [
+        f"urn:x-evn-master:{i}" for i in range(40)
+    ]
+    assert sop.queries == 40
+    # once at the start and, at most, once per worker that saw the expiry
+    assert 2 <= sop.logins <= 9
+
+
+def test_query_sop_sparql_uses_shared_client(sop, monkeypatch):
+    monkeypatch.setenv("SOP_BASE_URI", sop.base_uri)
+    monkeypatch.setenv("SOP_PWD", "secret")
+    set_sop_client(None)
+    try:
+        for _ in range(3):
+            r = query_sop_sparql("urn:x-evn-master:test", "SELECT * WHERE {?s ?p ?o}")
+            assert r.ok
+        assert get_sop_client().base_uri == sop.base_uri
+    finally:
+        set_sop_client(None)
+
+    assert sop.logins == 1
+    assert sop.logouts == 1
+
+
+def test_insert_data(sop):
+    w = Workflow()
+    for _ in range(50):
+        w.blocks.append(Block())
+
+    with SopClient(sop.base_uri, password="secret", pool_size=4) as client:
+        report = client.insert_data(
+            "urn:x-evn-master:test", w.iter_quads(), max_bytes=2000, max_in_flight=4
+        )
+
+    assert report.triples == len(list(w.iter_triples()))
+    assert report.batches == sop.queries > 1
+    assert sop.logins == 1
+    assert sop.connections <= 4
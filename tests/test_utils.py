@@ -1,4 +1,6 @@
 import provworkflow.utils as utils
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import DCTERMS, PROV, RDF, XSD
 
 
 def test_now_as_xsd_datetime_stamp_uses_portable_isoformat(monkeypatch):
@@ -20,3 +22,92 @@ def test_now_as_xsd_datetime_stamp_uses_portable_isoformat(monkeypatch):
     monkeypatch.setattr(utils, "datetime", FakeDateTime)
 
     assert utils.now_as_xsd_datetime_stamp() == "2026-06-19T15:31:14+08:00"
+
+
+def _data_triples(n):
+    ex = Namespace("https://example.com/")
+    return [(ex[f"s{i}"], ex.p, Literal(i)) for i in range(n)]
+
+
+def test_add_with_provenance_bulk():
+    """The bulk builder must produce, per triple, what add_with_provenance() does but with a shared timestamp
+
+    :return: None
+    """
+    block = URIRef("https://example.com/block/1")
+    triples = _data_triples(100)
+    created = Literal("2026-06-19T15:31:14", datatype=XSD.dateTime)
+
+    g = utils.add_with_provenance_bulk(triples, block, created=created)
+    assert len(g) == 7 * len(triples)
+    for s, p, o in triples:
+        single = utils.add_with_provenance(s, p, o, block)
+        (x1,) = single.subjects(RDF.type, RDF.Statement)
+        (x2,) = g.subjects(RDF.object, o)
+        assert (s, p, o) in g
+        assert set(g.predicate_objects(x2)) == {
+            (p1, o1 if p1 != DCTERMS.created else created)
+            for p1, o1 in single.predicate_objects(x1)
+        }
+    assert set(g.objects(None, DCTERMS.created)) == {created}
+
+
+def test_add_with_provenance_bulk_grouped():
+    block = URIRef("https://example.com/block/1")
+    triples = _data_triples(25)
+
+    g = Graph()
+    utils.add_with_provenance_bulk(triples, block, g=g, group_size=10)
+
+    groups = set(g.subjects(PROV.wasAssociatedWith, block))
+    assert len(groups) == 3
+    for group in groups:
+        assert len(list(g.objects(group, DCTERMS.created))) == 1
+    statements = set(g.subjects(RDF.type, RDF.Statement))
+    assert len(statements) == 25
+    assert sorted(
+        len(list(g.subjects(DCTERMS.isPartOf, group))) for group in groups
+    ) == [5, 10, 10]
+    assert len(g) == 6 * 25 + 2 * 3
+
+
+def test_iter_with_provenance_skolemized():
+    """Statements & groups are skolem IRIs, so a statement split across INSERT DATA requests is still one node"""
+    from provworkflow.bulk_load import iter_insert_data
+    from rdflib import BNode
+
+    block = URIRef("https://example.com/block/1")
+    triples = _data_triples(50)
+
+    for group_size in (None, 10):
+        nodes = {
+            s
+            for s, p, o in utils.iter_with_provenance(
+                triples, block, group_size=group_size
+            )
+            if p in (RDF.type, DCTERMS.created)
+        }
+        assert all(
+            isinstance(n, URIRef) and n.startswith(utils.SKOLEM_BASE) for n in nodes
+        )
+
+        # each request loaded into a graph of its own, then merged
+        g = Graph()
+        queries = list(
+            iter_insert_data(
+                utils.iter_with_provenance(triples, block, group_size=group_size),
+                max_bytes=500,
+            )
+        )
+        assert len(queries) > 10
+        for q, _ in queries:
+            request = Graph()
+            request.update(q)
+            g += request
+        statements = set(g.subjects(RDF.type, RDF.Statement))
+        assert len(statements) == 50
+        for x in statements:
+            assert len(set(g.predicates(x))) == (6 if group_size is None else 5)
+
+    g = utils.add_with_provenance_bulk(triples, block, skolemize=False)
+    assert all(isinstance(x, BNode) for x in g.subjects(RDF.type, RDF.Statement))
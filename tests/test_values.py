@@ -0,0 +1,198 @@
+import base64
+import datetime
+import hashlib
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from provworkflow import Entity
+from provworkflow.namespace import SKOLEM_BASE, SPDX
+from provworkflow.values import (
+    BlobStore,
+    ValuePolicy,
+    get_value_policy,
+    register_converter,
+    checksum_triples,
+    set_value_policy,
+    to_literal,
+)
+from rdflib import Literal, URIRef
+from rdflib.namespace import PROV, RDF, XSD
+
+
+def checksum(g, uri):
+    """Returns a node's spdx:checksum as a digest, e.g. "sha256:9f86d0..." """
+    c = g.value(uri, SPDX.checksum)
+    if c is None:
+        return None
+    algorithm = str(g.value(c, SPDX.algorithm)).rpartition("checksumAlgorithm_")[2]
+    return f"{algorithm}:{g.value(c, SPDX.checksumValue)}"
+
+
+@pytest.fixture
+def policy(tmp_path):
+    policy = ValuePolicy(max_inline=100, store=BlobStore(tmp_path / "blobs"))
+    set_value_policy(policy)
+    yield policy
+    set_value_policy(None)
+
+
+def test_to_literal():
+    assert to_literal(1).datatype == XSD.integer
+    assert to_literal(1.5).datatype == XSD.double
+    assert to_literal(True).datatype == XSD.boolean
+    assert to_literal(Decimal("1.5")).datatype == XSD.decimal
+    assert to_literal(datetime.date(2020, 1, 1)).datatype == XSD.date
+    assert to_literal("x") == Literal("x")
+    assert to_literal(b"\x00\xff") == Literal(
+        base64.b64encode(b"\x00\xff").decode("ascii"), datatype=XSD.base64Binary
+    )
+    assert to_literal({"a": [1, "b"]}) == Literal('{"a":[1,"b"]}', datatype=RDF.JSON)
+    assert to_literal(("ü",)) == Literal('["ü"]', datatype=RDF.JSON)
+
+    class Point:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    class Point3D(Point):
+        pass
+
+    register_converter(Point, lambda p: Literal(f"POINT({p.x} {p.y})"))
+    assert to_literal(Point3D(1, 2)) == Literal("POINT(1 2)")
+
+
+def test_inline(policy):
+    e = Entity(value={"a": 1})
+    g = e.prov_to_graph()
+    assert g.value(e.uri, PROV.value) == Literal('{"a":1}', datatype=RDF.JSON)
+    assert checksum(g, e.uri) == e.digest
+    assert not (policy.store.path).exists(), "small values must not be stored"
+
+
+def test_out_of_line(policy):
+    payload = {"rows": list(range(1000))}
+    e = Entity(value=payload)
+    g = e.prov_to_graph()
+
+    uri = g.value(e.uri, PROV.value)
+    assert isinstance(uri, URIRef) and uri.startswith("file://")
+    blob = Path(uri[len("file://") :])
+    assert json.loads(blob.read_text()) == payload
+    assert blob.name == blob.parent.name + blob.name[2:]
+    assert all(len(o) <= 100 for o in g.objects() if isinstance(o, Literal))
+
+    # written once: the same value, in another Entity, is the same blob
+    blobs = list(policy.store.path.rglob("*"))
+    e2 = Entity(value=dict(payload))
+    assert e2.prov_to_graph().value(e2.uri, PROV.value) == uri
+    assert list(policy.store.path.rglob("*")) == blobs
+
+    # long strs as they are
+    e3 = Entity(value="ü" * 200)
+    uri = e3.prov_to_graph().value(e3.uri, PROV.value)
+    assert Path(uri[len("file://") :]).read_text(encoding="utf-8") == "ü" * 200
+
+    # and bytes as they are, not as base64
+    data = bytes(range(256)) * 4
+    for value in (data, bytearray(data), memoryview(data)):
+        e4 = Entity(value=value)
+        g = e4.prov_to_graph()
+        blob = Path(g.value(e4.uri, PROV.value)[len("file://") :])
+        assert blob.read_bytes() == data
+        assert checksum(g, e4.uri) == e4.digest
+    # short bytes are inline, as base64
+    e5 = Entity(value=b"x" * 75)
+    assert e5.prov_to_graph().value(e5.uri, PROV.value).datatype == XSD.base64Binary
+
+
+def test_blob_digests(policy):
+    """An out of line value's checksum is its blob's, so the blob can be verified against it"""
+    for value in (
+        {"rows": list(range(1000))},
+        list(range(1000)),
+        "x" * 1000,
+        b"x" * 1000,
+    ):
+        e = Entity(value=value)
+        g = e.prov_to_graph()
+        blob = Path(g.value(e.uri, PROV.value)[len("file://") :])
+        digest = "sha256:" + hashlib.sha256(blob.read_bytes()).hexdigest()
+        assert checksum(g, e.uri) == digest
+        # and the same when the blob's URI is remembered
+        assert checksum(e.prov_to_graph(), e.uri) == digest
+
+
+def test_stored_once_per_value(policy, monkeypatch):
+    e = Entity(value="x" * 1000)
+    e.prov_to_graph()
+    puts = []
+    monkeypatch.setattr(policy.store, "put", lambda lexical: puts.append(lexical))
+    e.prov_to_graph()
+    Entity(value="x" * 1000).prov_to_graph()
+    assert puts == [], "a value already stored must not be converted or stored again"
+
+
+def test_file_values(policy, tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text("a,b\n" * 1000)
+    e = Entity(value=path)
+    g = e.prov_to_graph()
+    assert g.value(e.uri, PROV.value) == URIRef(path.resolve().as_uri())
+    assert checksum(g, e.uri) == e.digest
+
+
+def test_default_policy(tmp_path, monkeypatch):
+    set_value_policy(None)
+    monkeypatch.delenv("PROVWF_BLOB_STORE", raising=False)
+    try:
+        # no store unless one is set: all values inline, as portable Literals
+        assert get_value_policy().store is None
+        payload = {"rows": list(range(100_000))}
+        path = tmp_path / "input.csv"
+        e, f = Entity(value=payload), Entity(value=path)
+        g = e.prov_to_graph() + f.prov_to_graph()
+        assert g.value(e.uri, PROV.value) == to_literal(payload)
+        assert checksum(g, e.uri) == e.digest
+        assert g.value(f.uri, PROV.value) == Literal(str(path))
+        assert not any(
+            isinstance(o, URIRef) and o.startswith("file:") for o in g.objects()
+        )
+
+        set_value_policy(None)
+        monkeypatch.setenv("PROVWF_BLOB_STORE", str(tmp_path / "blobs"))
+        assert get_value_policy().store.path == tmp_path / "blobs"
+    finally:
+        set_value_policy(None)
+
+
+def test_checksum_triples():
+    hexdigest = hashlib.sha256(b"x").hexdigest()
+    triples = list(
+        checksum_triples(URIRef("http://example.com/e"), f"sha256:{hexdigest}")
+    )
+    node = triples[0][2]
+    assert node.startswith(f"{SKOLEM_BASE}checksum/")
+    assert triples == [
+        (URIRef("http://example.com/e"), SPDX.checksum, node),
+        (node, RDF.type, SPDX.Checksum),
+        (node, SPDX.algorithm, SPDX.checksumAlgorithm_sha256),
+        (node, SPDX.checksumValue, Literal(hexdigest, datatype=XSD.hexBinary)),
+    ]
+    # the same in every export, but not shared between nodes
+    assert (
+        list(checksum_triples(URIRef("http://example.com/e"), f"sha256:{hexdigest}"))
+        == triples
+    )
+    other = list(
+        checksum_triples(URIRef("http://example.com/f"), f"sha256:{hexdigest}")
+    )
+    assert other[0][2] != node
+
+    blake = f"blake2b:{hashlib.blake2b(b'x').hexdigest()}"
+    assert (None, SPDX.algorithm, SPDX.checksumAlgorithm_blake2b512) in [
+        (None, p, o)
+        for _, p, o in checksum_triples(URIRef("http://example.com/e"), blake)
+    ]
+    # algorithms SPDX has no term for aren't written
+    assert list(checksum_triples(URIRef("http://example.com/e"), "shake_128:00")) == []
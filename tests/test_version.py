@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import URIRef
+
+import provworkflow.git_utils
+from provworkflow import Entity, ProvWorkflowException
+from provworkflow.version import clear_version_cache, get_version_uri
+
+
+@pytest.fixture(autouse=True)
+def clean_version_env(monkeypatch):
+    for var in ("PROVWF_VERSION_URI", "PROVWF_VERSION_FILE", "INCLUDE_GIT_INFO"):
+        monkeypatch.delenv(var, raising=False)
+    clear_version_cache()
+    yield
+    clear_version_cache()
+
+
+def test_git_version_resolved_once(monkeypatch):
+    """With INCLUDE_GIT_INFO, the Git version must be resolved once per process, not once per ProvReporter
+
+    :return: None
+    """
+
+    calls = []
+
+    def fake_get_version_uri():
+        calls.append(1)
+        return "https://github.com/example/repo/commit/abc1234567"
+
+    monkeypatch.setattr(provworkflow.git_utils, "get_version_uri", fake_get_version_uri)
+    monkeypatch.setenv("INCLUDE_GIT_INFO", "true")
+
+    entities = [Entity() for _ in range(100)]
+    assert len(calls) == 1
+    assert all(
+        e.version_uri == URIRef("https://github.com/example/repo/commit/abc1234567")
+        for e in entities
+    )
+
+    clear_version_cache()
+    Entity()
+    assert len(calls) == 2
+
+
+def test_precomputed_version_uri(monkeypatch, tmp_path):
+    """A version URI given in an environment variable or a file must be used in preference to Git
+
+    :return: None
+    """
+
+    monkeypatch.setenv("INCLUDE_GIT_INFO", "true")
+    version_file = tmp_path / "VERSION_URI"
+    version_file.write_text("https://example.com/release/1.0\n")
+    monkeypatch.setenv("PROVWF_VERSION_FILE", str(version_file))
+    assert get_version_uri() == URIRef("https://example.com/release/1.0")
+
+    monkeypatch.setenv("PROVWF_VERSION_URI", "https://example.com/release/2.0")
+    assert Entity().version_uri == URIRef("https://example.com/release/2.0")
+
+    monkeypatch.delenv("PROVWF_VERSION_URI")
+    monkeypatch.setenv("PROVWF_VERSION_FILE", str(tmp_path / "missing"))
+    with pytest.raises(ProvWorkflowException):
+        get_version_uri()
+
+
+def test_no_version_uri():
+    e = Entity()
+    assert get_version_uri() is None
+    assert e.version_uri == e.uri
+
+
+def test_precomputed_version_uri_does_not_import_git():
+    """A precomputed version URI must not import GitPython
+
+    :return: None
+    """
+
+    code = (
+        "import sys\n"
+        "from provworkflow import Block\n"
+        "b = Block()\n"
+        "assert str(b.version_uri) == 'https://example.com/release/1.0', b.version_uri\n"
+        "assert 'git' not in sys.modules, 'git was imported'\n"
+    )
+    env = dict(
+        os.environ,
+        PROVWF_VERSION_URI="https://example.com/release/1.0",
+        INCLUDE_GIT_INFO="true",
+        PYTHONPATH=str(Path(__file__).parent.parent),
+    )
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
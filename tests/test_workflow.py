@@ -1,8 +1,13 @@
-from provworkflow import Workflow, PROVWF, ProvWorkflowException
+from provworkflow import Agent, Entity, Workflow, PROVWF, ProvWorkflowException
 import provworkflow.block
-from rdflib import Literal
+from provworkflow.ntriples import NTriplesWriter
+from rdflib import Graph, Literal
 from rdflib.namespace import OWL, RDF, PROV, XSD
 from datetime import datetime
+import gc
+import inspect
+import io
+import weakref
 
 
 def test_prov_to_graph():
@@ -38,26 +43,212 @@ def test_prov_to_graph():
 
     # check start/end times of Blocks are within Workflow's
     for o in g.objects(subject=w.uri, predicate=PROV.startedAtTime):
-        w_sat = datetime.strptime(str(o), "%Y-%m-%dT%H:%M:%S%z")
+        w_sat = datetime.fromisoformat(str(o))
 
     for o in g.objects(subject=w.uri, predicate=PROV.endedAtTime):
-        w_eat = datetime.strptime(str(o), "%Y-%m-%dT%H:%M:%S%z")
+        w_eat = datetime.fromisoformat(str(o))
 
     for s in g.subjects(predicate=RDF.type, object=PROVWF.Block):
         for o in g.objects(subject=s, predicate=PROV.startedAtTime):
-            if datetime.strptime(str(o), "%Y-%m-%dT%H:%M:%S%z") < w_sat:
+            if datetime.fromisoformat(str(o)) < w_sat:
                 raise ProvWorkflowException(
                     "The started at times of all Blocks within a workflow must be greater than, or equal to, "
                     "the started at time of the Workflow"
                 )
 
         for o in g.objects(subject=s, predicate=PROV.endedAtTime):
-            if datetime.strptime(str(o), "%Y-%m-%dT%H:%M:%S%z") > w_eat:
+            if datetime.fromisoformat(str(o)) > w_eat:
                 raise ProvWorkflowException(
                     "The ended at times of all Blocks within a workflow must be greater than, or equal to, "
                     "the ended at time of the Workflow"
                 )
 
 
+def test_shared_nodes_serialised_once(monkeypatch):
+    """An Agent shared by many Blocks & Entities, and its parent Agent, must only be serialised once per export
+
+    :return: None
+    """
+
+    serialised = []
+    agent_triples = Agent._triples
+
+    def counting_triples(self, context):
+        serialised.append(self.uri)
+        return agent_triples(self, context)
+
+    monkeypatch.setattr(Agent, "_triples", counting_triples)
+
+    parent = Agent(label="Parent")
+    agent = Agent(label="Shared", acted_on_behalf_of=parent)
+    w = Workflow(was_associated_with=agent)
+    for _ in range(10):
+        b = provworkflow.block.Block(was_associated_with=agent)
+        b.generated.append(Entity(was_attributed_to=agent))
+        w.blocks.append(b)
+    g = w.prov_to_graph()
+
+    assert sorted(serialised) == sorted([agent.uri, parent.uri])
+    assert (
+        len(list(g.subjects(predicate=PROV.wasAssociatedWith, object=agent.uri))) == 11
+    )
+
+
+def test_iter_triples():
+    """A Workflow's iter_triples() must lazily yield exactly the triples prov_to_graph() adds to its graph
+
+    :return: None
+    """
+
+    w = Workflow()
+    b1 = provworkflow.block.Block()
+    e = Entity(label="Intermediate")
+    b1.used.append(Entity(label="Input"))
+    b1.generated.append(e)
+    b2 = provworkflow.block.Block(used=[e])
+    b2.generated.append(Entity(label="Output"))
+    w.blocks.extend([b1, b2])
+
+    triples = w.iter_triples()
+    assert inspect.isgenerator(triples), "iter_triples() must return a generator"
+    triples = list(triples)
+
+    assert len(triples) == len(set(triples)), "iter_triples() must not yield duplicates"
+    assert set(triples) == set(w.prov_to_graph())
+    assert (w.uri, PROV.used, b1.used[0].uri) in triples
+    assert (w.uri, PROV.generated, b2.generated[0].uri) in triples
+    assert (w.uri, PROV.used, e.uri) not in triples
+    assert not any(o == PROVWF.ProvReporter for _, _, o in triples)
+
+
+def test_external_outputs():
+    """An Entity marked external must be a Workflow output even if a later Block of the Workflow uses it
+
+    :return: None
+    """
+
+    w = Workflow()
+    external = Entity(label="External", external=True)
+    internal = Entity(label="Internal")
+    b1 = provworkflow.block.Block(generated=[external, internal])
+    b2 = provworkflow.block.Block(used=[external, internal])
+    w.blocks.extend([b1, b2])
+    triples = list(w.iter_triples())
+
+    assert (w.uri, PROV.generated, external.uri) in triples
+    assert (w.uri, PROV.generated, internal.uri) not in triples
+    assert (w.uri, PROV.used, external.uri) not in triples
+    assert len(triples) == len(set(triples)), "iter_triples() must not yield duplicates"
+
+
+def test_end_block_flushing():
+    """A Workflow with a sink must write each Block's provenance as it ends, release it and write the Workflow summary
+    as a final delta
+
+    :return: None
+    """
+
+    out = io.StringIO()
+    agent = Agent(label="Shared")
+    w = Workflow(sink=NTriplesWriter(out), was_associated_with=agent)
+
+    input_ = Entity(label="Input")
+    intermediate = Entity(label="Intermediate")
+    b1 = provworkflow.block.Block(was_associated_with=agent, used=[input_])
+    b1.generated.append(intermediate)
+    w.blocks.append(b1)
+    w.end_block(b1)
+
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert (b1.uri, RDF.type, PROVWF.Block) in g, "b1 must be flushed when it ends"
+    assert (
+        w.uri,
+        None,
+        None,
+    ) not in g, "the Workflow must not be flushed until it ends"
+    assert b1 not in w.blocks, "b1 must be released once flushed"
+    b1_ref = weakref.ref(b1)
+    del b1
+    gc.collect()
+    assert b1_ref() is None, "nothing must keep a reference to a flushed Block"
+
+    output = Entity(label="Output")
+    b2 = provworkflow.block.Block(was_associated_with=agent, used=[intermediate])
+    b2.generated.append(output)
+    w.end_block(b2)
+    w.end()
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == len(set(lines)), "no triple may be flushed twice"
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert len(list(g.objects(subject=w.uri, predicate=PROVWF.hadBlock))) == 2
+    assert len(list(g.subjects(predicate=RDF.type, object=PROV.Agent))) == 1
+    assert (w.uri, PROV.used, input_.uri) in g
+    assert (w.uri, PROV.generated, output.uri) in g
+    assert (w.uri, PROV.used, intermediate.uri) not in g
+    assert (w.uri, PROV.generated, intermediate.uri) not in g
+
+
+def test_end_block_defers_running_blocks():
+    """Flushing a Block must not flush, or end, Blocks it references that are still running
+
+    :return: None
+    """
+    out = io.StringIO()
+    w = Workflow(sink=NTriplesWriter(out))
+    Block = provworkflow.block.Block
+
+    e = Entity(label="Shared")
+    running = Block(used=[e])
+    e.was_used_by = [running]
+    never_ended = Block()
+    b1 = Block(generated=[e])
+    b1.informed.append(never_ended)
+    w.blocks.extend([b1, running])
+
+    w.end_block(b1)
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert (b1.uri, PROV.generated, e.uri) in g
+    assert (running.uri, PROV.used, e.uri) in g
+    assert (
+        running.ended_at_time is None
+    ), "a running Block must not be ended by another's flush"
+    assert (running.uri, PROV.endedAtTime, None) not in g
+    assert (never_ended.uri, RDF.type, PROVWF.Block) not in g
+    assert running in w.blocks
+
+    w.end_block(running)
+    w.end()
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert len(list(g.objects(running.uri, PROV.endedAtTime))) == 1
+    # referenced only by a flushed Block, so written by end()
+    assert (never_ended.uri, RDF.type, PROVWF.Block) in g
+
+
+def test_end_block_release():
+    """Ending Blocks releases them from blocks, whatever order they end in and however blocks has been changed
+
+    :return: None
+    """
+    w = Workflow(sink=NTriplesWriter(io.StringIO()))
+    Block = provworkflow.block.Block
+    blocks = [Block() for _ in range(100)]
+    w.blocks.extend(blocks)
+    for b in blocks[::2]:
+        w.end_block(b)
+    assert {id(b) for b in w.blocks} == {id(b) for b in blocks[1::2]}
+
+    late = Block()
+    w.blocks.insert(0, late)
+    w.blocks.remove(blocks[1])
+    w.end_block(Block())
+    for b in [late] + blocks[3::2]:
+        w.end_block(b)
+    assert w.blocks == []
+
+
 if __name__ == "__main__":
     test_prov_to_graph()
+    test_iter_triples()
+    test_external_outputs()
+    test_end_block_flushing()
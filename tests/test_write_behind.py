@@ -0,0 +1,196 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from provworkflow import Block, Entity, ProvWorkflowException, Workflow
+from provworkflow.write_behind import WriteBehindSink
+from rdflib.namespace import PROV, RDFS
+
+
+class Uploads:
+    """Records uploaded batches, optionally waiting for a signal before each"""
+
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+        self.go = threading.Event()
+        self.go.set()
+
+    def __call__(self, quads):
+        self.go.wait(timeout=5)
+        self.threads.add(threading.get_ident())
+        self.batches.append(quads)
+
+    @property
+    def quads(self):
+        return {q for batch in self.batches for q in batch}
+
+
+def test_submit():
+    uploads = Uploads()
+    blocks = [Block(used=[Entity(value=i)]) for i in range(50)]
+
+    with WriteBehindSink(uploads, max_batch=20) as sink:
+        for b in blocks:
+            sink.submit(b)
+        sink.drain()
+        stats = sink.stats()
+
+    expected = {q for b in blocks for q in b.iter_quads()}
+    assert uploads.quads == expected
+    assert (
+        threading.get_ident() not in uploads.threads
+    ), "uploads must be off the hot path"
+    assert stats.submitted == stats.uploaded == 50
+    assert stats.queue_depth == 0
+    assert stats.failed == 0
+    assert 3 <= stats.batches < 50, "submissions must be batched"
+    assert stats.mean_latency_seconds >= stats.mean_upload_seconds > 0
+
+
+def test_submit_exports_on_calling_thread():
+    """Reporters are exported by submit(), so changes made afterwards, on the workflow's thread, aren't uploaded"""
+    uploads = Uploads()
+    uploads.go.clear()
+    sink = WriteBehindSink(uploads, max_batch=1, linger=0)
+    b = Block(label="before")
+    sink.submit(b)
+    # ended by the export, not later by the uploader
+    assert b.ended_at_time is not None
+    b.label = "after"
+    b.used.append(Entity(value="late"))
+    uploads.go.set()
+    sink.close()
+
+    labels = {str(o) for _, p, o, _ in uploads.quads if p == RDFS.label}
+    assert labels == {"before"}
+    assert not any(p == PROV.used for _, p, _, _ in uploads.quads)
+
+
+def test_backpressure():
+    uploads = Uploads()
+    uploads.go.clear()
+    sink = WriteBehindSink(uploads, max_queue=2, max_batch=1, linger=0)
+
+    # one is taken by the blocked uploader, two fill the queue
+    for _ in range(3):
+        sink.submit(Block(), timeout=1)
+    time.sleep(0.05)
+    assert sink.stats().queue_depth == 2
+    with pytest.raises(ProvWorkflowException):
+        sink.submit(Block(), timeout=0.05)
+
+    uploads.go.set()
+    sink.close()
+    assert len(uploads.batches) == 3
+
+
+def test_close_while_submitting():
+    """A submission under way when close() is called must be uploaded, not queued after the uploader stops"""
+    uploads = Uploads()
+    uploads.go.clear()
+    sink = WriteBehindSink(uploads, max_queue=1, max_batch=1, linger=0)
+    sink.submit(Block(), timeout=1)
+    sink.submit(Block(), timeout=1)
+
+    # blocked on the full queue, having checked that the sink is open
+    submitter = threading.Thread(target=sink.submit, args=(Block(),))
+    submitter.start()
+    while sink._putting == 0:
+        time.sleep(0.001)
+    closer = threading.Thread(target=sink.close)
+    closer.start()
+    closer.join(timeout=0.1)
+    assert closer.is_alive(), "close() must wait for the submission"
+
+    uploads.go.set()
+    submitter.join(timeout=5)
+    closer.join(timeout=5)
+    assert not closer.is_alive()
+    assert len(uploads.batches) == 3
+    with pytest.raises(ProvWorkflowException):
+        sink.submit(Block())
+    sink.drain()
+
+
+def test_submit_async():
+    uploads = Uploads()
+    uploads.go.clear()
+    sink = WriteBehindSink(uploads, max_queue=1, max_batch=1, linger=0)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+        uploads.go.set()
+
+    async def main():
+        blocks = [Block() for _ in range(4)]
+        t = asyncio.create_task(ticker())
+        # blocks until the uploader is released, without blocking the ticker
+        for b in blocks:
+            await sink.submit_async(b)
+        await t
+        return blocks
+
+    blocks = asyncio.run(main())
+    sink.close()
+    assert len(ticks) == 5
+    assert uploads.quads == {q for b in blocks for q in b.iter_quads()}
+
+
+def test_workflow_sink():
+    """A Workflow flushing to a WriteBehindSink must upload what its export would contain"""
+    uploads = Uploads()
+    sink = WriteBehindSink(uploads)
+    w = Workflow(sink=sink)
+    expected = Workflow(uri=w.uri)
+    expected._created = w._created
+    expected.started_at_time = w.started_at_time
+    for i in range(10):
+        b = Block(used=[Entity(value=i)], generated=[Entity(value=-i)])
+        expected.blocks.append(b)
+        w.end_block(b)
+    w.end()
+    sink.close()
+
+    expected.ended_at_time = w.ended_at_time
+    assert uploads.quads == set(expected.iter_quads())
+
+
+def test_upload_failure():
+    def fail(quads):
+        raise ValueError("endpoint unavailable")
+
+    sink = WriteBehindSink(fail)
+    sink.submit(Block())
+    sink.drain()
+    assert sink.stats().failed == 1
+    with pytest.raises(ProvWorkflowException):
+        sink.close()
+
+
+def test_flush_on_exit(tmp_path):
+    """Provenance submitted but not uploaded when the interpreter exits must still be uploaded"""
+    out = tmp_path / "out.txt"
+    code = (
+        "import time\n"
+        "from provworkflow import Block\n"
+        "from provworkflow.write_behind import WriteBehindSink\n"
+        "def upload(quads):\n"
+        "    time.sleep(0.05)\n"
+        f"    with open({str(out)!r}, 'a') as f:\n"
+        "        f.write(f'{len(quads)}\\n')\n"
+        "sink = WriteBehindSink(upload, max_batch=1, linger=0)\n"
+        "for _ in range(5):\n"
+        "    sink.submit(Block())\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    assert len(out.read_text().splitlines()) == 5